@@ -0,0 +1,182 @@
+import math
+
+from functions import BUILTIN_FUNCTIONS
+from program import (OP_CONST, OP_VAR, OP_ADD, OP_SUB, OP_MUL, OP_DIV, OP_POW, OP_NEG, OP_CALL1,
+                     OP_STORE, OP_LOAD)
+
+
+LN10 = math.log(10)
+RADIANS_PER_DEGREE = math.pi / 180
+DEGREES_PER_RADIAN = 180 / math.pi
+
+_exp = BUILTIN_FUNCTIONS['exp'].func
+_pow10 = BUILTIN_FUNCTIONS['pow10'].func
+_fact = BUILTIN_FUNCTIONS['fact'].func
+_root = BUILTIN_FUNCTIONS['root'].func
+
+
+def digamma(x):
+    if x <= 0 and x % 1 == 0:
+        raise ZeroDivisionError("digamma pole")
+    if x < 0.5:
+        return digamma(1 - x) - math.pi / math.tan(math.pi * x)
+    result = 0.0
+    while x < 10:
+        result -= 1 / x
+        x += 1
+    inv = 1 / (x * x)
+    series = inv * (1 / 12 - inv * (1 / 120 - inv * (1 / 252 - inv * (1 / 240 - inv / 132))))
+    return result + math.log(x) - 0.5 / x - series
+
+
+def _d_root(n, x):
+    if x == 0:
+        raise ZeroDivisionError("root of 0")
+    r = _root(n, x)
+    return -r * math.log(abs(x)) / (n * n), r / (n * x)
+
+
+# Partial derivatives of the builtins in radians, as one value per argument.
+DERIVATIVES = {
+    'sin': math.cos,
+    'cos': lambda x: -math.sin(x),
+    'tan': lambda x: 1 / math.cos(x) ** 2,
+    'sinh': math.cosh,
+    'cosh': math.sinh,
+    'tanh': lambda x: 1 - math.tanh(x) ** 2,
+    'asin': lambda x: 1 / math.sqrt(1 - x * x),
+    'acos': lambda x: -1 / math.sqrt(1 - x * x),
+    'atan': lambda x: 1 / (1 + x * x),
+    'asinh': lambda x: 1 / math.sqrt(x * x + 1),
+    'acosh': lambda x: 1 / math.sqrt(x * x - 1),
+    'atanh': lambda x: 1 / (1 - x * x),
+    'sqrt': lambda x: 0.5 / math.sqrt(x),
+    'log10': lambda x: 1 / (x * LN10),
+    'ln': lambda x: 1 / x,
+    'exp': _exp,
+    'pow10': lambda x: LN10 * _pow10(x),
+    'fact': lambda x: _fact(x) * digamma(x + 1),
+    'inv': lambda x: -1 / (x * x),
+    'root': _d_root,
+}
+
+
+def partials(spec, angle_mode, args):
+    if BUILTIN_FUNCTIONS.get(spec.name) is spec:
+        derivative = DERIVATIVES[spec.name]
+    else:
+        derivative = spec.derivative
+        if derivative is None:
+            raise ValueError(f"No derivative for {spec.name}")
+
+    scale = 1.0
+    if angle_mode == 'DEG' and spec.angle == 'in':
+        args = [math.radians(arg) for arg in args]
+        scale = RADIANS_PER_DEGREE
+    elif angle_mode == 'DEG' and spec.angle == 'out':
+        scale = DEGREES_PER_RADIAN
+
+    try:
+        result = derivative(*args)
+    except ZeroDivisionError:
+        raise ValueError(f"{spec.name} not differentiable")
+    if spec.arity == 1:
+        return (result * scale,)
+    return tuple(value * scale for value in result)
+
+
+def _combine(a, da, b, db):
+    # a * da + b * db over tangents, where None is an all-zero tangent.
+    if da is None:
+        return None if db is None else [b * d for d in db]
+    if db is None:
+        return [a * d for d in da]
+    return [a * x + b * y for x, y in zip(da, db)]
+
+
+def _power(left, dleft, right, dright):
+    try:
+        value = left ** right
+    except OverflowError:
+        raise ValueError("Number too large")
+    if dleft is None and dright is None:
+        return value, None
+
+    try:
+        by_left = 0.0 if dleft is None or right == 0 else right * left ** (right - 1)
+        if dright is None or (left == 0 and right > 0):
+            by_right = 0.0
+        elif left > 0:
+            by_right = value * math.log(left)
+        else:
+            raise ValueError("^ not differentiable")
+    except ZeroDivisionError:
+        raise ValueError("^ not differentiable")
+    except OverflowError:
+        raise ValueError("Number too large")
+    return value, _combine(by_left, dleft, by_right, dright)
+
+
+def run_dual(program, variables, wrt, angle_mode):
+    # Forward mode: every stack entry is (value, tangent), where the tangent
+    # holds the partial derivative against each name in wrt.
+    seeds = {}
+    for i, name in enumerate(wrt):
+        tangent = [0.0] * len(wrt)
+        tangent[i] = 1.0
+        seeds[name] = tangent
+
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    slots = [None] * program.slots
+
+    for op, arg in program.code:
+        if op == OP_CONST:
+            push((arg, None))
+        elif op == OP_VAR:
+            push((float(variables[arg]), seeds.get(arg)))
+        elif op == OP_ADD:
+            right, dright = pop()
+            left, dleft = pop()
+            push((left + right, _combine(1.0, dleft, 1.0, dright)))
+        elif op == OP_SUB:
+            right, dright = pop()
+            left, dleft = pop()
+            push((left - right, _combine(1.0, dleft, -1.0, dright)))
+        elif op == OP_MUL:
+            right, dright = pop()
+            left, dleft = pop()
+            push((left * right, _combine(right, dleft, left, dright)))
+        elif op == OP_DIV:
+            right, dright = pop()
+            left, dleft = pop()
+            if right == 0:
+                raise ZeroDivisionError("Division by zero")
+            value = left / right
+            push((value, _combine(1 / right, dleft, -value / right, dright)))
+        elif op == OP_POW:
+            right, dright = pop()
+            left, dleft = pop()
+            push(_power(left, dleft, right, dright))
+        elif op == OP_NEG:
+            value, tangent = pop()
+            push((0.0 - value, _combine(-1.0, tangent, 0.0, None)))
+        elif op == OP_LOAD:
+            push(slots[arg])
+        elif op == OP_STORE:
+            slots[arg] = stack[-1]
+        else:
+            arity = 1 if op == OP_CALL1 else arg.arity
+            entries = stack[len(stack) - arity:]
+            del stack[len(stack) - arity:]
+            values = [value for value, _ in entries]
+            tangent = None
+            result = arg(angle_mode, *values)
+            if any(d is not None for _, d in entries):
+                for slope, (_, d) in zip(partials(arg, angle_mode, values), entries):
+                    tangent = _combine(1.0, tangent, slope, d)
+            push((result, tangent))
+
+    value, tangent = stack[0]
+    return value, tangent or [0.0] * len(wrt)
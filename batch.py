@@ -0,0 +1,79 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from engine import MathEngine
+from functions import BUILTIN_FUNCTIONS
+
+
+_worker_engine = None
+_worker_context = None
+_shared_engine = None
+
+
+def evaluate_item(engine, expression, context=None):
+    try:
+        return engine.evaluate(expression, None, context)
+    except Exception as e:
+        return e
+
+
+def _init_worker(context, cache_size, extra_functions):
+    global _worker_engine, _worker_context
+    _worker_engine = MathEngine(cache_size)
+    _worker_engine.set_angle_mode(context.angle_mode)
+    _worker_context = context
+    for spec in extra_functions:
+        _worker_engine.functions[spec.name] = spec
+
+
+def evaluate_chunk(context, expressions):
+    global _shared_engine
+    if _shared_engine is None:
+        _shared_engine = MathEngine()
+    return [evaluate_item(_shared_engine, expression, context) for expression in expressions]
+
+
+def _evaluate_chunk(expressions):
+    return [evaluate_item(_worker_engine, expression, _worker_context) for expression in expressions]
+
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_evaluate(engine, expressions, workers=None, chunksize=256, max_pending=None, context=None):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunksize < 1:
+        raise ValueError("chunksize must be positive")
+
+    context = context or engine.context()
+    if workers <= 1:
+        for expression in expressions:
+            yield evaluate_item(engine, expression, context)
+        return
+
+    extra_functions = [spec for name, spec in engine.functions.items()
+                       if BUILTIN_FUNCTIONS.get(name) is not spec]
+    initargs = (context, engine.cache_size, extra_functions)
+    max_pending = max_pending or workers * 2
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs) as pool:
+        pending = deque()
+        for chunk in _chunked(expressions, chunksize):
+            pending.append(pool.submit(_evaluate_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def evaluate_many(engine, expressions, workers=None, chunksize=256, context=None):
+    return list(iter_evaluate(engine, expressions, workers, chunksize, context=context))
@@ -0,0 +1,60 @@
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import MathEngine
+
+
+EXPRESSIONS = [
+    "2+3*4-5/6",
+    "sin(30)+cos(60)*tan(45)",
+    "sqrt(16)+fact(5)^2-ln(e)*log10(1000)",
+    "((1.5+2.5)*(3.5-0.5))^2/root(3,27)",
+]
+
+
+def generated_expression(terms, seed=0):
+    rng = random.Random(seed)
+    parts = []
+    for _ in range(terms):
+        value = rng.randint(1, 99)
+        parts.append(rng.choice([
+            f"{value}*{value + 1}",
+            f"sin({value})",
+            f"sqrt({value})/{value}",
+            f"({value}+x)^2",
+        ]))
+    return "+".join(parts)
+
+
+def measure(engine, expression, repeat=5):
+    compiled = engine.compile(expression)
+    postfix = engine.infix_to_postfix(engine.tokenize(expression))
+    variables = {'x': 1.5}
+    number = max(1, 20000 // len(postfix))
+
+    legacy = min(timeit.repeat(lambda: engine.evaluate_postfix(postfix, variables),
+                               number=number, repeat=repeat)) / number
+    opcodes = min(timeit.repeat(lambda: engine.run(compiled.program, variables),
+                                number=number, repeat=repeat)) / number
+
+    tokens = len(postfix)
+    return tokens, legacy * 1e9 / tokens, opcodes * 1e9 / tokens
+
+
+def main():
+    engine = MathEngine(optimize_programs=False)
+    corpus = EXPRESSIONS + [generated_expression(20), generated_expression(500)]
+
+    print(f"{'expression':<42} {'tokens':>7} {'postfix ns/tok':>15} {'opcode ns/tok':>14} {'speedup':>8}")
+    for expression in corpus:
+        tokens, legacy, opcodes = measure(engine, expression)
+        label = expression if len(expression) <= 40 else expression[:37] + '...'
+        print(f"{label:<42} {tokens:>7} {legacy:>15.1f} {opcodes:>14.1f} {legacy / opcodes:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
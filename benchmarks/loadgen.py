@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_opcodes import EXPRESSIONS
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(fraction * len(ordered)))
+    return ordered[index]
+
+
+async def open_connection(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix)
+    return await asyncio.open_connection(args.host, args.port)
+
+
+async def run_client(args, client, latencies):
+    reader, writer = await open_connection(args)
+    sent_at = {}
+    window = asyncio.Semaphore(args.pipeline)
+
+    async def send():
+        for i in range(args.requests):
+            await window.acquire()
+            expression = EXPRESSIONS[i % len(EXPRESSIONS)]
+            if args.batch > 1:
+                request = {'id': i, 'expressions': [expression] * args.batch}
+            else:
+                request = {'id': i, 'expression': expression}
+            sent_at[i] = time.perf_counter()
+            writer.write(json.dumps(request).encode('utf-8') + b'\n')
+            await writer.drain()
+
+    async def receive():
+        for _ in range(args.requests):
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError(f"client {client}: server closed the connection")
+            response = json.loads(line)
+            latencies.append(time.perf_counter() - sent_at.pop(response['id']))
+            window.release()
+
+    await asyncio.gather(send(), receive())
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run(args):
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(args, client, latencies) for client in range(args.connections)))
+    return latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for 'python -m calc serve'")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="connect to a Unix socket instead of TCP")
+    parser.add_argument('-c', '--connections', type=int, default=8)
+    parser.add_argument('-n', '--requests', type=int, default=2000, help="requests per connection")
+    parser.add_argument('-p', '--pipeline', type=int, default=16, help="in-flight requests per connection")
+    parser.add_argument('-b', '--batch', type=int, default=1, help="expressions per request")
+    args = parser.parse_args()
+
+    latencies, elapsed = asyncio.run(run(args))
+    total = len(latencies)
+    print(f"requests:    {total}")
+    print(f"elapsed:     {elapsed:.2f} s")
+    print(f"throughput:  {total / elapsed:,.0f} req/s ({total * args.batch / elapsed:,.0f} expr/s)")
+    print(f"latency p50: {percentile(latencies, 0.50) * 1e3:.3f} ms")
+    print(f"latency p99: {percentile(latencies, 0.99) * 1e3:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_opcodes import generated_expression
+from engine import MathEngine
+from mapper import ButtonMapper
+from syntax import parse
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+STAGES = ('tokenize', 'infix_to_postfix', 'evaluate_postfix', 'legacy_compile', 'compile', 'run', 'native',
+          'evaluate')
+
+
+def nested_expression(depth):
+    expression = "x"
+    for i in range(depth):
+        expression = f"({expression}+{i % 9 + 1})*0.5"
+    return expression
+
+
+def trig_expression(terms):
+    functions = ('sin', 'cos', 'tan', 'asin', 'acos', 'atan')
+    parts = []
+    for i in range(terms):
+        name = functions[i % len(functions)]
+        argument = f"x/{i % 5 + 2}" if name.startswith('a') else f"x+{i * 7 % 80 + 1}"
+        parts.append(f"{name}({argument})")
+    return "+".join(parts)
+
+
+CORPUS = {
+    'keypad': ["2+3", "12*34-5", "7/8+0.5", "2^10", "sqrt(16)+1", "(1+2)*3", "fact(5)", "100/3*3"],
+    'nested': [nested_expression(10), nested_expression(40), "((((((((1+2)*3)-4)/5)^2)+6)*7)-8)"],
+    'long': [generated_expression(50, seed=1), generated_expression(300, seed=2)],
+    'trig_deg': [trig_expression(6), trig_expression(60), "sin(x)^2+cos(x)^2"],
+    'trig_rad': [trig_expression(6), trig_expression(60), "sin(x)^2+cos(x)^2"],
+}
+
+MODES = {'trig_rad': 'RAD'}
+
+KEYPAD_SEQUENCES = [
+    ['1', '2', '+', '3', '4'],
+    ['2', 'π', 'x²', '+', '1'],
+    ['9', '√', '*', '4', 'x!'],
+    ['sin', '3', '0', ')', '+', 'cos', '6', '0', ')'],
+    ['(', '1', '+', '2', ')', 'x³', '1/x', 'eˣ'],
+    ['5', '0', '10ˣ', '-', 'log', '1', '0', '0', ')', 'e'],
+]
+
+
+def time_call(func, number, repeat):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def calls_for(budget, sample):
+    return max(1, int(budget / max(sample, 1e-9)))
+
+
+def record(seconds, tokens, items):
+    return {
+        'ns_per_token': seconds * 1e9 / tokens,
+        'evals_per_sec': items / seconds,
+    }
+
+
+def measure_expression_group(engine, expressions, angle_mode, repeat, budget):
+    context = engine.context(angle_mode)
+    variables = {'x': 1.5}
+    prepared = []
+    for expression in expressions:
+        tokens = engine.tokenize(expression)
+        postfix = engine.infix_to_postfix(tokens)
+        compiled = engine.compile(expression)
+        compiled.evaluate(variables, context)
+        prepared.append((expression, tokens, postfix, compiled.function_for(angle_mode),
+                         compiled.program_for(angle_mode)))
+
+    token_count = sum(len(tokens) for _, tokens, _, _, _ in prepared)
+    stages = {
+        'tokenize': lambda: [engine.tokenize(expression) for expression, *_ in prepared],
+        'infix_to_postfix': lambda: [engine.infix_to_postfix(tokens) for _, tokens, *_ in prepared],
+        'evaluate_postfix': lambda: [engine.evaluate_postfix(postfix, variables)
+                                     for _, _, postfix, *_ in prepared],
+        'compile': lambda: [parse(engine.functions, engine.constants, expression) for expression, *_ in prepared],
+        'legacy_compile': lambda: [engine.assemble(engine.infix_to_postfix(engine.tokenize(expression)))
+                                   for expression, *_ in prepared],
+        'run': lambda: [engine.run(program, variables, angle_mode) for *_, program in prepared],
+        'native': lambda: [function(variables) for _, _, _, function, _ in prepared],
+        'evaluate': lambda: [engine.evaluate(expression, variables, context) for expression, *_ in prepared],
+    }
+
+    saved_mode = engine.angle_mode
+    engine.set_angle_mode(angle_mode)
+    try:
+        results = {}
+        for stage, func in stages.items():
+            number = calls_for(budget, time_call(func, 1, 1))
+            results[stage] = record(time_call(func, number, repeat), token_count, len(prepared))
+        return results
+    finally:
+        engine.set_angle_mode(saved_mode)
+
+
+def measure_transform(repeat, budget):
+    mapper = ButtonMapper()
+
+    def replay():
+        for sequence in KEYPAD_SEQUENCES:
+            text = ''
+            for button in sequence:
+                text = mapper.transform(button, text)
+
+    presses = sum(len(sequence) for sequence in KEYPAD_SEQUENCES)
+    number = calls_for(budget, time_call(replay, 1, 1))
+    return {'transform': record(time_call(replay, number, repeat), presses, len(KEYPAD_SEQUENCES))}
+
+
+def run_suite(repeat=5, budget=0.05, groups=None):
+    engine = MathEngine()
+    results = {}
+    for group, expressions in CORPUS.items():
+        if groups and group not in groups:
+            continue
+        results[group] = measure_expression_group(engine, expressions, MODES.get(group, 'DEG'), repeat, budget)
+    if not groups or 'keypad' in groups:
+        results['keypad'] = dict(results.get('keypad', {}), **measure_transform(repeat, budget))
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for group, stages in results.items():
+        for stage, current in stages.items():
+            previous = baseline.get(group, {}).get(stage)
+            if previous is None:
+                continue
+            ratio = current['ns_per_token'] / previous['ns_per_token']
+            if ratio > 1 + threshold:
+                regressions.append((group, stage, previous['ns_per_token'], current['ns_per_token'], ratio))
+    return regressions
+
+
+def print_results(results):
+    print(f"{'group':<10} {'stage':<18} {'ns/token':>10} {'evals/sec':>12}")
+    for group, stages in results.items():
+        for stage, values in stages.items():
+            print(f"{group:<10} {stage:<18} {values['ns_per_token']:>10.1f} {values['evals_per_sec']:>12,.0f}")
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)['results']
+
+
+def save_results(path, results):
+    document = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(document, handle, indent=2, sort_keys=True)
+        handle.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the calculator engine hot paths")
+    parser.add_argument('-o', '--output', help="write results to this JSON file")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="overwrite the baseline with these results")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed slowdown per stage before failing (0.25 = 25%%)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=0.05, help="seconds per timing run")
+    parser.add_argument('--group', action='append', choices=sorted(CORPUS), help="only run these groups")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.repeat, args.budget, args.group)
+    print_results(results)
+
+    if args.output:
+        save_results(args.output, results)
+    if args.save_baseline:
+        save_results(args.baseline, results)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return 2
+
+    regressions = compare(results, load_baseline(args.baseline), args.threshold)
+    if not regressions:
+        print(f"\nNo stage regressed more than {args.threshold:.0%} against {args.baseline}")
+        return 0
+
+    print(f"\n{len(regressions)} stage(s) regressed more than {args.threshold:.0%}:")
+    for group, stage, before, after, ratio in regressions:
+        print(f"  {group}/{stage}: {before:.1f} -> {after:.1f} ns/token ({ratio:.2f}x)")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import deque
+
+from batch import iter_evaluate
+from engine import MathEngine
+from formatting import format_result, format_error
+
+
+def read_expressions(paths):
+    if not paths:
+        paths = ['-']
+    for path in paths:
+        if path == '-':
+            yield from (line.rstrip('\r\n') for line in sys.stdin)
+        else:
+            with open(path, encoding='utf-8') as handle:
+                yield from (line.rstrip('\r\n') for line in handle)
+
+
+def format_row(expression, result):
+    if not isinstance(result, Exception):
+        try:
+            return expression, format_result(result), ''
+        except (OverflowError, ValueError) as e:
+            result = e
+    return expression, format_error(result), str(result)
+
+
+class CsvWriter:
+    def __init__(self, out):
+        self.writer = csv.writer(out, lineterminator='\n')
+        self.writer.writerow(('expression', 'result', 'error'))
+
+    def write(self, expression, result, error):
+        self.writer.writerow((expression, result, error))
+
+
+class JsonLinesWriter:
+    def __init__(self, out):
+        self.out = out
+
+    def write(self, expression, result, error):
+        record = {'expression': expression, 'result': result, 'error': error or None}
+        self.out.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+WRITERS = {'csv': CsvWriter, 'jsonl': JsonLinesWriter}
+
+
+def run_eval(args, out):
+    engine = MathEngine(cache_size=args.cache_size)
+    engine.set_angle_mode(args.angle)
+    writer = WRITERS[args.format](out)
+
+    in_flight = deque()
+
+    def remember(expressions):
+        for expression in expressions:
+            in_flight.append(expression)
+            yield expression
+
+    results = iter_evaluate(engine, remember(read_expressions(args.files)), args.workers, args.chunk_size)
+    for count, result in enumerate(results, 1):
+        writer.write(*format_row(in_flight.popleft(), result))
+        if count % args.chunk_size == 0:
+            out.flush()
+
+    out.flush()
+    return 0
+
+
+def run_serve(args, out):
+    import asyncio
+    from concurrent.futures import ProcessPoolExecutor
+
+    from server import EvaluationServer, serve_forever
+
+    executor = ProcessPoolExecutor(args.workers) if args.workers > 0 else None
+    server = EvaluationServer(executor, args.offload_threshold, args.cache_size)
+    where = args.unix or f"{args.host}:{args.port}"
+    print(f"Serving on {where}", file=sys.stderr)
+    try:
+        asyncio.run(serve_forever(server, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m calc', description="Headless scientific calculator")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    evaluate = commands.add_parser('eval', help="evaluate one expression per line")
+    evaluate.add_argument('files', nargs='*', help="input files, '-' or nothing for stdin")
+    evaluate.add_argument('-f', '--format', choices=sorted(WRITERS), default='csv')
+    evaluate.add_argument('-o', '--output', help="output file (default: stdout)")
+    evaluate.add_argument('--angle', choices=['DEG', 'RAD'], default='DEG')
+    evaluate.add_argument('--workers', type=int, default=1)
+    evaluate.add_argument('--chunk-size', type=int, default=1024)
+    evaluate.add_argument('--cache-size', type=int, default=4096)
+    evaluate.set_defaults(handler=run_eval)
+
+    serve = commands.add_parser('serve', help="serve newline-delimited JSON requests over a socket")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--unix', help="listen on a Unix socket at this path instead of TCP")
+    serve.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                       help="processes for large batch requests (0 uses a thread)")
+    serve.add_argument('--offload-threshold', type=int, default=64,
+                       help="batch size at which a request is moved off the event loop")
+    serve.add_argument('--cache-size', type=int, default=4096)
+    serve.set_defaults(handler=run_serve)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if getattr(args, 'output', None):
+        with open(args.output, 'w', encoding='utf-8', newline='') as out:
+            return args.handler(args, out)
+    return args.handler(args, sys.stdout)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
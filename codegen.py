@@ -0,0 +1,138 @@
+import math
+
+from compiler import build_tree
+from functions import int_power
+from program import (OP_CONST, OP_VAR, OP_ADD, OP_SUB, OP_MUL, OP_DIV, OP_POW, OP_NEG,
+                     OP_CALL1, OP_CALLN)
+
+
+BINARY_SYMBOLS = {OP_ADD: '+', OP_SUB: '-', OP_MUL: '*'}
+
+
+def _division_by_zero():
+    raise ZeroDivisionError("Division by zero")
+
+
+def _number_too_large():
+    raise ValueError("Number too large")
+
+
+def _unbound(name):
+    raise ValueError(f"Unbound variable: {name}")
+
+
+class FunctionBuilder:
+    def __init__(self, angle_mode):
+        self.angle_mode = angle_mode
+        self.lines = []
+        self.names = {}
+        self.namespace = {
+            '__builtins__': {},
+            '_float': float,
+            '_int': int,
+            '_type': type,
+            '_int_power': int_power,
+            '_overflow': OverflowError,
+            '_missing': KeyError,
+            '_unbound': _unbound,
+            '_division_by_zero': _division_by_zero,
+            '_number_too_large': _number_too_large,
+            '_deg_to_rad': math.pi / 180.0,
+            '_rad_to_deg': 180.0 / math.pi,
+        }
+        self.variables = {}
+        self.temporaries = 0
+
+    def bind(self, prefix, value):
+        key = (prefix, id(value))
+        name = self.names.get(key)
+        if name is None:
+            name = self.names[key] = f"{prefix}{len(self.names)}"
+            self.namespace[name] = value
+        return name
+
+    def temporary(self, expression):
+        name = f"t{self.temporaries}"
+        self.temporaries += 1
+        self.lines.append(f"{name} = {expression}")
+        return name
+
+    def constant(self, value):
+        if type(value) in (int, float) and math.isfinite(value):
+            # -2.0 ** v0 would parse as -(2.0 ** v0).
+            return repr(value) if math.copysign(1, value) > 0 else f"({value!r})"
+        return self.bind('k', value)
+
+    def variable(self, name):
+        local = self.variables.get(name)
+        if local is None:
+            local = self.variables[name] = f"v{len(self.variables)}"
+            self.lines.extend(("try:", f"    {local} = _float(values[{name!r}])",
+                               "except _missing:", f"    _unbound({name!r})"))
+        return local
+
+    def call(self, spec, args):
+        if not spec.pure:
+            return self.temporary(f"{self.bind('s', spec)}({self.angle_mode!r}, {', '.join(args)})")
+
+        if spec.check is not None:
+            self.lines.append(f"{self.bind('c', spec.check)}({', '.join(args)})")
+        func = self.bind('f', spec.func)
+        if self.angle_mode == 'DEG' and spec.angle == 'in':
+            return self.temporary(f"{func}({', '.join(f'{arg} * _deg_to_rad' for arg in args)})")
+        if self.angle_mode == 'DEG' and spec.angle == 'out':
+            return self.temporary(f"{func}({', '.join(args)}) * _rad_to_deg")
+        return self.temporary(f"{func}({', '.join(args)})")
+
+    def node(self, node, args):
+        op = node.op
+        if op == OP_CONST:
+            return self.constant(node.value)
+        if op == OP_VAR:
+            return self.variable(node.value)
+        if op in BINARY_SYMBOLS:
+            return self.temporary(f"{args[0]} {BINARY_SYMBOLS[op]} {args[1]}")
+        if op == OP_DIV:
+            self.lines.append(f"if {args[1]} == 0: _division_by_zero()")
+            return self.temporary(f"{args[0]} / {args[1]}")
+        if op == OP_POW:
+            name = f"t{self.temporaries}"
+            self.temporaries += 1
+            # Only int ** int can grow without bound; floats overflow instead.
+            power = f"{args[0]} ** {args[1]}"
+            power = f"{power} if _type({args[1]}) is not _int else _int_power({args[0]}, {args[1]})"
+            self.lines.extend(("try:", f"    {name} = {power}",
+                               "except _overflow:", "    _number_too_large()"))
+            return name
+        if op == OP_NEG:
+            return self.temporary(f"0.0 - {args[0]}")
+        if op == OP_CALL1 or op == OP_CALLN:
+            return self.call(node.value, args)
+        raise ValueError(f"Unknown opcode: {op}")
+
+    def build(self, root):
+        results = {}
+        pending = [(root, False)]
+
+        while pending:
+            node, expanded = pending.pop()
+            key = id(node)
+            if key in results:
+                continue
+            if expanded or not node.args:
+                results[key] = self.node(node, [results[id(child)] for child in node.args])
+                continue
+            pending.append((node, True))
+            for child in reversed(node.args):
+                pending.append((child, False))
+
+        body = "\n    ".join(self.lines + [f"return {results[id(root)]}"])
+        source = f"def evaluate(values):\n    {body}\n"
+        exec(compile(source, '<expression>', 'exec'), self.namespace)
+        function = self.namespace['evaluate']
+        function.source = source
+        return function
+
+
+def generate(program, angle_mode):
+    return FunctionBuilder(angle_mode).build(build_tree(program))
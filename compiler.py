@@ -0,0 +1,181 @@
+from itertools import repeat
+
+from functions import int_power
+from program import (Program, op_arity, OP_CONST, OP_VAR, OP_ADD, OP_SUB, OP_MUL,
+                     OP_DIV, OP_POW, OP_NEG, OP_CALL1, OP_CALLN, OP_STORE, OP_LOAD)
+
+
+class Node:
+    __slots__ = ('op', 'value', 'args', 'span')
+
+    def __init__(self, op, value=None, args=(), span=None):
+        self.op = op
+        self.value = value
+        self.args = args
+        self.span = span
+
+    def __repr__(self):
+        if self.op == OP_CONST or self.op == OP_VAR:
+            return f"Node({self.value!r})"
+        return f"Node({self.op}, {self.value!r}, {list(self.args)!r})"
+
+
+def _is_const(node, value):
+    return node.op == OP_CONST and node.value == value
+
+
+def _compute(op, value, args, angle_mode):
+    if op == OP_ADD:
+        return args[0] + args[1]
+    if op == OP_SUB:
+        return args[0] - args[1]
+    if op == OP_MUL:
+        return args[0] * args[1]
+    if op == OP_DIV:
+        return args[0] / args[1]
+    if op == OP_POW:
+        return int_power(args[0], args[1])
+    if op == OP_NEG:
+        return 0.0 - args[0]
+    return value(angle_mode, *args)
+
+
+def simplify(op, value, args, angle_mode):
+    if args and all(arg.op == OP_CONST for arg in args):
+        if op not in (OP_CALL1, OP_CALLN) or value.pure:
+            try:
+                result = _compute(op, value, [arg.value for arg in args], angle_mode)
+            except Exception:
+                pass
+            else:
+                if isinstance(result, (int, float)) and not isinstance(result, bool):
+                    return Node(OP_CONST, result)
+
+    if op == OP_ADD:
+        if _is_const(args[1], 0):
+            return args[0]
+        if _is_const(args[0], 0):
+            return args[1]
+    elif op == OP_SUB:
+        if _is_const(args[1], 0):
+            return args[0]
+        if _is_const(args[0], 0):
+            return Node(OP_NEG, None, (args[1],))
+    elif op == OP_MUL:
+        if _is_const(args[1], 1):
+            return args[0]
+        if _is_const(args[0], 1):
+            return args[1]
+    elif op == OP_DIV or op == OP_POW:
+        if _is_const(args[1], 1):
+            return args[0]
+
+    return Node(op, value, args)
+
+
+def _intern(node, interned):
+    if node.op == OP_CALL1 or node.op == OP_CALLN:
+        if not node.value.pure:
+            return node
+        key = (node.op, node.value)
+    elif node.op == OP_CONST:
+        key = (node.op, repr(node.value))
+    else:
+        key = (node.op, node.value)
+
+    key += tuple(id(arg) for arg in node.args)
+    return interned.setdefault(key, node)
+
+
+def build_tree(program, angle_mode=None, fold=False, share=False):
+    stack = []
+    stored = {}
+    interned = {}
+    spans = program.spans or repeat(None)
+
+    for (op, arg), span in zip(program.code, spans):
+        if op == OP_STORE:
+            stored[arg] = stack[-1]
+            continue
+        if op == OP_LOAD:
+            stack.append(stored[arg])
+            continue
+
+        arity = op_arity(op, arg)
+        if arity == 0:
+            node = Node(op, arg, (), span)
+        else:
+            args = tuple(stack[len(stack) - arity:])
+            del stack[len(stack) - arity:]
+            if fold:
+                node = simplify(op, arg, args, angle_mode)
+            else:
+                node = Node(op, arg, args, span)
+
+        if share:
+            node = _intern(node, interned)
+        stack.append(node)
+
+    return stack[0]
+
+
+def _count_references(root):
+    references = {id(root): 0}
+    pending = [root]
+
+    while pending:
+        node = pending.pop()
+        for child in node.args:
+            if id(child) in references:
+                references[id(child)] += 1
+            else:
+                references[id(child)] = 1
+                pending.append(child)
+
+    return references
+
+
+def emit(root):
+    references = _count_references(root)
+    sizes = {}
+    slots = {}
+    ops = []
+    args = []
+    pending = [(root, False)]
+
+    while pending:
+        node, expanded = pending.pop()
+        key = id(node)
+
+        if key in slots:
+            ops.append(OP_LOAD)
+            args.append(slots[key])
+            continue
+
+        if expanded or not node.args:
+            ops.append(node.op)
+            args.append(node.value)
+            sizes[key] = 1 + sum(sizes[id(child)] for child in node.args)
+            if node.args and references[key] > 1:
+                slots[key] = len(slots)
+                ops.append(OP_STORE)
+                args.append(slots[key])
+            continue
+
+        pending.append((node, True))
+        for child in reversed(node.args):
+            pending.append((child, False))
+
+    nodes = sizes[id(root)]
+    stats = {
+        'nodes': nodes,
+        'unique_nodes': len(references),
+        'deduplicated': nodes - len(references),
+        'shared_subtrees': len(slots),
+        'ops': len(ops),
+    }
+    return Program(ops, args, len(slots), stats)
+
+
+def optimize(program, angle_mode):
+    return emit(build_tree(program, angle_mode, fold=True, share=True))
@@ -1,9 +1,25 @@
 import random
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtCore import QObject, QTimer, Signal, Qt
+from PySide6.QtGui import QKeySequence, QShortcut
 from engine import MathEngine
+from formatting import format_result, format_error
 from mapper import ButtonMapper
+from preview import IncrementalParser
 from ui import CalculatorUI
 
 
+PREVIEW_DELAY_MS = 80
+CALCULATION_TIMEOUT_MS = 3000
+PLOT_DELAY_MS = 30
+
+
+class WorkerSignals(QObject):
+    preview = Signal(int, str)
+    result = Signal(int, str)
+    plot = Signal(int, object)
+
+
 class CalculatorController:
 
     def __init__(self):
@@ -14,6 +30,35 @@ class CalculatorController:
         self.memory = 0.0
         self.second_mode = False
 
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.signals = WorkerSignals()
+        self.signals.preview.connect(self._show_preview)
+        self.signals.result.connect(self._show_result)
+        self.signals.plot.connect(self._show_plot)
+
+        self.calculation_generation = 0
+        self.calculation = None
+        self.calculation_timer = QTimer()
+        self.calculation_timer.setSingleShot(True)
+        self.calculation_timer.setInterval(CALCULATION_TIMEOUT_MS)
+        self.calculation_timer.timeout.connect(self._handle_calculation_timeout)
+
+        self.live_preview = True
+        self.parser = IncrementalParser(self.engine)
+        self.preview_generation = 0
+        self.preview_program = None
+        self.preview_timer = QTimer()
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(PREVIEW_DELAY_MS)
+        self.preview_timer.timeout.connect(self._start_preview)
+
+        self.plot_cache = None
+        self.plot_generation = 0
+        self.plot_timer = QTimer()
+        self.plot_timer.setSingleShot(True)
+        self.plot_timer.setInterval(PLOT_DELAY_MS)
+        self.plot_timer.timeout.connect(self._start_plot)
+
         self._connect_signals()
 
         self.ui.showMaximized()
@@ -21,8 +66,12 @@ class CalculatorController:
 
     def _connect_signals(self):
         self.ui.mode_button.clicked.connect(self._handle_mode_toggle)
+        self.ui.plot_button.clicked.connect(self._handle_plot_toggle)
+        self.cancel_shortcut = QShortcut(QKeySequence(Qt.Key_Escape), self.ui)
+        self.cancel_shortcut.activated.connect(self._handle_cancel)
+        self.ui.scientific_panel_created.connect(self._handle_scientific_panel_created)
+        self.ui.plot_panel_created.connect(self._handle_plot_panel_created)
         self._connect_basic_buttons()
-        self._connect_scientific_buttons()
 
     def _connect_basic_buttons(self):
         basic_buttons = [
@@ -102,6 +151,10 @@ class CalculatorController:
         else:
             btn.clicked.connect(lambda checked, val=text: self._handle_insert_number(val))
 
+    def _handle_scientific_panel_created(self):
+        self._connect_scientific_buttons()
+        self.ui.update_angle_mode_button(self.engine.angle_mode)
+
     def _handle_mode_toggle(self):
         is_basic = self.ui.button_stack.currentIndex() == 0
         if is_basic:
@@ -109,9 +162,28 @@ class CalculatorController:
         else:
             self.ui.switch_to_basic()
 
+    def _handle_plot_toggle(self):
+        if self.ui.is_plotting():
+            self.ui.switch_to_keypad()
+        else:
+            self.ui.switch_to_plot()
+
+    def _handle_plot_panel_created(self):
+        try:
+            from plotting import PlotCache
+        except ImportError:
+            self.ui.plot_view.clear("Plotting needs NumPy")
+            return
+        self.plot_cache = PlotCache(self.engine)
+        self.ui.function_input.textChanged.connect(self._handle_function_changed)
+        self.ui.plot_view.view_changed.connect(self._schedule_plot)
+
     def _handle_angle_mode_toggle(self):
         new_mode = self.engine.toggle_angle_mode()
         self.ui.update_angle_mode_button(new_mode)
+        self._schedule_preview(self.ui.expression_label.text())
+        if self.plot_cache is not None:
+            self._schedule_plot()
 
     def _handle_second_mode_toggle(self):
         self.second_mode = not self.second_mode
@@ -147,18 +219,18 @@ class CalculatorController:
             if result != "0" and result != "Error":
                 value = float(result)
                 new_value = -value
-                self.ui.expression_label.setText(str(new_value))
+                self._set_expression(str(new_value))
                 self.ui.result_label.setText(str(new_value))
         except ValueError:
             if current.startswith('-'):
-                self.ui.expression_label.setText(current[1:])
+                self._set_expression(current[1:])
             else:
-                self.ui.expression_label.setText('-' + current)
+                self._set_expression('-' + current)
 
     def _handle_insert_number(self, val):
         current = self.ui.expression_label.text()
         new_text = current + str(val)
-        self.ui.expression_label.setText(new_text)
+        self._set_expression(new_text)
 
     def _handle_insert_operator(self, op):
         current = self.ui.expression_label.text()
@@ -172,42 +244,75 @@ class CalculatorController:
         else:
             new_text = current + op
 
-        self.ui.expression_label.setText(new_text)
+        self._set_expression(new_text)
 
     def _handle_function_button(self, button_text):
         current = self.ui.expression_label.text()
         new_text = self.mapper.transform(button_text, current)
-        self.ui.expression_label.setText(new_text)
+        self._set_expression(new_text)
 
     def _handle_clear_all(self):
-        self.ui.expression_label.setText("")
+        self._set_expression("")
+        self._cancel_preview()
+        self._cancel_calculation()
         self.ui.result_label.setText("0")
 
     def _handle_backspace(self):
         current = self.ui.expression_label.text()
-        self.ui.expression_label.setText(current[:-1])
+        self._set_expression(current[:-1])
 
     def _handle_calculate(self):
-        try:
-            expression = self.ui.expression_label.text()
-            result = self.engine.evaluate(expression)
-
-            if 1e10 > abs(result) > 1e-10:
-                formatted = f"{result:.10g}"
-                self.ui.result_label.setText(formatted)
-            else:
-                self.ui.result_label.setText(f"{result:.6e}")
-        except Exception as e:
-            error_msg = str(e) if len(str(e)) < 30 else "Error"
-            self.ui.result_label.setText(error_msg)
+        self._start_calculation(self.ui.expression_label.text(), percentage=False)
 
     def _handle_percentage(self):
+        self._start_calculation(self.ui.expression_label.text(), percentage=True)
+
+    def _handle_cancel(self):
+        if self.calculation is not None:
+            self._abandon_calculation("Cancelled")
+
+    def _handle_calculation_timeout(self):
+        if self.calculation is not None:
+            self._abandon_calculation("Timed out")
+
+    def _start_calculation(self, expression, percentage):
+        self._cancel_preview()
+        self._cancel_calculation()
+        self.calculation = self.executor.submit(self._calculate, self.calculation_generation, expression,
+                                                self.engine.context(), percentage)
+        self.calculation_timer.start()
+
+    def _calculate(self, generation, expression, context, percentage):
         try:
-            expression = self.ui.expression_label.text()
-            result = self.engine.evaluate(expression) / 100
-            self.ui.result_label.setText(f"{result:.10g}")
-        except Exception:
-            self.ui.result_label.setText("Error")
+            result = self.engine.evaluate(expression, None, context)
+            text = f"{result / 100:.10g}" if percentage else format_result(result)
+        except Exception as e:
+            text = "Error" if percentage else format_error(e)
+        self.signals.result.emit(generation, text)
+
+    def _show_result(self, generation, text):
+        if generation != self.calculation_generation:
+            return
+        self.calculation_timer.stop()
+        self.calculation = None
+        self.ui.result_label.setText(text)
+
+    def _cancel_calculation(self):
+        self.calculation_timer.stop()
+        self.calculation_generation += 1
+        if self.calculation is not None:
+            self.calculation.cancel()
+            self.calculation = None
+
+    def _abandon_calculation(self, message):
+        # A running Python thread cannot be interrupted, so leave it to finish
+        # on the old executor and give new work a fresh one.
+        running = not self.calculation.cancel() and not self.calculation.done()
+        self._cancel_calculation()
+        if running:
+            self.executor.shutdown(wait=False)
+            self.executor = ThreadPoolExecutor(max_workers=2)
+        self.ui.result_label.setText(message)
 
     def _handle_memory_clear(self):
         self.memory = 0.0
@@ -227,7 +332,7 @@ class CalculatorController:
             pass
 
     def _handle_recall_memory(self):
-        self.ui.expression_label.setText(str(self.memory))
+        self._set_expression(str(self.memory))
 
     def _handle_insert_random(self):
         current = self.ui.expression_label.text()
@@ -238,7 +343,7 @@ class CalculatorController:
         else:
             new_text = current + str(rand_num)
 
-        self.ui.expression_label.setText(new_text)
+        self._set_expression(new_text)
 
     def _handle_scientific_notation(self):
         current = self.ui.expression_label.text()
@@ -246,7 +351,7 @@ class CalculatorController:
         if not current or not current[-1].isdigit():
             return
 
-        self.ui.expression_label.setText(current + 'e')
+        self._set_expression(current + 'e')
 
     def _handle_set_random_seed(self):
         try:
@@ -258,5 +363,92 @@ class CalculatorController:
         except ValueError:
             pass
 
+    def _set_expression(self, text):
+        self.ui.expression_label.setText(text)
+        self._schedule_preview(text)
+
+    def _schedule_preview(self, text):
+        if not self.live_preview:
+            return
+
+        # Parsing reuses the unchanged prefix, so it stays cheap enough for the
+        # GUI thread; only evaluation is debounced and handed to the worker.
+        self.preview_generation += 1
+        self.preview_program = self.parser.update(text)
+        if self.parser.error is not None:
+            self.preview_timer.stop()
+            self.ui.result_label.setText("")
+        elif self.preview_program is None:
+            self.preview_timer.stop()
+        else:
+            self.preview_timer.start()
+
+    def _cancel_preview(self):
+        self.preview_timer.stop()
+        self.preview_generation += 1
+
+    def _start_preview(self):
+        self.executor.submit(self._evaluate_preview, self.preview_generation,
+                             self.preview_program, self.engine.angle_mode)
+
+    def _evaluate_preview(self, generation, program, angle_mode):
+        # Unbound names have no value to show, so they clear the preview.
+        try:
+            text = "" if program.variables else format_result(self.engine.run(program, None, angle_mode))
+        except Exception:
+            text = ""
+        self.signals.preview.emit(generation, text)
+
+    def _show_preview(self, generation, text):
+        if generation == self.preview_generation and self.calculation is None:
+            self.ui.result_label.setText(text)
+
+    def _handle_function_changed(self, text):
+        self.ui.plot_view.autoscale = True
+        self._schedule_plot()
+
+    def _schedule_plot(self):
+        self.plot_generation += 1
+        self.plot_timer.start()
+
+    def _start_plot(self):
+        view = self.ui.plot_view
+        expression = self.ui.function_input.text()
+        if not expression.strip():
+            view.clear()
+            return
+        self.executor.submit(self._sample_plot, self.plot_generation, expression, view.x0, view.x1,
+                             view.pixel_width(), self.engine.angle_mode)
+
+    def _sample_plot(self, generation, expression, x0, x1, width, angle_mode):
+        from plotting import downsample
+
+        # Sampling stops between tiles once a newer view has been requested;
+        # finished tiles stay cached for the next request.
+        def cancelled():
+            return generation != self.plot_generation
+
+        try:
+            samples = self.plot_cache.sample(expression, x0, x1, angle_mode, cancelled)
+            if samples is None:
+                return
+            xs, ys = samples
+            payload = (downsample(xs, ys, x0, x1, width), f"{len(xs):,} points")
+        except Exception as e:
+            payload = (None, format_error(e))
+        self.signals.plot.emit(generation, payload)
+
+    def _show_plot(self, generation, payload):
+        if generation != self.plot_generation:
+            return
+        curve, status = payload
+        view = self.ui.plot_view
+        if curve is None:
+            view.clear(status)
+            return
+        if view.autoscale:
+            view.fit_y(curve[1])
+        view.set_curve(curve[0], curve[1], status)
+
     def show(self):
         self.ui.show()
\ No newline at end of file
@@ -1,25 +1,158 @@
 import math
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from codegen import generate
+from compiler import build_tree, emit, optimize
+from functions import FunctionSpec, BUILTIN_FUNCTIONS, int_power
+from program import (Program, BINARY_OPCODES, OP_CONST, OP_VAR, OP_ADD, OP_SUB,
+                     OP_MUL, OP_DIV, OP_POW, OP_NEG, OP_CALL1, OP_CALLN, OP_STORE, OP_LOAD)
+from syntax import TOKEN_PATTERN, OPERATOR_ALIASES, parse
+
+
+OPERATOR_CHARS = frozenset('+-*/^(),')
+UNARY_PREFIXES = frozenset('(+-*/^,')
+
+# Postfix token for prefix minus; binds tighter than * and / but looser than ^.
+UNARY_MINUS = '~'
+PREFIX_PRECEDENCE = 2.5
+
+ANGLE_MODES = ('DEG', 'RAD')
+
+EvalContext = namedtuple('EvalContext', ['angle_mode', 'backend'], defaults=(None,))
+
+
+class CompiledExpression:
+    def __init__(self, engine, source, program, backend=None):
+        self.engine = engine
+        self.source = source
+        self.backend = backend
+        self.raw_program = program
+        self.variables = program.variables
+        self.evaluations = 0
+        self._programs = {}
+        self._functions = {}
+
+    @property
+    def program(self):
+        return self.program_for(self.engine.angle_mode)
+
+    def program_for(self, angle_mode):
+        program = self._programs.get(angle_mode)
+        if program is None:
+            program = self.raw_program
+            if self.engine.optimize_programs and self.backend is None:
+                program = optimize(program, angle_mode)
+            self._programs[angle_mode] = program
+        return program
+
+    def function_for(self, angle_mode):
+        function = self._functions.get(angle_mode)
+        if function is None:
+            function = self._functions[angle_mode] = generate(self.program_for(angle_mode), angle_mode)
+        return function
+
+    def bind(self, bindings=None, **kwargs):
+        if kwargs:
+            bindings = dict(bindings or {}, **kwargs)
+        bindings = bindings or {}
+        for name in self.variables:
+            if name not in bindings:
+                raise ValueError(f"Unbound variable: {name}")
+        return bindings
+
+    def stats(self, angle_mode=None):
+        program = self.program_for(angle_mode or self.engine.angle_mode)
+        return dict(program.stats or emit(build_tree(program)).stats)
+
+    def evaluate(self, bindings=None, context=None, **kwargs):
+        if context is None:
+            angle_mode = self.engine.angle_mode
+        elif context.backend != self.backend:
+            return self.engine.compile(self.source, context.backend).evaluate(bindings, context, **kwargs)
+        else:
+            angle_mode = context.angle_mode
+
+        function = self._functions.get(angle_mode)
+        if function is not None and self.engine.instrumentation is None:
+            if kwargs:
+                bindings = dict(bindings or {}, **kwargs)
+            return function(bindings or {})
+        sink = self.engine.instrumentation
+        if sink is not None:
+            return self._evaluate_instrumented(sink, self.bind(bindings, **kwargs), angle_mode)
+        if self.backend is not None:
+            return self.backend.run(self.raw_program, self.bind(bindings, **kwargs), angle_mode)
+
+        engine = self.engine
+        self.evaluations += 1
+        if self.evaluations <= engine.optimize_after:
+            program = self.raw_program
+        elif engine.native_after is not None and self.evaluations > engine.native_after:
+            return self.function_for(angle_mode)(self.bind(bindings, **kwargs))
+        else:
+            program = self.program_for(angle_mode)
+        return engine.run(program, self.bind(bindings, **kwargs), angle_mode)
+
+    def _evaluate_instrumented(self, sink, variables, angle_mode):
+        if self.backend is not None:
+            # Decimal and Fraction programs are timed as a whole; per-function
+            # timings only cover the float interpreter.
+            run = self.backend.run
+            program = self.raw_program
+        else:
+            run = self.engine.run
+            self.evaluations += 1
+            if self.evaluations <= self.engine.optimize_after:
+                program = self.raw_program
+            elif angle_mode in self._programs:
+                program = self._programs[angle_mode]
+            else:
+                start = time.perf_counter()
+                program = self.program_for(angle_mode)
+                sink.record_stage('optimize', time.perf_counter() - start)
+            program = sink.wrap(program)
+
+        start = time.perf_counter()
+        try:
+            return run(program, variables, angle_mode)
+        finally:
+            sink.record_stage('run', time.perf_counter() - start)
+
+    def __call__(self, bindings=None, **kwargs):
+        return self.evaluate(bindings, **kwargs)
+
+    def __repr__(self):
+        return f"CompiledExpression({self.source!r})"
 
 
 class MathEngine:
-    def __init__(self):
+    def __init__(self, cache_size=256, optimize_programs=True):
         self.precedence = {'+': 1, '-': 1, '*': 2, '/': 2, '^': 3}
         self.right_assoc = {'^'}
         self.angle_mode = 'DEG'
 
-        self.functions = {
-            'sin', 'cos', 'tan', 'sqrt', 'log10', 'ln', 'exp',
-            'fact', 'inv', 'sinh', 'cosh', 'tanh', 'pow10', 'root',
-            'asin', 'acos', 'atan', 'asinh', 'acosh', 'atanh'
-        }
+        self.functions = dict(BUILTIN_FUNCTIONS)
 
         self.constants = {
             'pi': math.pi,
             'e': math.e
         }
 
+        self.optimize_programs = optimize_programs
+        self.optimize_after = 1
+        self.native_after = 8
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._generation = 0
+        self.instrumentation = None
+
     def set_angle_mode(self, mode):
-        if mode in ['DEG', 'RAD']:
+        if mode in ANGLE_MODES:
             self.angle_mode = mode
 
     def get_angle_mode(self):
@@ -29,61 +162,136 @@ class MathEngine:
         self.angle_mode = 'RAD' if self.angle_mode == 'DEG' else 'DEG'
         return self.angle_mode
 
-    def tokenize(self, expression):
+    def context(self, angle_mode=None, backend=None, precision=50):
+        angle_mode = angle_mode or self.angle_mode
+        if angle_mode not in ANGLE_MODES:
+            raise ValueError(f"Invalid angle mode: {angle_mode}")
+        if isinstance(backend, str):
+            from numeric import get_backend
+
+            backend = get_backend(backend, precision)
+        return EvalContext(angle_mode, backend)
+
+    def set_cache_size(self, size):
+        with self._cache_lock:
+            self.cache_size = max(0, int(size))
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+            self._generation += 1
+            self.cache_hits = 0
+            self.cache_misses = 0
+
+    def _invalidate_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+            self._generation += 1
+
+    def cache_info(self):
+        with self._cache_lock:
+            return {
+                'hits': self.cache_hits,
+                'misses': self.cache_misses,
+                'size': len(self._cache),
+                'maxsize': self.cache_size,
+            }
+
+    def normalize(self, expression):
         expression = expression.replace(' ', '')
-        expression = expression.replace('×', '*').replace('÷', '/')
+        return expression.replace('×', '*').replace('÷', '/')
 
+    def tokenize(self, expression, backend=None):
+        # Spaces are dropped rather than scanned, so "1 2" still reads as 12.
+        expression = expression.replace(' ', '')
         tokens = []
-        i = 0
-
-        while i < len(expression):
-            if expression[i].isdigit() or expression[i] == '.':
-                num = ''
-                has_dot = False
-                while i < len(expression) and (expression[i].isdigit() or expression[i] == '.'):
-                    if expression[i] == '.':
-                        if has_dot:
-                            raise ValueError("Invalid number format")
-                        has_dot = True
-                    num += expression[i]
-                    i += 1
-                if num and num != '.':
-                    tokens.append(num)
+        append = tokens.append
+        functions = self.functions
+        constants = self.constants
+        to_number = float if backend is None else backend.number
+        after_number = False
+
+        for number, name, call, op, space, error in TOKEN_PATTERN.findall(expression):
+            if number:
+                if after_number:
+                    raise ValueError("Invalid number format")
+                append(to_number(number))
+                after_number = True
                 continue
 
-            if expression[i].isalpha():
-                func = ''
-                while i < len(expression) and expression[i].isalpha():
-                    func += expression[i]
-                    i += 1
-
-                if func in self.functions:
-                    tokens.append(func)
-                elif func in self.constants:
-                    tokens.append(str(self.constants[func]))
+            if name:
+                if name in functions:
+                    append(name)
+                elif name in constants:
+                    if backend is None:
+                        append(float(constants[name]))
+                    else:
+                        append(backend.constant(name, constants[name]))
+                elif call:
+                    raise ValueError(f"Unknown function: {name}")
                 else:
-                    raise ValueError(f"Unknown function: {func}")
-                continue
+                    append(name)
+                if call:
+                    append('(')
+
+            elif op:
+                append(OPERATOR_ALIASES.get(op, op))
 
-            if expression[i] in '+-*/^(),':
-                tokens.append(expression[i])
-                i += 1
+            elif space:
                 continue
 
-            raise ValueError(f"Unknown character: {expression[i]}")
+            elif error == '.':
+                raise ValueError("Invalid number format")
+
+            else:
+                raise ValueError(f"Unknown character: {error}")
+
+            after_number = False
 
         return tokens
 
+    def _ends_operand(self, token):
+        if type(token) is not str:
+            return True
+        return token == ')' or (token not in OPERATOR_CHARS and token not in self.functions)
+
+    def _push_operator(self, token, output, stack):
+        precedence = self.precedence[token]
+        while stack:
+            top = stack[-1]
+            if top == UNARY_MINUS:
+                top_precedence = PREFIX_PRECEDENCE
+            elif top in self.precedence:
+                top_precedence = self.precedence[top]
+            else:
+                break
+            if (top_precedence > precedence or
+                    (top_precedence == precedence and token not in self.right_assoc)):
+                output.append(stack.pop())
+            else:
+                break
+        stack.append(token)
+
     def infix_to_postfix(self, tokens):
         output = []
         stack = []
         prev_token = None
 
         for token in tokens:
-            if token in self.functions:
+            # Implicit multiplication: 2pi, 3(4+5), (1+2)(3+4), 2sin(30)
+            if (prev_token is not None and self._ends_operand(prev_token) and
+                    (type(token) is not str or token == '(' or token not in OPERATOR_CHARS)):
+                self._push_operator('*', output, stack)
+
+            if type(token) is not str:
+                output.append(token)
+
+            elif token in self.functions:
                 stack.append(token)
 
-            elif token not in '+-*/^(),':
+            elif token not in OPERATOR_CHARS:
                 output.append(token)
 
             elif token == '(':
@@ -103,18 +311,12 @@ class MathEngine:
                 while stack and stack[-1] != '(':
                     output.append(stack.pop())
 
+            elif token in '+-' and (prev_token is None or prev_token in UNARY_PREFIXES):
+                if token == '-':
+                    stack.append(UNARY_MINUS)
+
             elif token in self.precedence:
-                if token == '-' and (prev_token is None or prev_token in '(+-*/^,'):
-                    output.append('0')
-
-                while (stack and
-                       stack[-1] != '(' and
-                       stack[-1] in self.precedence and
-                       (self.precedence[stack[-1]] > self.precedence[token] or
-                        (self.precedence[stack[-1]] == self.precedence[token] and
-                         token not in self.right_assoc))):
-                    output.append(stack.pop())
-                stack.append(token)
+                self._push_operator(token, output, stack)
 
             prev_token = token
 
@@ -125,145 +327,57 @@ class MathEngine:
 
         return output
 
+    def parse(self, expression, backend=None):
+        source = self.normalize(expression)
+        if not source:
+            raise ValueError("Empty expression")
+        return build_tree(parse(self.functions, self.constants, source, backend))
+
+    def register_function(self, name, func, arity=1, check=None, angle=None, array_func=None, pure=True,
+                          derivative=None):
+        if not name.isidentifier():
+            raise ValueError(f"Invalid function name: {name}")
+        if name in self.constants:
+            raise ValueError(f"Reserved name: {name}")
+
+        spec = FunctionSpec(name, func, arity, check, angle, array_func, pure, derivative)
+        self.functions[name] = spec
+        self._invalidate_cache()
+        return spec
+
+    def unregister_function(self, name):
+        if name not in self.functions:
+            raise ValueError(f"Unknown function: {name}")
+        del self.functions[name]
+        self._invalidate_cache()
+
     def apply_function(self, func, *args):
-        if func == 'sin':
-            angle = args[0]
-            if self.angle_mode == 'DEG':
-                angle = math.radians(angle)
-            return math.sin(angle)
-
-        elif func == 'cos':
-            angle = args[0]
-            if self.angle_mode == 'DEG':
-                angle = math.radians(angle)
-            return math.cos(angle)
-
-        elif func == 'tan':
-            angle = args[0]
-            if self.angle_mode == 'DEG':
-                angle = math.radians(angle)
-            if abs(math.cos(angle)) < 1e-10:
-                raise ValueError("tan undefined")
-            return math.tan(angle)
-
-        elif func == 'sinh':
-            return math.sinh(args[0])
-
-        elif func == 'cosh':
-            return math.cosh(args[0])
-
-        elif func == 'tanh':
-            return math.tanh(args[0])
-
-        elif func == 'asin':
-            if args[0] < -1 or args[0] > 1:
-                raise ValueError("asin domain error")
-            result = math.asin(args[0])
-            if self.angle_mode == 'DEG':
-                result = math.degrees(result)
-            return result
-
-        elif func == 'acos':
-            if args[0] < -1 or args[0] > 1:
-                raise ValueError("acos domain error")
-            result = math.acos(args[0])
-            if self.angle_mode == 'DEG':
-                result = math.degrees(result)
-            return result
-
-        elif func == 'atan':
-            result = math.atan(args[0])
-            if self.angle_mode == 'DEG':
-                result = math.degrees(result)
-            return result
-
-        elif func == 'asinh':
-            return math.asinh(args[0])
-
-        elif func == 'acosh':
-            if args[0] < 1:
-                raise ValueError("acosh domain error")
-            return math.acosh(args[0])
-
-        elif func == 'atanh':
-            if args[0] <= -1 or args[0] >= 1:
-                raise ValueError("atanh domain error")
-            return math.atanh(args[0])
-
-        elif func == 'sqrt':
-            if args[0] < 0:
-                raise ValueError("sqrt of negative")
-            return math.sqrt(args[0])
-
-        elif func == 'log10':
-            if args[0] <= 0:
-                raise ValueError("log of non-positive")
-            return math.log10(args[0])
-
-        elif func == 'ln':
-            if args[0] <= 0:
-                raise ValueError("ln of non-positive")
-            return math.log(args[0])
-
-        elif func == 'exp':
-            try:
-                return math.exp(args[0])
-            except OverflowError:
-                raise ValueError("exp too large")
-
-        elif func == 'pow10':
-            try:
-                return 10 ** args[0]
-            except OverflowError:
-                raise ValueError("pow10 too large")
-
-        elif func == 'fact':
-            if args[0] < 0:
-                raise ValueError("factorial negative")
-            if args[0] != int(args[0]):
-                raise ValueError("factorial integer only")
-            if args[0] > 170:
-                raise ValueError("factorial too large")
-            return math.factorial(int(args[0]))
-
-        elif func == 'inv':
-            if args[0] == 0:
-                raise ZeroDivisionError("1/x where x=0")
-            return 1.0 / args[0]
-
-        elif func == 'root':
-            if len(args) != 2:
-                raise ValueError("root needs 2 args")
-            n, x = args
-            if n == 0:
-                raise ValueError("root index 0")
-            if x < 0 and int(n) == n and int(n) % 2 == 0:
-                raise ValueError("even root negative")
-            if x == 0:
-                return 0
-            if x < 0:
-                return -(abs(x) ** (1.0 / n))
-            return x ** (1.0 / n)
-
-        raise ValueError(f"Unknown function: {func}")
-
-    def evaluate_postfix(self, tokens):
+        spec = self.functions.get(func)
+        if spec is None:
+            raise ValueError(f"Unknown function: {func}")
+        if len(args) != spec.arity:
+            raise ValueError(spec.arity_error())
+        return spec(self.angle_mode, *args)
+
+    def evaluate_postfix(self, tokens, variables=None):
         stack = []
 
         for token in tokens:
-            if token in self.functions:
-                if token == 'root':
-                    if len(stack) < 2:
-                        raise ValueError("root needs 2 args")
-                    x = stack.pop()
-                    n = stack.pop()
-                    result = self.apply_function(token, n, x)
-                else:
-                    if len(stack) < 1:
-                        raise ValueError(f"{token} needs arg")
-                    arg = stack.pop()
-                    result = self.apply_function(token, arg)
-                stack.append(result)
+            if type(token) is not str:
+                stack.append(token)
+
+            elif token == UNARY_MINUS:
+                if not stack:
+                    raise ValueError("Invalid expression")
+                stack.append(0.0 - stack.pop())
+
+            elif token in self.functions:
+                spec = self.functions[token]
+                if len(stack) < spec.arity:
+                    raise ValueError(spec.arity_error())
+                args = stack[len(stack) - spec.arity:]
+                del stack[len(stack) - spec.arity:]
+                stack.append(spec(self.angle_mode, *args))
 
             elif token in self.precedence:
                 if len(stack) < 2:
@@ -289,6 +403,8 @@ class MathEngine:
                         raise ValueError("Number too large")
 
                 stack.append(result)
+            elif variables and token in variables:
+                stack.append(float(variables[token]))
             else:
                 try:
                     stack.append(float(token))
@@ -300,12 +416,223 @@ class MathEngine:
 
         return stack[0]
 
-    def evaluate(self, expression):
+    def assemble(self, postfix):
+        ops = []
+        args = []
+        depth = 0
+
+        for token in postfix:
+            if type(token) is not str:
+                ops.append(OP_CONST)
+                args.append(token)
+                depth += 1
+
+            elif token in self.functions:
+                spec = self.functions[token]
+                if depth < spec.arity:
+                    raise ValueError(spec.arity_error())
+                ops.append(OP_CALL1 if spec.arity == 1 else OP_CALLN)
+                args.append(spec)
+                depth += 1 - spec.arity
+
+            elif token in BINARY_OPCODES:
+                if depth < 2:
+                    raise ValueError("Invalid expression")
+                ops.append(BINARY_OPCODES[token])
+                args.append(None)
+                depth -= 1
+
+            elif token == UNARY_MINUS:
+                if depth < 1:
+                    raise ValueError("Invalid expression")
+                ops.append(OP_NEG)
+                args.append(None)
+
+            elif token.isidentifier():
+                ops.append(OP_VAR)
+                args.append(token)
+                depth += 1
+
+            else:
+                try:
+                    value = float(token)
+                except ValueError:
+                    raise ValueError(f"Invalid number: {token}")
+                ops.append(OP_CONST)
+                args.append(value)
+                depth += 1
+
+        if depth != 1:
+            raise ValueError("Invalid expression")
+
+        return Program(ops, args)
+
+    def run(self, program, variables=None, angle_mode=None):
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        angle_mode = angle_mode or self.angle_mode
+        slots = [None] * program.slots
+
+        for op, arg in program.code:
+            if op == OP_CONST:
+                push(arg)
+            elif op == OP_VAR:
+                push(float(variables[arg]))
+            elif op == OP_ADD:
+                right = pop()
+                push(pop() + right)
+            elif op == OP_SUB:
+                right = pop()
+                push(pop() - right)
+            elif op == OP_MUL:
+                right = pop()
+                push(pop() * right)
+            elif op == OP_DIV:
+                right = pop()
+                if right == 0:
+                    raise ZeroDivisionError("Division by zero")
+                push(pop() / right)
+            elif op == OP_POW:
+                right = pop()
+                try:
+                    push(pop() ** right if type(right) is not int else int_power(pop(), right))
+                except OverflowError:
+                    raise ValueError("Number too large")
+            elif op == OP_CALL1:
+                push(arg(angle_mode, pop()))
+            elif op == OP_LOAD:
+                push(slots[arg])
+            elif op == OP_STORE:
+                slots[arg] = stack[-1]
+            elif op == OP_NEG:
+                push(0.0 - pop())
+            else:
+                arity = arg.arity
+                args = stack[len(stack) - arity:]
+                del stack[len(stack) - arity:]
+                push(arg(angle_mode, *args))
+
+        return stack[0]
+
+    def compile(self, expression, backend=None):
+        source = self.normalize(expression)
+        if not source:
+            raise ValueError("Empty expression")
+
+        key = source if backend is None else (source, backend.key)
+
+        with self._cache_lock:
+            compiled = self._cache.get(key)
+            if compiled is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+                generation = self._generation
+
+        sink = self.instrumentation
+        if sink is not None:
+            sink.record_cache(compiled is not None)
+        if compiled is not None:
+            return compiled
+
+        if sink is None:
+            program = parse(self.functions, self.constants, source, backend)
+        else:
+            start = time.perf_counter()
+            program = parse(self.functions, self.constants, source, backend)
+            sink.record_stage('parse', time.perf_counter() - start)
+        compiled = CompiledExpression(self, source, program, backend)
+
+        with self._cache_lock:
+            if self.cache_size > 0 and generation == self._generation:
+                compiled = self._cache.setdefault(key, compiled)
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return compiled
+
+    def evaluate(self, expression, variables=None, context=None):
+        sink = self.instrumentation
+        if sink is not None:
+            return self._evaluate_instrumented(sink, expression, variables, context)
+
         if not expression or expression.strip() == '':
             raise ValueError("Empty expression")
 
-        tokens = self.tokenize(expression)
-        postfix = self.infix_to_postfix(tokens)
-        result = self.evaluate_postfix(postfix)
+        return self._compile_for(expression, context).evaluate(variables, context)
+
+    def _compile_for(self, expression, context):
+        if context is None or context.backend is None:
+            return self.compile(expression)
+        return self.compile(expression, context.backend)
+
+    def _evaluate_instrumented(self, sink, expression, variables, context):
+        start = time.perf_counter()
+        try:
+            if not expression or expression.strip() == '':
+                raise ValueError("Empty expression")
+            return self._compile_for(expression, context).evaluate(variables, context)
+        except Exception as e:
+            sink.record_error(str(e))
+            raise
+        finally:
+            sink.record_stage('evaluate', time.perf_counter() - start)
+
+    def profile(self, sink=None):
+        from instrumentation import profile
+
+        return profile(self, sink)
+
+    def evaluate_many(self, expressions, workers=None, chunksize=256, context=None):
+        from batch import evaluate_many
+
+        return evaluate_many(self, expressions, workers, chunksize, context)
+
+    def gradient(self, expression, at=None, wrt=None, context=None):
+        from autodiff import run_dual
+
+        angle_mode = context.angle_mode if context is not None else self.angle_mode
+        compiled = self.compile(expression)
+        names = compiled.variables if wrt is None else [wrt] if isinstance(wrt, str) else wrt
+        _, tangent = run_dual(compiled.program_for(angle_mode), compiled.bind(at), names, angle_mode)
+        if isinstance(wrt, str):
+            return tangent[0]
+        return dict(zip(names, tangent))
+
+    def jacobian(self, expressions, at=None, wrt=None, context=None):
+        from autodiff import run_dual
+
+        angle_mode = context.angle_mode if context is not None else self.angle_mode
+        compiled = [self.compile(expression) for expression in expressions]
+        if wrt is None:
+            wrt = sorted({name for expression in compiled for name in expression.variables})
+        return [run_dual(expression.program_for(angle_mode), expression.bind(at), wrt, angle_mode)[1]
+                for expression in compiled]
+
+    def integrate(self, expression, var, a, b, tol=1e-10, variables=None, context=None):
+        from quadrature import integrate
+
+        return integrate(self, expression, var, a, b, tol, variables, context)
+
+    def solve(self, expression, var, bracket=None, x0=None, tol=1e-12, variables=None, context=None):
+        from solver import solve
+
+        return solve(self, expression, var, bracket, x0, tol, variables, context)
+
+    def roots(self, expression, var, a, b, samples=1000, tol=1e-12, variables=None, context=None):
+        from solver import roots
+
+        return roots(self, expression, var, a, b, samples, tol, variables, context)
+
+    def evaluate_array(self, expression, context=None, **arrays):
+        from vectorized import run_array
+
+        for name in arrays:
+            if name in self.functions or name in self.constants:
+                raise ValueError(f"Reserved name: {name}")
 
-        return result
\ No newline at end of file
+        angle_mode = context.angle_mode if context is not None else self.angle_mode
+        compiled = self.compile(expression)
+        return run_array(compiled.program_for(angle_mode), compiled.bind(arrays), angle_mode)
\ No newline at end of file
@@ -0,0 +1,9 @@
+def format_result(result):
+    if 1e10 > abs(result) > 1e-10:
+        return f"{result:.10g}"
+    return f"{result:.6e}"
+
+
+def format_error(error):
+    message = str(error)
+    return message if len(message) < 30 else "Error"
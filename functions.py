@@ -0,0 +1,184 @@
+import math
+from functools import lru_cache
+
+
+class FunctionSpec:
+    __slots__ = ('name', 'func', 'arity', 'check', 'angle', 'array_func', 'pure', 'derivative')
+
+    def __init__(self, name, func, arity=1, check=None, angle=None, array_func=None, pure=True, derivative=None):
+        if angle not in (None, 'in', 'out'):
+            raise ValueError(f"Invalid angle conversion: {angle}")
+        self.name = name
+        self.func = func
+        self.arity = arity
+        self.check = check
+        self.angle = angle
+        self.array_func = array_func
+        self.pure = pure
+        self.derivative = derivative
+
+    def arity_error(self):
+        if self.arity == 1:
+            return f"{self.name} needs arg"
+        return f"{self.name} needs {self.arity} args"
+
+    def __call__(self, angle_mode, *args):
+        if self.check is not None:
+            self.check(*args)
+        if self.angle is None or angle_mode != 'DEG':
+            return self.func(*args)
+        if self.angle == 'in':
+            return self.func(*[math.radians(arg) for arg in args])
+        return math.degrees(self.func(*args))
+
+    def __repr__(self):
+        return f"FunctionSpec({self.name!r}, arity={self.arity})"
+
+
+def _tan(angle):
+    if abs(math.cos(angle)) < 1e-10:
+        raise ValueError("tan undefined")
+    return math.tan(angle)
+
+
+def _exp(x):
+    try:
+        return math.exp(x)
+    except OverflowError:
+        raise ValueError("exp too large")
+
+
+def _pow10(x):
+    try:
+        return 10 ** x
+    except OverflowError:
+        raise ValueError("pow10 too large")
+
+
+FACTORIAL_TABLE_SIZE = 171
+FACTORIALS = tuple(math.factorial(n) for n in range(FACTORIAL_TABLE_SIZE))
+# The float backend works in floats throughout; exact integers are only
+# handed out to the Decimal and Fraction backends via exact_factorial.
+FLOAT_FACTORIALS = tuple(float(n) for n in FACTORIALS)
+
+
+@lru_cache(maxsize=256)
+def _large_factorial(n):
+    return math.factorial(n)
+
+
+def exact_factorial(n):
+    if n < FACTORIAL_TABLE_SIZE:
+        return FACTORIALS[n]
+    return _large_factorial(n)
+
+
+# Exact integer powers run inside one C call that holds the GIL, so a huge
+# one freezes every other thread (the GUI included) until it finishes.
+MAX_POWER_BITS = 1 << 22
+
+
+def int_power(base, exponent):
+    if (type(base) is int and type(exponent) is int and exponent > 0
+            and (base.bit_length() - 1) * exponent > MAX_POWER_BITS):
+        raise ValueError("Number too large")
+    return base ** exponent
+
+
+def _fact(x):
+    if x % 1 == 0:
+        return FLOAT_FACTORIALS[int(x)]
+    try:
+        return math.gamma(x + 1)
+    except OverflowError:
+        raise ValueError("factorial too large")
+    except ValueError:
+        raise ValueError("factorial negative")
+
+
+def _inv(x):
+    return 1.0 / x
+
+
+def _root(n, x):
+    if x == 0:
+        return 0
+    if x < 0:
+        return -(abs(x) ** (1.0 / n))
+    return x ** (1.0 / n)
+
+
+def _check_unit_interval(name):
+    def check(x):
+        if x < -1 or x > 1:
+            raise ValueError(f"{name} domain error")
+    return check
+
+
+def _check_acosh(x):
+    if x < 1:
+        raise ValueError("acosh domain error")
+
+
+def _check_atanh(x):
+    if x <= -1 or x >= 1:
+        raise ValueError("atanh domain error")
+
+
+def _check_sqrt(x):
+    if x < 0:
+        raise ValueError("sqrt of negative")
+
+
+def _check_log10(x):
+    if x <= 0:
+        raise ValueError("log of non-positive")
+
+
+def _check_ln(x):
+    if x <= 0:
+        raise ValueError("ln of non-positive")
+
+
+def _check_fact(x):
+    integer = x % 1 == 0
+    if x > 170 and (integer or x == math.inf):
+        raise ValueError("factorial too large")
+    if x < 0 and integer:
+        raise ValueError("factorial negative")
+
+
+def _check_inv(x):
+    if x == 0:
+        raise ZeroDivisionError("1/x where x=0")
+
+
+def _check_root(n, x):
+    if n == 0:
+        raise ValueError("root index 0")
+    if x < 0 and int(n) == n and int(n) % 2 == 0:
+        raise ValueError("even root negative")
+
+
+BUILTIN_FUNCTIONS = {spec.name: spec for spec in (
+    FunctionSpec('sin', math.sin, angle='in'),
+    FunctionSpec('cos', math.cos, angle='in'),
+    FunctionSpec('tan', _tan, angle='in'),
+    FunctionSpec('sinh', math.sinh),
+    FunctionSpec('cosh', math.cosh),
+    FunctionSpec('tanh', math.tanh),
+    FunctionSpec('asin', math.asin, check=_check_unit_interval('asin'), angle='out'),
+    FunctionSpec('acos', math.acos, check=_check_unit_interval('acos'), angle='out'),
+    FunctionSpec('atan', math.atan, angle='out'),
+    FunctionSpec('asinh', math.asinh),
+    FunctionSpec('acosh', math.acosh, check=_check_acosh),
+    FunctionSpec('atanh', math.atanh, check=_check_atanh),
+    FunctionSpec('sqrt', math.sqrt, check=_check_sqrt),
+    FunctionSpec('log10', math.log10, check=_check_log10),
+    FunctionSpec('ln', math.log, check=_check_ln),
+    FunctionSpec('exp', _exp),
+    FunctionSpec('pow10', _pow10),
+    FunctionSpec('fact', _fact, check=_check_fact),
+    FunctionSpec('inv', _inv, check=_check_inv),
+    FunctionSpec('root', _root, arity=2, check=_check_root),
+)}
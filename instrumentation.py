@@ -0,0 +1,131 @@
+import json
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+from program import Program, OP_CALL1, OP_CALLN
+
+
+class TimedFunction:
+    __slots__ = ('spec', 'sink', 'name', 'arity')
+
+    def __init__(self, spec, sink):
+        self.spec = spec
+        self.sink = sink
+        self.name = spec.name
+        self.arity = spec.arity
+
+    def __call__(self, angle_mode, *args):
+        start = time.perf_counter()
+        try:
+            return self.spec(angle_mode, *args)
+        finally:
+            self.sink.record_call(self.name, time.perf_counter() - start)
+
+
+class Aggregator:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Wrapped copies live only as long as the program they time.
+        self._programs = weakref.WeakKeyDictionary()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self.calls = {}
+            self.errors = {}
+            self.cache_hits = 0
+            self.cache_misses = 0
+            self._programs.clear()
+
+    def record_stage(self, stage, seconds):
+        with self._lock:
+            entry = self.stages.get(stage)
+            if entry is None:
+                self.stages[stage] = [1, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+
+    def record_call(self, name, seconds):
+        with self._lock:
+            entry = self.calls.get(name)
+            if entry is None:
+                self.calls[name] = [1, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+
+    def record_cache(self, hit):
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    def record_error(self, message):
+        with self._lock:
+            self.errors[message] = self.errors.get(message, 0) + 1
+
+    def wrap(self, program):
+        with self._lock:
+            wrapped = self._programs.get(program)
+        if wrapped is not None:
+            return wrapped
+
+        args = [TimedFunction(arg, self) if op == OP_CALL1 or op == OP_CALLN else arg
+                for op, arg in program.code]
+        wrapped = Program(program.ops, args, program.slots, program.stats)
+        with self._lock:
+            return self._programs.setdefault(program, wrapped)
+
+    def snapshot(self):
+        with self._lock:
+            lookups = self.cache_hits + self.cache_misses
+            return {
+                'stages': {stage: {'count': count, 'seconds': seconds}
+                           for stage, (count, seconds) in self.stages.items()},
+                'functions': {name: {'calls': count, 'seconds': seconds}
+                              for name, (count, seconds) in self.calls.items()},
+                'cache': {
+                    'hits': self.cache_hits,
+                    'misses': self.cache_misses,
+                    'hit_rate': self.cache_hits / lookups if lookups else 0.0,
+                },
+                'errors': dict(self.errors),
+            }
+
+
+class JsonDumpSink(Aggregator):
+    def __init__(self, path, interval=60.0):
+        super().__init__()
+        self.path = path
+        self.interval = interval
+        self._next_dump = time.monotonic() + interval
+
+    def record_stage(self, stage, seconds):
+        super().record_stage(stage, seconds)
+        if time.monotonic() >= self._next_dump:
+            self.dump()
+
+    def dump(self):
+        self._next_dump = time.monotonic() + self.interval
+        document = dict(self.snapshot(), timestamp=time.time())
+        with open(self.path, 'w', encoding='utf-8') as handle:
+            json.dump(document, handle, indent=2, sort_keys=True)
+
+    def close(self):
+        self.dump()
+
+
+@contextmanager
+def profile(engine, sink=None):
+    sink = sink or Aggregator()
+    previous = engine.instrumentation
+    engine.instrumentation = sink
+    try:
+        yield sink
+    finally:
+        engine.instrumentation = previous
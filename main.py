@@ -1,12 +1,54 @@
 import sys
+import time
+
+STARTED = time.perf_counter()
+
+from PySide6.QtCore import QEvent, QObject
 from PySide6.QtWidgets import QApplication
 from controller import CalculatorController
+from ui import STYLESHEET
+
+
+class StartupTimer(QObject):
+    def __init__(self, started, imported, app):
+        super().__init__()
+        self.started = started
+        self.imported = imported
+        self.constructed = None
+        self.app = app
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint and self.constructed is not None:
+            painted = time.perf_counter()
+            watched.removeEventFilter(self)
+            self.report(painted)
+            self.app.quit()
+        return False
+
+    def report(self, painted):
+        stages = (("import", self.started, self.imported),
+                  ("construction", self.imported, self.constructed),
+                  ("first paint", self.constructed, painted),
+                  ("total", self.started, painted))
+        for name, start, end in stages:
+            print(f"{name + ':':<14}{(end - start) * 1000:8.1f} ms", file=sys.stderr)
 
 
 def main():
+    imported = time.perf_counter()
     app = QApplication(sys.argv)
+    app.setStyleSheet(STYLESHEET)
+
+    timer = None
+    if '--startup-time' in sys.argv[1:]:
+        timer = StartupTimer(STARTED, imported, app)
+
     calculator = CalculatorController()
+    if timer is not None:
+        calculator.ui.installEventFilter(timer)
     calculator.show()
+    if timer is not None:
+        timer.constructed = time.perf_counter()
     sys.exit(app.exec())
 
 
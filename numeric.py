@@ -0,0 +1,476 @@
+from decimal import Decimal, InvalidOperation, Overflow, localcontext
+from fractions import Fraction
+from functools import lru_cache
+
+from functions import BUILTIN_FUNCTIONS, MAX_POWER_BITS, exact_factorial
+from program import (OP_CONST, OP_VAR, OP_ADD, OP_SUB, OP_MUL, OP_DIV, OP_POW,
+                     OP_CALL1, OP_NEG, OP_STORE, OP_LOAD)
+
+
+GUARD_DIGITS = 10
+MAX_FACTORIAL = 100000
+
+
+@lru_cache(maxsize=64)
+def decimal_pi(precision):
+    with localcontext() as ctx:
+        ctx.prec = precision + 2
+        three = Decimal(3)
+        lasts, t, s, n, na, d, da = 0, three, 3, 1, 0, 0, 24
+        while s != lasts:
+            lasts = s
+            n, na = n + na, na + 8
+            d, da = d + da, da + 32
+            t = (t * n) / d
+            s += t
+        ctx.prec = precision
+        return +s
+
+
+@lru_cache(maxsize=64)
+def decimal_e(precision):
+    with localcontext() as ctx:
+        ctx.prec = precision
+        return Decimal(1).exp()
+
+
+@lru_cache(maxsize=16)
+def spouge_coefficients(precision):
+    a = int(precision * 1.26) + 2
+    with localcontext() as ctx:
+        ctx.prec = precision + a
+        coefficients = [(2 * decimal_pi(ctx.prec)).sqrt()]
+        factorial = 1
+        for k in range(1, a):
+            if k > 1:
+                factorial *= k - 1
+            term = Decimal(a - k) ** (Decimal(k) - Decimal('0.5')) * Decimal(a - k).exp() / factorial
+            coefficients.append(term if k % 2 else -term)
+    return a, tuple(coefficients)
+
+
+def decimal_gamma(z, precision):
+    a, coefficients = spouge_coefficients(precision)
+    with localcontext() as ctx:
+        ctx.prec = precision + a
+        z = z - 1
+        total = coefficients[0]
+        for k in range(1, a):
+            total += coefficients[k] / (z + k)
+        base = z + a
+        result = base ** (z + Decimal('0.5')) * (-base).exp() * total
+    return +result
+
+
+@lru_cache(maxsize=64)
+def degrees_per_radian(precision):
+    with localcontext() as ctx:
+        ctx.prec = precision
+        return Decimal(180) / decimal_pi(precision)
+
+
+@lru_cache(maxsize=64)
+def radians_per_degree(precision):
+    with localcontext() as ctx:
+        ctx.prec = precision
+        return decimal_pi(precision) / Decimal(180)
+
+
+def _integer_root(value, n):
+    if value < 0 or n > 4096:
+        return None
+    if value.bit_length() < 1000:
+        root = round(value ** (1.0 / n))
+    else:
+        root = 1 << (value.bit_length() // n + 1)
+    while root ** n > value:
+        root = (root * (n - 1) + value // root ** (n - 1)) // n
+    while (root + 1) ** n <= value:
+        root += 1
+    return root if root ** n == value else None
+
+
+def _check_fact(x):
+    integer = x % 1 == 0
+    if x > MAX_FACTORIAL:
+        raise ValueError("factorial too large")
+    if x < 0 and integer:
+        raise ValueError("factorial negative")
+    return integer
+
+
+def _check_tan(cosine, precision):
+    if abs(cosine) < Decimal(10) ** -precision:
+        raise ValueError("tan undefined")
+
+
+class Backend:
+    name = None
+
+    def __eq__(self, other):
+        return isinstance(other, Backend) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __reduce__(self):
+        # Rebuilt from its precision so contexts can be sent to worker processes.
+        return type(self), (self.precision,)
+
+    @property
+    def key(self):
+        return (self.name,)
+
+    def number(self, text):
+        raise NotImplementedError
+
+    def convert(self, value):
+        raise NotImplementedError
+
+    def constant(self, name, value):
+        return self.convert(value)
+
+    def power(self, base, exponent):
+        raise NotImplementedError
+
+    def call(self, spec, angle_mode, args):
+        raise NotImplementedError
+
+    def call_foreign(self, spec, angle_mode, args):
+        return self.convert(spec(angle_mode, *[float(arg) for arg in args]))
+
+    def run(self, program, variables, angle_mode):
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        slots = [None] * program.slots
+        convert = self.convert
+
+        for op, arg in program.code:
+            if op == OP_CONST:
+                push(arg)
+            elif op == OP_VAR:
+                push(convert(variables[arg]))
+            elif op == OP_ADD:
+                right = pop()
+                push(pop() + right)
+            elif op == OP_SUB:
+                right = pop()
+                push(pop() - right)
+            elif op == OP_MUL:
+                right = pop()
+                push(pop() * right)
+            elif op == OP_DIV:
+                right = pop()
+                if right == 0:
+                    raise ZeroDivisionError("Division by zero")
+                push(pop() / right)
+            elif op == OP_POW:
+                right = pop()
+                push(self.power(pop(), right))
+            elif op == OP_CALL1:
+                push(self.call(arg, angle_mode, (pop(),)))
+            elif op == OP_NEG:
+                push(0 - pop())
+            elif op == OP_LOAD:
+                push(slots[arg])
+            elif op == OP_STORE:
+                slots[arg] = stack[-1]
+            else:
+                args = stack[len(stack) - arg.arity:]
+                del stack[len(stack) - arg.arity:]
+                push(self.call(arg, angle_mode, args))
+
+        return stack[0]
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class DecimalBackend(Backend):
+    name = 'decimal'
+
+    def __init__(self, precision=50):
+        if precision < 1:
+            raise ValueError("Precision must be positive")
+        self.precision = precision
+        self.working = precision + GUARD_DIGITS
+        self.functions = {
+            'sin': self._sin,
+            'cos': self._cos,
+            'tan': self._tan,
+            'sinh': lambda x: (x.exp() - (-x).exp()) / 2,
+            'cosh': lambda x: (x.exp() + (-x).exp()) / 2,
+            'tanh': self._tanh,
+            'asin': self._asin,
+            'acos': lambda x: self.pi() / 2 - self._asin(x),
+            'atan': self._atan,
+            'asinh': lambda x: (abs(x) + (x * x + 1).sqrt()).ln().copy_sign(x),
+            'acosh': lambda x: (x + (x * x - 1).sqrt()).ln(),
+            'atanh': lambda x: ((1 + x) / (1 - x)).ln() / 2,
+            'sqrt': lambda x: x.sqrt(),
+            'log10': lambda x: x.log10(),
+            'ln': lambda x: x.ln(),
+            'exp': lambda x: x.exp(),
+            'pow10': lambda x: Decimal(10) ** x,
+            'fact': self._factorial,
+            'inv': lambda x: 1 / x,
+            'root': self._root,
+        }
+
+    @property
+    def key(self):
+        return (self.name, self.precision)
+
+    def pi(self):
+        return decimal_pi(self.working)
+
+    def number(self, text):
+        return Decimal(text)
+
+    def convert(self, value):
+        if isinstance(value, float):
+            return Decimal(repr(value))
+        if isinstance(value, Fraction):
+            return Decimal(value.numerator) / Decimal(value.denominator)
+        return Decimal(value)
+
+    def constant(self, name, value):
+        if name == 'pi':
+            return self.pi()
+        if name == 'e':
+            return decimal_e(self.working)
+        return self.convert(value)
+
+    def power(self, base, exponent):
+        if base == 0 and exponent < 0:
+            raise ZeroDivisionError("Division by zero")
+        try:
+            if base < 0 and exponent != exponent.to_integral_value():
+                raise ValueError("Invalid power")
+            return base ** exponent
+        except Overflow:
+            raise ValueError("Number too large")
+        except InvalidOperation:
+            raise ValueError("Invalid power")
+
+    def call(self, spec, angle_mode, args):
+        impl = self.functions.get(spec.name)
+        if impl is None or BUILTIN_FUNCTIONS.get(spec.name) is not spec:
+            return self.call_foreign(spec, angle_mode, args)
+
+        if spec.name == 'fact':
+            _check_fact(*args)
+        elif spec.check is not None:
+            spec.check(*args)
+
+        if spec.angle == 'in' and angle_mode == 'DEG':
+            args = [arg * radians_per_degree(self.working) for arg in args]
+        try:
+            result = impl(*args)
+        except Overflow:
+            raise ValueError(f"{spec.name} too large")
+        if spec.angle == 'out' and angle_mode == 'DEG':
+            result *= degrees_per_radian(self.working)
+        return result
+
+    def run(self, program, variables, angle_mode):
+        with localcontext() as ctx:
+            ctx.prec = self.working
+            try:
+                result = super().run(program, variables, angle_mode)
+            except Overflow:
+                raise ValueError("Number too large")
+            except InvalidOperation:
+                raise ValueError("Math error")
+            ctx.prec = self.precision
+            return +result
+
+    def _reduce(self, x):
+        extra = max(0, x.adjusted())
+        with localcontext() as ctx:
+            ctx.prec = self.working + extra
+            return x.remainder_near(2 * decimal_pi(self.working + extra))
+
+    def _series(self, x, term, i):
+        total, previous, sign = term, None, 1
+        while total != previous:
+            previous = total
+            i += 2
+            term = term * x * x / (i * (i - 1))
+            sign = -sign
+            total += sign * term
+        return total
+
+    def _sin(self, x):
+        x = self._reduce(x)
+        return self._series(x, x, 1)
+
+    def _cos(self, x):
+        x = self._reduce(x)
+        return self._series(x, Decimal(1), 0)
+
+    def _tan(self, x):
+        cosine = self._cos(x)
+        _check_tan(cosine, self.precision)
+        return self._sin(x) / cosine
+
+    def _tanh(self, x):
+        if abs(x) > self.working:
+            return Decimal(1).copy_sign(x)
+        y = (2 * x).exp()
+        return (y - 1) / (y + 1)
+
+    def _atan(self, x):
+        if x == 0:
+            return Decimal(0)
+        if abs(x) > 1:
+            return self.pi().copy_sign(x) / 2 - self._atan(1 / x)
+
+        halvings = 0
+        while abs(x) > Decimal('0.1'):
+            x = x / (1 + (1 + x * x).sqrt())
+            halvings += 1
+
+        total, previous, term, k = x, None, x, 1
+        while total != previous:
+            previous = total
+            term = -term * x * x
+            k += 2
+            total += term / k
+        return total * (2 ** halvings)
+
+    def _asin(self, x):
+        if abs(x) == 1:
+            return self.pi().copy_sign(x) / 2
+        return self._atan(x / (1 - x * x).sqrt())
+
+    def _factorial(self, x):
+        if x % 1 == 0:
+            return Decimal(exact_factorial(int(x)))
+        if x < Decimal('-0.5'):
+            return self.pi() / (self._sin(self.pi() * (x + 1)) * self._factorial(-x - 1))
+        return decimal_gamma(x + 1, self.working)
+
+    def _root(self, n, x):
+        if x == 0:
+            return Decimal(0)
+        if x < 0:
+            return -(abs(x) ** (1 / n))
+        return x ** (1 / n)
+
+    def __repr__(self):
+        return f"DecimalBackend(precision={self.precision})"
+
+
+class FractionBackend(Backend):
+    name = 'fraction'
+
+    def __init__(self, precision=50):
+        self.precision = precision
+        self.decimal = DecimalBackend(precision)
+
+    @property
+    def key(self):
+        return (self.name, self.precision)
+
+    def number(self, text):
+        return Fraction(text)
+
+    def convert(self, value):
+        if isinstance(value, float):
+            return Fraction(repr(value))
+        return Fraction(value)
+
+    def constant(self, name, value):
+        return Fraction(self.decimal.constant(name, value))
+
+    def exact_root(self, x, n):
+        if n.denominator != 1 or n == 0:
+            return None
+        n = int(n)
+        if n < 0:
+            root = self.exact_root(x, Fraction(-n))
+            return None if root is None or root == 0 else 1 / root
+        sign = 1
+        if x < 0:
+            if n % 2 == 0:
+                return None
+            sign, x = -1, -x
+        numerator = _integer_root(x.numerator, n)
+        denominator = _integer_root(x.denominator, n)
+        if numerator is None or denominator is None:
+            return None
+        return sign * Fraction(numerator, denominator)
+
+    def power(self, base, exponent):
+        if exponent.denominator == 1:
+            bits = max(abs(base.numerator).bit_length(), base.denominator.bit_length())
+            if bits * abs(exponent.numerator) > MAX_POWER_BITS:
+                raise ValueError("Number too large")
+            if base == 0 and exponent < 0:
+                raise ZeroDivisionError("Division by zero")
+            return base ** exponent.numerator
+
+        root = self.exact_root(base, Fraction(exponent.denominator))
+        if root is not None:
+            return self.power(root, Fraction(exponent.numerator))
+        return self.approximate(lambda: self.decimal.power(self.to_decimal(base), self.to_decimal(exponent)))
+
+    def to_decimal(self, value):
+        return Decimal(value.numerator) / Decimal(value.denominator)
+
+    def approximate(self, compute):
+        with localcontext() as ctx:
+            ctx.prec = self.decimal.working
+            try:
+                result = compute()
+            except Overflow:
+                raise ValueError("Number too large")
+            except InvalidOperation:
+                raise ValueError("Math error")
+            ctx.prec = self.precision
+            return Fraction(+result)
+
+    def call(self, spec, angle_mode, args):
+        name = spec.name
+        if BUILTIN_FUNCTIONS.get(name) is not spec:
+            return self.call_foreign(spec, angle_mode, args)
+
+        if name == 'fact':
+            if _check_fact(*args):
+                return Fraction(exact_factorial(int(args[0])))
+        elif spec.check is not None:
+            spec.check(*args)
+        if name == 'inv':
+            return 1 / args[0]
+        if name == 'sqrt' or name == 'root':
+            n, x = (2, args[0]) if name == 'sqrt' else args
+            if x == 0:
+                return Fraction(0)
+            root = self.exact_root(x, Fraction(n))
+            if root is not None:
+                return root
+        elif name == 'pow10' and args[0].denominator == 1:
+            return self.power(Fraction(10), args[0])
+
+        return self.approximate(
+            lambda: self.decimal.call(spec, angle_mode, [self.to_decimal(arg) for arg in args]))
+
+    def __repr__(self):
+        return f"FractionBackend(precision={self.precision})"
+
+
+BACKENDS = {
+    'decimal': DecimalBackend,
+    'fraction': FractionBackend,
+}
+
+
+def get_backend(name, precision=50):
+    if name == 'float':
+        return None
+    backend = BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"Unknown backend: {name}")
+    return backend(precision)
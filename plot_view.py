@@ -0,0 +1,143 @@
+import math
+
+import numpy as np
+from PySide6.QtCore import Qt, QPointF, QRectF, Signal
+from PySide6.QtGui import QColor, QPainter, QPen, QPolygonF
+from PySide6.QtWidgets import QWidget
+
+from plotting import fit_range, nice_step
+
+
+DEFAULT_VIEW = (-10.0, 10.0, -5.0, 5.0)
+ZOOM_STEP = 1.25
+
+CURVE_COLOR = QColor(199, 150, 14)
+GRID_COLOR = QColor(255, 255, 255, 20)
+AXIS_COLOR = QColor(255, 255, 255, 90)
+LABEL_COLOR = QColor(255, 255, 255, 120)
+
+
+class PlotView(QWidget):
+    view_changed = Signal()
+
+    def __init__(self):
+        super().__init__()
+        self.setMinimumHeight(300)
+        self.setCursor(Qt.OpenHandCursor)
+        self.x0, self.x1, self.y0, self.y1 = DEFAULT_VIEW
+        self.autoscale = True
+        self.curve_x = None
+        self.curve_y = None
+        self.status = ""
+        self._drag = None
+
+    def pixel_width(self):
+        return max(1, int(self.width() * self.devicePixelRatioF()))
+
+    def reset_view(self):
+        self.x0, self.x1, self.y0, self.y1 = DEFAULT_VIEW
+        self.autoscale = True
+        self.update()
+        self.view_changed.emit()
+
+    def fit_y(self, ys):
+        self.y0, self.y1 = fit_range(ys)
+
+    def set_curve(self, xs, ys, status=""):
+        self.curve_x = xs
+        self.curve_y = ys
+        self.status = status
+        self.update()
+
+    def clear(self, status=""):
+        self.set_curve(None, None, status)
+
+    def _to_pixels(self, xs, ys):
+        width, height = self.width(), self.height()
+        px = (xs - self.x0) * (width / (self.x1 - self.x0))
+        py = (self.y1 - ys) * (height / (self.y1 - self.y0))
+        # Keep near-vertical lines at poles within what QPainter can draw.
+        return px, np.clip(py, -10 * height, 11 * height)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        self._paint_grid(painter)
+
+        if self.curve_x is not None and len(self.curve_x):
+            painter.setPen(QPen(CURVE_COLOR, 1))
+            px, py = self._to_pixels(self.curve_x, self.curve_y)
+            breaks = np.flatnonzero(np.isnan(px) | np.isnan(py))
+            for run_x, run_y in zip(np.split(px, breaks), np.split(py, breaks)):
+                points = [QPointF(x, y) for x, y in zip(run_x.tolist(), run_y.tolist()) if x == x]
+                if len(points) > 1:
+                    painter.drawPolyline(QPolygonF(points))
+
+        if self.status:
+            painter.setPen(LABEL_COLOR)
+            painter.drawText(QRectF(8, 6, self.width() - 16, 20), Qt.AlignRight | Qt.AlignTop, self.status)
+        painter.end()
+
+    def _paint_grid(self, painter):
+        width, height = self.width(), self.height()
+        x_step = nice_step(self.x1 - self.x0)
+        y_step = nice_step(self.y1 - self.y0)
+
+        for value in _ticks(self.x0, self.x1, x_step):
+            x = (value - self.x0) * width / (self.x1 - self.x0)
+            painter.setPen(AXIS_COLOR if value == 0 else GRID_COLOR)
+            painter.drawLine(QPointF(x, 0), QPointF(x, height))
+            painter.setPen(LABEL_COLOR)
+            painter.drawText(QPointF(x + 3, height - 4), f"{value:g}")
+
+        for value in _ticks(self.y0, self.y1, y_step):
+            y = (self.y1 - value) * height / (self.y1 - self.y0)
+            painter.setPen(AXIS_COLOR if value == 0 else GRID_COLOR)
+            painter.drawLine(QPointF(0, y), QPointF(width, y))
+            if value != 0:
+                painter.setPen(LABEL_COLOR)
+                painter.drawText(QPointF(3, y - 3), f"{value:g}")
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self._drag = (event.position(), self.x0, self.x1, self.y0, self.y1)
+            self.setCursor(Qt.ClosedHandCursor)
+
+    def mouseMoveEvent(self, event):
+        if self._drag is None:
+            return
+        start, x0, x1, y0, y1 = self._drag
+        dx = (event.position().x() - start.x()) * (x1 - x0) / self.width()
+        dy = (event.position().y() - start.y()) * (y1 - y0) / self.height()
+        self.x0, self.x1 = x0 - dx, x1 - dx
+        self.y0, self.y1 = y0 + dy, y1 + dy
+        self.autoscale = False
+        self.update()
+        self.view_changed.emit()
+
+    def mouseReleaseEvent(self, event):
+        self._drag = None
+        self.setCursor(Qt.OpenHandCursor)
+
+    def mouseDoubleClickEvent(self, event):
+        self.reset_view()
+
+    def wheelEvent(self, event):
+        factor = ZOOM_STEP ** (-event.angleDelta().y() / 120)
+        position = event.position()
+        x = self.x0 + position.x() / self.width() * (self.x1 - self.x0)
+        y = self.y1 - position.y() / self.height() * (self.y1 - self.y0)
+        self.x0, self.x1 = x - (x - self.x0) * factor, x + (self.x1 - x) * factor
+        self.y0, self.y1 = y - (y - self.y0) * factor, y + (self.y1 - y) * factor
+        self.autoscale = False
+        self.update()
+        self.view_changed.emit()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.view_changed.emit()
+
+
+def _ticks(low, high, step):
+    for i in range(math.ceil(low / step), math.floor(high / step) + 1):
+        yield i * step
@@ -0,0 +1,171 @@
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from vectorized import run_array
+
+
+# The x axis is cut into tiles whose width is a power of two, with roughly
+# TILES_PER_VIEW of them across the view. Panning and small zooms keep the
+# same tiles, so only newly exposed ones are sampled.
+TILES_PER_VIEW = 8
+TILE_SAMPLES = 256
+MAX_TILE_POINTS = 1 << 17
+REFINE_ROUNDS = 12
+
+# A vertex is refined when it strays from the chord of its neighbours by more
+# than this fraction of the tile's y range (about a pixel on a tall plot).
+TOLERANCE = 1e-3
+
+
+def tile_level(x0, x1):
+    level = math.ceil(math.log2((x1 - x0) / TILES_PER_VIEW))
+    return level, 2.0 ** level
+
+
+def sample_tile(evaluate, a, b):
+    xs = np.linspace(a, b, TILE_SAMPLES + 1)
+    ys = evaluate(xs)
+
+    for _ in range(REFINE_ROUNDS):
+        finite = np.isfinite(ys)
+        scale = np.ptp(ys[finite]) if finite.any() else 0.0
+        scale = scale if scale > 0 else 1.0
+
+        # Distance of each inner vertex from the chord through its neighbours.
+        with np.errstate(all='ignore'):
+            t = (xs[1:-1] - xs[:-2]) / (xs[2:] - xs[:-2])
+            chord = ys[:-2] + t * (ys[2:] - ys[:-2])
+            bent = np.abs(ys[1:-1] - chord) > TOLERANCE * scale
+
+        split = finite[:-1] != finite[1:]
+        split[:-1] |= bent
+        split[1:] |= bent
+        count = np.count_nonzero(split)
+        if not count or len(xs) + count > MAX_TILE_POINTS:
+            break
+
+        index = np.flatnonzero(split)
+        middle = (xs[index] + xs[index + 1]) / 2
+        xs = np.insert(xs, index + 1, middle)
+        ys = np.insert(ys, index + 1, evaluate(middle))
+
+    return xs, ys
+
+
+class PlotCache:
+    def __init__(self, engine, size=512):
+        self.engine = engine
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._tiles.clear()
+
+    def sample(self, expression, x0, x1, angle_mode, cancelled=None):
+        compiled = self.engine.compile(expression)
+        compiled.bind({'x': 0.0})
+        program = compiled.program_for(angle_mode)
+
+        def evaluate(xs):
+            return run_array(program, {'x': xs}, angle_mode).values
+
+        level, width = tile_level(x0, x1)
+        xs = []
+        ys = []
+        # Tiles are keyed by the compiled expression itself, so re-registering
+        # a function (which replaces it in the engine cache) resamples.
+        for index in range(math.floor(x0 / width), math.floor(x1 / width) + 1):
+            key = (compiled, angle_mode, level, index)
+            with self._lock:
+                tile = self._tiles.get(key)
+                if tile is not None:
+                    self._tiles.move_to_end(key)
+                    self.hits += 1
+            if tile is None:
+                if cancelled is not None and cancelled():
+                    return None
+                tile = sample_tile(evaluate, index * width, (index + 1) * width)
+                with self._lock:
+                    self.misses += 1
+                    self._tiles[key] = tile
+                    if len(self._tiles) > self.size:
+                        self._tiles.popitem(last=False)
+            # Neighbouring tiles share their boundary sample.
+            start = 1 if xs else 0
+            xs.append(tile[0][start:])
+            ys.append(tile[1][start:])
+
+        return np.concatenate(xs), np.concatenate(ys)
+
+
+def downsample(xs, ys, x0, x1, width):
+    # Keep the first, lowest, highest and last point of every pixel column,
+    # which draws the same picture as the full data. NaN separates runs that
+    # must not be joined (domain errors).
+    missing = np.isnan(ys)
+    run = np.cumsum(missing)
+    if missing.any():
+        keep = ~missing
+        xs, ys, run = xs[keep], ys[keep], run[keep]
+    if not xs.size:
+        return np.empty(0), np.empty(0)
+    column = np.floor((xs - x0) * (width / (x1 - x0)))
+
+    group = np.empty(xs.size, dtype=bool)
+    group[0] = True
+    np.not_equal(column[1:], column[:-1], out=group[1:])
+    group[1:] |= run[1:] != run[:-1]
+    starts = np.flatnonzero(group)
+    ends = np.append(starts[1:], xs.size) - 1
+
+    # Lowest and highest sit in the middle of their column, in the order that
+    # joins up with the column's first and last point.
+    low = np.minimum.reduceat(ys, starts)
+    high = np.maximum.reduceat(ys, starts)
+    rising = ys[starts] <= ys[ends]
+    out_x = np.full((len(starts), 5), np.nan)
+    out_y = np.full((len(starts), 5), np.nan)
+    out_x[:, 0] = xs[starts]
+    out_x[:, 1] = out_x[:, 2] = (xs[starts] + xs[ends]) / 2
+    out_x[:, 3] = xs[ends]
+    out_y[:, 0] = ys[starts]
+    out_y[:, 1] = np.where(rising, low, high)
+    out_y[:, 2] = np.where(rising, high, low)
+    out_y[:, 3] = ys[ends]
+
+    # Only the last group of each run keeps its NaN separator.
+    keep = np.ones((len(starts), 5), dtype=bool)
+    keep[:, 4] = np.append(run[starts[1:]] != run[starts[:-1]], False)
+    out_x, out_y = out_x[keep], out_y[keep]
+
+    # Sparse columns repeat the same sample; drop the copies.
+    repeated = np.zeros(out_x.size, dtype=bool)
+    repeated[1:] = (out_x[1:] == out_x[:-1]) & (out_y[1:] == out_y[:-1])
+    return out_x[~repeated], out_y[~repeated]
+
+
+def fit_range(ys):
+    finite = ys[np.isfinite(ys)]
+    if not finite.size:
+        return -1.0, 1.0
+    low, high = np.percentile(finite, (2, 98))
+    if high - low < 1e-12:
+        return float(low - 1.0), float(high + 1.0)
+    pad = (high - low) * 0.1
+    return float(low - pad), float(high + pad)
+
+
+def nice_step(span, count=8):
+    raw = span / count
+    magnitude = 10.0 ** math.floor(math.log10(raw))
+    for factor in (1, 2, 5, 10):
+        if raw <= factor * magnitude:
+            return factor * magnitude
+    return 10 * magnitude
@@ -0,0 +1,76 @@
+from bisect import bisect_right
+
+from syntax import Parser, ParseError, CALL, OPERATOR
+
+
+def _common_prefix(a, b):
+    limit = min(len(a), len(b))
+    i = 0
+    while i < limit and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class IncrementalParser:
+    def __init__(self, engine):
+        self.engine = engine
+        self.parser = Parser(engine.functions, engine.constants)
+        self.initial = self.parser.save()
+        self.text = ''
+        self.ends = []
+        self.checkpoints = []
+        self.error = None
+        self.reused = 0
+
+    def reset(self):
+        self.__init__(self.engine)
+
+    def _reusable(self, text):
+        count = bisect_right(self.ends, _common_prefix(text, self.text))
+        while count and not self._is_boundary(count - 1):
+            count -= 1
+        return count
+
+    def _is_boundary(self, index):
+        # Numbers and names can grow as more text arrives, and so can a sign
+        # that might still turn out to be an exponent ("1e-" -> "1e-5").
+        end, kind, text, state = self.checkpoints[index]
+        if kind == CALL:
+            return True
+        if kind != OPERATOR:
+            return False
+        return text not in '+-' or self.text[end - 2:end - 1] not in ('e', 'E')
+
+    def update(self, text):
+        text = self.engine.normalize(text)
+        count = self._reusable(text)
+        del self.ends[count:], self.checkpoints[count:]
+        self.reused = count
+
+        pos = self.ends[-1] if count else 0
+        self.text = text[:pos]
+        self.parser.restore(self.checkpoints[-1][3] if count else self.initial)
+
+        checkpoints = []
+        try:
+            self.parser.feed(text, pos, checkpoints=checkpoints)
+        except ParseError as e:
+            self.error = str(e)
+            return None
+
+        self.ends += [checkpoint[0] for checkpoint in checkpoints]
+        self.checkpoints += checkpoints
+        self.text = text
+        self.error = None
+        return self.program()
+
+    def program(self):
+        # Ending the input closes every open frame, so finish on a copy of the
+        # state. A parse error there only means the expression is incomplete.
+        state = self.parser.save()
+        try:
+            return self.parser.feed(self.text, len(self.text), final=True).program()
+        except ParseError:
+            return None
+        finally:
+            self.parser.restore(state)
@@ -0,0 +1,43 @@
+OP_CONST = 0
+OP_VAR = 1
+OP_ADD = 2
+OP_SUB = 3
+OP_MUL = 4
+OP_DIV = 5
+OP_POW = 6
+OP_CALL1 = 7
+OP_CALLN = 8
+OP_NEG = 9
+OP_STORE = 10
+OP_LOAD = 11
+
+BINARY_OPCODES = {'+': OP_ADD, '-': OP_SUB, '*': OP_MUL, '/': OP_DIV, '^': OP_POW}
+
+
+def op_arity(op, arg):
+    if op == OP_CONST or op == OP_VAR or op == OP_LOAD:
+        return 0
+    if op == OP_CALL1 or op == OP_NEG:
+        return 1
+    if op == OP_CALLN:
+        return arg.arity
+    return 2
+
+
+class Program:
+    __slots__ = ('ops', 'args', 'code', 'variables', 'slots', 'stats', 'spans', '__weakref__')
+
+    def __init__(self, ops, args, slots=0, stats=None, spans=None):
+        self.ops = ops
+        self.args = args
+        self.code = list(zip(ops, args))
+        self.variables = tuple(sorted({arg for op, arg in zip(ops, args) if op == OP_VAR}))
+        self.slots = slots
+        self.stats = stats
+        self.spans = spans
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __repr__(self):
+        return f"Program({len(self.ops)} ops, variables={self.variables})"
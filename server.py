@@ -0,0 +1,141 @@
+import asyncio
+import json
+import math
+
+from batch import evaluate_chunk, evaluate_item
+from engine import MathEngine
+from formatting import format_result, format_error
+from syntax import ParseError
+
+
+def encode_result(result):
+    if isinstance(result, ParseError):
+        return {'result': None, 'display': format_error(result), 'error': str(result),
+                'position': result.position}
+    if isinstance(result, Exception):
+        return {'result': None, 'display': format_error(result), 'error': str(result)}
+    if isinstance(result, int) or isinstance(result, float) and math.isfinite(result):
+        return {'result': result, 'display': format_result(result), 'error': None}
+    return {'result': None, 'display': str(result), 'error': "Invalid result"}
+
+
+class EvaluationServer:
+    def __init__(self, executor=None, offload_threshold=64, cache_size=4096, max_pipeline=1024,
+                 max_line=16 * 1024 * 1024):
+        self.engine = MathEngine(cache_size)
+
+        self.executor = executor
+        self.offload_threshold = offload_threshold
+        self.max_pipeline = max_pipeline
+        self.max_line = max_line
+        self.requests = 0
+
+    def evaluate(self, request):
+        context = self.engine.context(request.get('angle', 'DEG'))
+
+        if 'expressions' in request:
+            return {'results': [encode_result(evaluate_item(self.engine, expression, context))
+                                for expression in request['expressions']]}
+
+        expression = request.get('expression')
+        if not isinstance(expression, str):
+            raise ValueError("Missing expression")
+
+        try:
+            result = self.engine.evaluate(expression, request.get('variables'), context)
+        except Exception as e:
+            result = e
+        return encode_result(result)
+
+    async def evaluate_offloaded(self, request):
+        context = self.engine.context(request.get('angle', 'DEG'))
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(self.executor, evaluate_chunk, context, request['expressions'])
+        return {'results': [encode_result(result) for result in results]}
+
+    def should_offload(self, request):
+        if 'expressions' not in request:
+            return False
+        expressions = request['expressions']
+        if not isinstance(expressions, list) or not all(isinstance(item, str) for item in expressions):
+            raise ValueError("Invalid expressions")
+        return len(expressions) >= self.offload_threshold
+
+    async def respond(self, request):
+        try:
+            response = await self.evaluate_offloaded(request)
+        except Exception as e:
+            response = {'error': str(e)}
+        response['id'] = request.get('id')
+        return response
+
+    def respond_now(self, line):
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Invalid request")
+        except ValueError:
+            return None, {'id': None, 'error': "Invalid request"}
+
+        try:
+            if self.should_offload(request):
+                return request, None
+            response = self.evaluate(request)
+        except Exception as e:
+            response = {'error': str(e)}
+        response['id'] = request.get('id')
+        return request, response
+
+    async def handle_connection(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        pending = asyncio.Queue(self.max_pipeline)
+        sender = asyncio.create_task(self._send_responses(pending, writer))
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+
+                self.requests += 1
+                request, response = self.respond_now(line)
+                if response is None:
+                    future = asyncio.ensure_future(self.respond(request))
+                else:
+                    future = loop.create_future()
+                    future.set_result(response)
+                await pending.put(future)
+        finally:
+            await pending.put(None)
+            await sender
+            writer.close()
+
+    async def _send_responses(self, pending, writer):
+        connected = True
+        while True:
+            future = await pending.get()
+            if future is None:
+                break
+            response = await future
+            if not connected:
+                continue
+
+            writer.write(json.dumps(response).encode('utf-8') + b'\n')
+            if pending.empty():
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    connected = False
+
+    async def start(self, host='127.0.0.1', port=8765, unix_path=None):
+        if unix_path:
+            return await asyncio.start_unix_server(self.handle_connection, path=unix_path, limit=self.max_line)
+        return await asyncio.start_server(self.handle_connection, host, port, limit=self.max_line)
+
+
+async def serve_forever(server, host='127.0.0.1', port=8765, unix_path=None):
+    listener = await server.start(host, port, unix_path)
+    async with listener:
+        await listener.serve_forever()
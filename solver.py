@@ -0,0 +1,200 @@
+import math
+
+from autodiff import run_dual
+
+
+INFEASIBLE = (ValueError, ZeroDivisionError, OverflowError)
+EPSILON = 2.0 ** -52
+MAX_ITERATIONS = 100
+MAX_DAMPING = 60
+
+
+def _real(value):
+    # Negative bases to fractional powers come back complex, which like a
+    # domain error marks a point where the objective does not exist.
+    if isinstance(value, complex) or not math.isfinite(value):
+        return None
+    return value
+
+
+class Objective:
+    # f(var) for an expression, or lhs - rhs for an equation, with every
+    # other variable bound. Points where the engine raises a domain error
+    # evaluate to None instead of raising.
+    def __init__(self, engine, expression, var, variables=None, context=None):
+        if var in engine.functions or var in engine.constants:
+            raise ValueError(f"Reserved name: {var}")
+        left, equals, right = expression.partition('=')
+        if equals:
+            if '=' in right:
+                raise ValueError("Invalid equation")
+            expression = f"({left})-({right})"
+
+        self.compiled = engine.compile(expression)
+        self.var = var
+        self.context = context
+        self.angle_mode = context.angle_mode if context is not None else engine.angle_mode
+        self.bindings = self.compiled.bind(dict(variables or {}, **{var: 0.0}))
+
+    @property
+    def program(self):
+        return self.compiled.program_for(self.angle_mode)
+
+    def __call__(self, x):
+        self.bindings[self.var] = x
+        try:
+            return _real(self.compiled.evaluate(self.bindings, self.context))
+        except INFEASIBLE:
+            return None
+
+    def with_slope(self, x):
+        # Value and exact derivative in one pass; the slope is None where
+        # only the value exists (no derivative, or a kink like sqrt at 0).
+        self.bindings[self.var] = x
+        try:
+            value, (slope,) = run_dual(self.program, self.bindings, (self.var,), self.angle_mode)
+        except INFEASIBLE:
+            value = self(x)
+            return None if value is None else (value, None)
+        if _real(value) is None:
+            return None
+        return value, _real(slope)
+
+
+def brent(f, a, b, tol=1e-12, max_iterations=MAX_ITERATIONS):
+    a = float(a)
+    b = float(b)
+    fa = f(a)
+    fb = f(b)
+    if fa is None or fb is None:
+        raise ValueError("Bracket end is infeasible")
+    if fa == 0:
+        return a
+    if fb == 0:
+        return b
+    if (fa > 0) == (fb > 0):
+        raise ValueError("Root not bracketed")
+
+    c, fc = a, fa
+    d = e = b - a
+    for _ in range(max_iterations):
+        if (fb > 0) == (fc > 0):
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+
+        tol1 = 2 * EPSILON * abs(b) + 0.5 * tol
+        m = 0.5 * (c - b)
+        if abs(m) <= tol1 or fb == 0:
+            return b
+
+        if abs(e) >= tol1 and abs(fa) > abs(fb):
+            # Inverse quadratic interpolation, or secant when only two
+            # distinct points are known.
+            s = fb / fa
+            if a == c:
+                p = 2 * m * s
+                q = 1 - s
+            else:
+                q = fa / fc
+                r = fb / fc
+                p = s * (2 * m * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            p = abs(p)
+            if 2 * p < min(3 * m * q - abs(tol1 * q), abs(e * q)):
+                e = d
+                d = p / q
+            else:
+                d = e = m
+        else:
+            d = e = m
+
+        a, fa = b, fb
+        b += d if abs(d) > tol1 else math.copysign(tol1, m)
+        fb = f(b)
+        if fb is None:
+            b = a + m
+            d = e = m
+            fb = f(b)
+            if fb is None:
+                raise ValueError("Bracket crosses an infeasible region")
+
+    raise ValueError("Solver did not converge")
+
+
+def newton(objective, x0, tol=1e-12, max_iterations=MAX_ITERATIONS):
+    x = float(x0)
+    point = objective.with_slope(x)
+    if point is None:
+        raise ValueError("Starting point is infeasible")
+
+    for _ in range(max_iterations):
+        value, slope = point
+        if value == 0:
+            return x
+        if slope is None:
+            h = 1e-7 * (1 + abs(x))
+            nearby = objective(x + h)
+            if nearby is None:
+                h = -h
+                nearby = objective(x + h)
+            if nearby is None:
+                raise ValueError("Starting point is infeasible")
+            slope = (nearby - value) / h
+        if slope == 0 or not math.isfinite(slope):
+            raise ValueError("Zero derivative")
+
+        # Halve the step until it lands back inside the domain.
+        step = value / slope
+        for _ in range(MAX_DAMPING):
+            point = objective.with_slope(x - step)
+            if point is not None:
+                break
+            step /= 2
+        else:
+            raise ValueError("Newton left the domain")
+        x -= step
+        if abs(step) <= tol * (1 + abs(x)):
+            return x
+
+    raise ValueError("Solver did not converge")
+
+
+def solve(engine, expression, var, bracket=None, x0=None, tol=1e-12, variables=None, context=None):
+    objective = Objective(engine, expression, var, variables, context)
+    if bracket is not None:
+        return brent(objective, *bracket, tol=tol)
+    if x0 is not None:
+        return newton(objective, x0, tol)
+    raise ValueError("Need a bracket or a starting point")
+
+
+def scan(objective, a, b, samples=1000, tol=1e-12):
+    import numpy as np
+    from vectorized import run_array
+
+    points = np.linspace(float(a), float(b), samples)
+    arrays = dict(objective.bindings)
+    arrays[objective.var] = points
+    # Infeasible samples come back as NaN, which never counts as a sign change.
+    values = run_array(objective.program, arrays, objective.angle_mode).values
+
+    roots = [float(x) for x in points[values == 0]]
+    for i in np.flatnonzero(values[:-1] * values[1:] < 0):
+        try:
+            root = brent(objective, points[i], points[i + 1], tol)
+        except ValueError:
+            continue
+        # A sign change across a pole (tan, 1/x) converges onto the pole.
+        value = objective(root)
+        if value is not None and abs(value) <= max(abs(values[i]), abs(values[i + 1])):
+            roots.append(float(root))
+    return sorted(roots)
+
+
+def roots(engine, expression, var, a, b, samples=1000, tol=1e-12, variables=None, context=None):
+    return scan(Objective(engine, expression, var, variables, context), a, b, samples, tol)
@@ -0,0 +1,285 @@
+import re
+
+from program import (Program, OP_CONST, OP_VAR, OP_ADD, OP_SUB, OP_MUL, OP_DIV, OP_POW,
+                     OP_NEG, OP_CALL1, OP_CALLN)
+
+
+TOKEN_PATTERN = re.compile(r"""
+    ((?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)    # number
+  | ([^\W\d]\w*)(\s*\()?                    # name, optionally followed by a call
+  | ([-+*/^(),×÷])                          # operator
+  | (\s+)                                   # whitespace
+  | (.)                                     # anything else is an error
+""", re.VERBOSE)
+
+OPERATOR_ALIASES = {'×': '*', '÷': '/'}
+
+END, NUMBER, NAME, CALL, OPERATOR, SPACE, ERROR = range(7)
+
+# Parser frames stand in for the recursion of a textbook Pratt parser, so
+# nesting depth is bounded by memory rather than the Python stack.
+#   [EXPR, min_power, first, pending_op]  an operand chain being extended
+#   [GROUP, first]                        inside ( ... )
+#   [ARGS, first, spec, count]            inside a function call
+#   [NEG, first] / [PLUS, first]          a prefix sign
+EXPR, GROUP, ARGS, NEG, PLUS = range(5)
+
+# (left binding power, power the right operand is parsed with, opcode).
+# ^ parses its right side one step looser so it associates to the right.
+BINARY = {
+    '+': (10, 10, OP_ADD),
+    '-': (10, 10, OP_SUB),
+    '*': (20, 20, OP_MUL),
+    '/': (20, 20, OP_DIV),
+    '^': (30, 29, OP_POW),
+}
+IMPLICIT = BINARY['*']
+
+# Prefix signs bind tighter than * and / but looser than ^: -x^2 is -(x^2)
+# and 2^-3 is 2^(-3).
+PREFIX_POWER = 25
+
+
+class ParseError(ValueError):
+    def __init__(self, message, start=None, end=None):
+        super().__init__(message)
+        self.position = start
+        self.span = None if start is None else (start, start + 1 if end is None else end)
+
+    def __reduce__(self):
+        return type(self), (str(self),) + (self.span or ())
+
+
+class Parser:
+    # Pratt parser over the regex scan, driven one token at a time. Ops are
+    # emitted in postfix order as each subtree closes, so the result is
+    # already a runnable Program; its spans give the (start, end) source
+    # range of every op. feed() can stop after any token and save() /
+    # restore() its state, which lets the live preview resume mid-input.
+    def __init__(self, functions, constants, backend=None):
+        self.functions = functions
+        self.constants = constants
+        self.backend = backend
+        self.ops = []
+        self.args = []
+        self.spans = []
+        self.frames = [[EXPR, 0, None, None]]
+        self.expecting = True
+        self.depth = 0
+        self.last = 0
+
+    def save(self):
+        return (len(self.ops), tuple(map(tuple, self.frames)), self.expecting, self.depth, self.last)
+
+    def restore(self, state):
+        length, frames, self.expecting, self.depth, self.last = state
+        del self.ops[length:], self.args[length:], self.spans[length:]
+        self.frames = [list(frame) for frame in frames]
+
+    def program(self):
+        return Program(list(self.ops), list(self.args), spans=list(self.spans))
+
+    def feed(self, source, pos=0, final=False, checkpoints=None):
+        # Consumes the tokens of source[pos:], and the end of input when
+        # final is set. With checkpoints, appends (end, kind, text, state)
+        # after every token.
+        functions = self.functions
+        constants = self.constants
+        backend = self.backend
+        to_number = float if backend is None else backend.number
+        push_op = self.ops.append
+        push_arg = self.args.append
+        push_span = self.spans.append
+        frames = self.frames
+        push_frame = frames.append
+        expecting = self.expecting
+        depth = self.depth
+        last = self.last
+
+        items = TOKEN_PATTERN.findall(source, pos)
+        if final:
+            items.append(None)
+        end = pos
+        previous = None
+
+        for item in items:
+            start = end
+            if item is None:
+                kind = END
+                text = ''
+            else:
+                number, name, call, op, space, error = item
+                if number:
+                    if previous == NUMBER:
+                        raise ParseError("Invalid number format", start, start + len(number))
+                    kind = NUMBER
+                    text = number
+                    end = start + len(number)
+                elif op:
+                    kind = OPERATOR
+                    text = OPERATOR_ALIASES.get(op, op)
+                    end = start + 1
+                elif name:
+                    kind = CALL if call else NAME
+                    text = name
+                    end = start + len(name) + len(call)
+                elif space:
+                    end = start + len(space)
+                    continue
+                elif error == '.':
+                    raise ParseError("Invalid number format", start)
+                else:
+                    raise ParseError(f"Unknown character: {error}", start)
+                previous = kind
+
+            while True:
+                if expecting:
+                    # Start of an operand; the top frame is a fresh EXPR.
+                    frames[-1][2] = first = start
+                    if kind == NUMBER:
+                        last = end
+                        push_op(OP_CONST)
+                        push_arg(to_number(text))
+                        push_span((first, end))
+                        expecting = False
+                        break
+                    if kind == NAME:
+                        last = end
+                        if text in constants:
+                            push_op(OP_CONST)
+                            push_arg(float(constants[text]) if backend is None
+                                     else backend.constant(text, constants[text]))
+                        elif text in functions:
+                            raise ParseError(f"Missing ( after {text}", first, last)
+                        else:
+                            push_op(OP_VAR)
+                            push_arg(text)
+                        push_span((first, last))
+                        expecting = False
+                        break
+                    if kind == CALL:
+                        if text in constants:
+                            # pi(2) is pi*(2): go round again with the parenthesis.
+                            last = first + len(text)
+                            push_op(OP_CONST)
+                            push_arg(float(constants[text]) if backend is None
+                                     else backend.constant(text, constants[text]))
+                            push_span((first, last))
+                            expecting = False
+                            kind = OPERATOR
+                            text = '('
+                            start = end - 1
+                            continue
+                        spec = functions.get(text)
+                        if spec is None:
+                            raise ParseError(f"Unknown function: {text}", first, first + len(text))
+                        depth += 1
+                        last = end
+                        push_frame([ARGS, first, spec, 0])
+                        push_frame([EXPR, 0, None, None])
+                        break
+                    if kind != OPERATOR:
+                        raise ParseError("Mismatched parentheses" if depth else "Invalid expression", first)
+                    if text == '(':
+                        depth += 1
+                        last = end
+                        push_frame([GROUP, first])
+                        push_frame([EXPR, 0, None, None])
+                        break
+                    if text == '-' or text == '+':
+                        last = end
+                        push_frame([NEG if text == '-' else PLUS, first])
+                        push_frame([EXPR, PREFIX_POWER, None, None])
+                        break
+                    if text != ')':
+                        raise ParseError("Invalid expression", first)
+                    frame = frames[-2] if len(frames) > 1 else None
+                    if frame is None or frame[0] != ARGS or frame[3]:
+                        raise ParseError("Invalid expression" if depth else "Mismatched parentheses", first)
+                    # f() closes straight away with no arguments.
+                    frames.pop()
+                    expecting = False
+                else:
+                    # After an operand: extend it with a binary operator (or
+                    # implicit multiplication), or end this expression.
+                    frame = frames[-1]
+                    if kind == OPERATOR:
+                        binding = BINARY.get(text)
+                        if binding is not None:
+                            if binding[0] > frame[1]:
+                                last = end
+                                frame[3] = binding[2]
+                                push_frame([EXPR, binding[1], None, None])
+                                expecting = True
+                                break
+                        elif text == '(' and IMPLICIT[0] > frame[1]:
+                            frame[3] = OP_MUL
+                            push_frame([EXPR, IMPLICIT[1], None, None])
+                            expecting = True
+                            continue
+                    elif kind != END and IMPLICIT[0] > frame[1]:
+                        frame[3] = OP_MUL
+                        push_frame([EXPR, IMPLICIT[1], None, None])
+                        expecting = True
+                        continue
+
+                    frames.pop()
+                    if not frames:
+                        if kind != END:
+                            push_frame(frame)
+                            raise ParseError("Mismatched parentheses" if text == ')' else "Invalid expression",
+                                             start)
+                        break
+                    frame = frames[-1]
+                    tag = frame[0]
+                    if tag == EXPR:
+                        push_op(frame[3])
+                        push_arg(None)
+                        push_span((frame[2], last))
+                        frame[3] = None
+                        continue
+                    if tag == NEG or tag == PLUS:
+                        if tag == NEG:
+                            push_op(OP_NEG)
+                            push_arg(None)
+                            push_span((frame[1], last))
+                        frames.pop()
+                        continue
+                    if tag == ARGS:
+                        frame[3] += 1
+                        if text == ',':
+                            last = end
+                            push_frame([EXPR, 0, None, None])
+                            expecting = True
+                            break
+
+                # Close the group or call in frame.
+                first = frame[1]
+                if text != ')':
+                    if kind == END:
+                        raise ParseError("Mismatched parentheses", first)
+                    raise ParseError("Invalid expression", start)
+                depth -= 1
+                last = end
+                frames.pop()
+                if frame[0] == ARGS:
+                    spec = frame[2]
+                    if frame[3] != spec.arity:
+                        raise ParseError(spec.arity_error(), first, last)
+                    push_op(OP_CALL1 if spec.arity == 1 else OP_CALLN)
+                    push_arg(spec)
+                    push_span((first, last))
+                break
+
+            if checkpoints is not None:
+                self.expecting, self.depth, self.last = expecting, depth, last
+                checkpoints.append((end, kind, text, self.save()))
+
+        self.expecting = expecting
+        self.depth = depth
+        self.last = last
+        return self
+
+
+def parse(functions, constants, source, backend=None):
+    return Parser(functions, constants, backend).feed(source, final=True).program()
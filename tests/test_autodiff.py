@@ -0,0 +1,85 @@
+import math
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from autodiff import digamma
+from engine import MathEngine
+from functions import BUILTIN_FUNCTIONS
+
+
+class TestGradient(unittest.TestCase):
+    def setUp(self):
+        self.engine = MathEngine()
+        self.rad = self.engine.context('RAD')
+
+    def central_difference(self, expression, x, context, h=1e-6):
+        return (self.engine.evaluate(expression, {'x': x + h}, context)
+                - self.engine.evaluate(expression, {'x': x - h}, context)) / (2 * h)
+
+    def test_polynomial_and_quotient(self):
+        self.assertEqual(self.engine.gradient("x^2*y+3x", at={'x': 2, 'y': 3}), {'x': 15.0, 'y': 4.0})
+        self.assertAlmostEqual(self.engine.gradient("1/(1+x)", at={'x': 1}, wrt='x'), -0.25)
+        self.assertAlmostEqual(self.engine.gradient("2^x", at={'x': 3}, wrt='x'), 8 * math.log(2))
+
+    def test_every_builtin_matches_finite_differences(self):
+        points = {'acosh': 1.7, 'atanh': 0.4, 'fact': 2.5}
+        for mode in ('RAD', 'DEG'):
+            context = self.engine.context(mode)
+            for name, spec in BUILTIN_FUNCTIONS.items():
+                expression = "root(3,x)+root(x,9)" if name == 'root' else f"{name}(x)"
+                x = points.get(name, 0.3 if spec.angle == 'out' else 1.3)
+                expected = self.central_difference(expression, x, context)
+                derivative = self.engine.gradient(expression, at={'x': x}, wrt='x', context=context)
+                self.assertAlmostEqual(derivative, expected, delta=1e-5 * max(1, abs(expected)),
+                                       msg=f"{name} in {mode}")
+
+    def test_degree_mode_chain_rule(self):
+        deg = self.engine.context('DEG')
+        self.assertAlmostEqual(self.engine.gradient("sin(x)", at={'x': 60}, wrt='x', context=deg),
+                               0.5 * math.pi / 180)
+        self.assertAlmostEqual(self.engine.gradient("atan(x)", at={'x': 1}, wrt='x', context=deg),
+                               0.5 * 180 / math.pi)
+        self.assertAlmostEqual(self.engine.gradient("sin(x)", at={'x': math.pi / 3}, wrt='x', context=self.rad),
+                               0.5)
+
+    def test_jacobian(self):
+        jacobian = self.engine.jacobian(["x*y", "x+y^2", "ln(x)"], at={'x': 2, 'y': 3})
+        self.assertEqual(jacobian, [[3.0, 2.0], [1.0, 6.0], [0.5, 0.0]])
+        self.assertEqual(self.engine.jacobian(["x*y"], at={'x': 2, 'y': 3}, wrt=['y']), [[2.0]])
+
+    def test_constants_and_unused_variables(self):
+        self.assertEqual(self.engine.gradient("2+3", at={}), {})
+        self.assertEqual(self.engine.gradient("x", at={'x': 1}, wrt=['x', 'z']), {'x': 1.0, 'z': 0.0})
+
+    def test_errors(self):
+        with self.assertRaises(ValueError) as context:
+            self.engine.gradient("sqrt(x)", at={'x': 0})
+        self.assertEqual(str(context.exception), "sqrt not differentiable")
+        with self.assertRaises(ValueError) as context:
+            self.engine.gradient("ln(x)", at={'x': -1})
+        self.assertEqual(str(context.exception), "ln of non-positive")
+        with self.assertRaises(ValueError):
+            self.engine.gradient("x+y", at={'x': 1})
+
+    def test_registered_functions(self):
+        self.engine.register_function('sq', lambda x: x * x, derivative=lambda x: 2 * x)
+        self.engine.register_function('hyp', math.hypot, arity=2,
+                                      derivative=lambda a, b: (a / math.hypot(a, b), b / math.hypot(a, b)))
+        self.engine.register_function('half', lambda x: x / 2)
+        self.assertEqual(self.engine.gradient("sq(x)+hyp(x,4)", at={'x': 3}, wrt='x'), 6.6)
+        self.assertEqual(self.engine.gradient("half(2)*x", at={'x': 3}, wrt='x'), 1.0)
+        with self.assertRaises(ValueError) as context:
+            self.engine.gradient("half(x)", at={'x': 3})
+        self.assertEqual(str(context.exception), "No derivative for half")
+
+    def test_digamma(self):
+        self.assertAlmostEqual(digamma(1), -0.5772156649015329, places=12)
+        self.assertAlmostEqual(digamma(0.5), -1.9635100260214235, places=12)
+        self.assertAlmostEqual(digamma(-0.5), 0.03648997397857652, places=12)
+
+
+if __name__ == '__main__':
+    unittest.main()
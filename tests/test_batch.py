@@ -0,0 +1,55 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from batch import evaluate_chunk
+from engine import MathEngine
+
+
+class TestEvaluateMany(unittest.TestCase):
+    def setUp(self):
+        self.engine = MathEngine()
+        self.expressions = ["1+1", "sqrt(-1)", "sin(30)", "1/0", "fact(5)", "(2+3", "2^10"] * 20
+
+    def check_results(self, results):
+        self.assertEqual(len(results), len(self.expressions))
+        for expression, result in zip(self.expressions, results):
+            try:
+                expected = self.engine.evaluate(expression)
+            except Exception as e:
+                self.assertIsInstance(result, type(e))
+                self.assertEqual(str(result), str(e))
+            else:
+                self.assertAlmostEqual(result, expected)
+
+    def test_serial(self):
+        self.check_results(self.engine.evaluate_many(self.expressions, workers=1))
+
+    def test_process_pool_preserves_order_and_errors(self):
+        self.check_results(self.engine.evaluate_many(self.expressions, workers=2, chunksize=7))
+
+    def test_workers_share_angle_mode(self):
+        self.engine.set_angle_mode('RAD')
+        results = self.engine.evaluate_many(iter(["sin(0)", "cos(0)", "asin(1)"]), workers=2, chunksize=1)
+        self.assertAlmostEqual(results[2], 1.5707963267948966)
+
+    def test_workers_share_numeric_backend(self):
+        expressions = ["0.1+0.2", "1/3", "sqrt(2)", "1/0"]
+        for backend in ('decimal', 'fraction'):
+            context = self.engine.context('DEG', backend, 30)
+            serial = self.engine.evaluate_many(expressions, workers=1, context=context)
+            pooled = self.engine.evaluate_many(expressions, workers=2, chunksize=1, context=context)
+            self.assertEqual(serial[:3], pooled[:3], backend)
+            self.assertEqual([type(result) for result in serial], [type(result) for result in pooled])
+            self.assertEqual(str(serial[3]), str(pooled[3]))
+        self.assertEqual(evaluate_chunk(context, ["1/3"]), serial[1:2])
+
+    def test_invalid_chunksize(self):
+        with self.assertRaises(ValueError):
+            self.engine.evaluate_many(["1"], workers=2, chunksize=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import io
+import unittest
+import sys
+import os
+import tempfile
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+from suite import DEFAULT_BASELINE, STAGES, compare, load_baseline, main, run_suite
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_reports_every_stage(self):
+        results = run_suite(repeat=1, budget=0.001, groups=['keypad', 'trig_rad'])
+        self.assertEqual(set(results['trig_rad']), set(STAGES))
+        self.assertEqual(set(results['keypad']), set(STAGES) | {'transform'})
+        for values in results['keypad'].values():
+            self.assertGreater(values['ns_per_token'], 0)
+            self.assertGreater(values['evals_per_sec'], 0)
+
+    def test_compare_flags_regressions(self):
+        baseline = {'long': {'run': {'ns_per_token': 50.0}, 'tokenize': {'ns_per_token': 400.0}}}
+        results = {
+            'long': {'run': {'ns_per_token': 70.0}, 'tokenize': {'ns_per_token': 410.0},
+                     'compile': {'ns_per_token': 900.0}},
+        }
+        regressions = compare(results, baseline, threshold=0.25)
+        self.assertEqual([(group, stage) for group, stage, *_ in regressions], [('long', 'run')])
+        self.assertEqual(compare(results, baseline, threshold=0.5), [])
+
+    def test_missing_baseline_fails(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            options = ['--baseline', path, '--group', 'keypad', '--repeat', '1', '--budget', '0.001']
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(main(options), 2)
+                self.assertEqual(main(options + ['--save-baseline']), 0)
+            self.assertIn('keypad', load_baseline(path))
+
+    def test_baseline_is_committed(self):
+        baseline = load_baseline(DEFAULT_BASELINE)
+        self.assertEqual(set(baseline['keypad']), set(STAGES) | {'transform'})
+
+
+if __name__ == "__main__":
+    unittest.main()
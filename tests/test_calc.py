@@ -0,0 +1,82 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import calc
+from formatting import format_result, format_error
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+class TestFormatting(unittest.TestCase):
+    def test_format_result(self):
+        self.assertEqual(format_result(14.0), "14")
+        self.assertEqual(format_result(1 / 3), "0.3333333333")
+        self.assertEqual(format_result(0.0), "0.000000e+00")
+        self.assertEqual(format_result(2e12), "2.000000e+12")
+
+    def test_format_error(self):
+        self.assertEqual(format_error(ValueError("sqrt of negative")), "sqrt of negative")
+        self.assertEqual(format_error(ValueError("x" * 40)), "Error")
+
+
+class TestEvalCommand(unittest.TestCase):
+    def run_eval(self, lines, *options):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8') as handle:
+            handle.write('\n'.join(lines) + '\n')
+        try:
+            out = io.StringIO()
+            with redirect_stdout(out):
+                self.assertEqual(calc.main(['eval', handle.name, *options]), 0)
+            return out.getvalue()
+        finally:
+            os.unlink(handle.name)
+
+    def test_csv(self):
+        output = self.run_eval(["2+3*4", "sqrt(-1)", "1/3"])
+        self.assertEqual(output.splitlines(), [
+            "expression,result,error",
+            "2+3*4,14,",
+            "sqrt(-1),sqrt of negative,sqrt of negative",
+            "1/3,0.3333333333,",
+        ])
+
+    def test_jsonl_rad_chunks(self):
+        output = self.run_eval(["asin(1)", "1/0", "2e3"] * 5, '-f', 'jsonl', '--angle', 'RAD', '--chunk-size', '2')
+        records = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual(len(records), 15)
+        self.assertEqual(records[0], {'expression': 'asin(1)', 'result': '1.570796327', 'error': None})
+        self.assertEqual(records[1]['error'], "Division by zero")
+        self.assertEqual(records[14]['result'], "2000")
+
+    def test_unformattable_result_is_an_error_row(self):
+        expression, display, error = calc.format_row("big", 10 ** 400)
+        self.assertEqual(display, "Error")
+        self.assertIn("too large", error)
+
+        lines = ["1+1", "fact(170)*fact(170)", "2*3"]
+        rows = self.run_eval(lines).splitlines()
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1], "1+1,2,")
+        self.assertEqual(rows[3], "2*3,6,")
+
+        records = [json.loads(line) for line in self.run_eval(lines, '-f', 'jsonl').splitlines()]
+        self.assertEqual([record['expression'] for record in records], lines)
+        self.assertEqual(records[2]['result'], "6")
+
+    def test_does_not_import_qt(self):
+        code = "import sys, calc; calc.main(['eval', '-']); print('PySide6' in sys.modules)"
+        result = subprocess.run([sys.executable, '-c', code], input="1+1\n", capture_output=True,
+                                text=True, cwd=ROOT, check=True)
+        self.assertEqual(result.stdout.splitlines()[-1], "False")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from codegen import generate
+from engine import MathEngine
+
+
+def outcome(func):
+    try:
+        return func()
+    except (ValueError, ZeroDivisionError) as e:
+        return type(e), str(e)
+
+
+class TestGeneratedFunctions(unittest.TestCase):
+    def setUp(self):
+        self.engine = MathEngine()
+
+    def test_matches_opcode_interpreter(self):
+        expressions = ["2*x+1", "sin(x)^2+cos(x)^2", "sqrt(x)-ln(x)", "1/(x-2)", "x^x^x", "fact(x)",
+                       "root(3,x)", "asin(x/10)", "tan(x)", "-x*2", "exp(x*1000)", "atanh(x)", "inv(x-2)"]
+        for mode in ('DEG', 'RAD'):
+            for expression in expressions:
+                program = self.engine.compile(expression).program_for(mode)
+                function = generate(program, mode)
+                for x in (0, 0.5, 2, 3, 90, -1):
+                    self.assertEqual(outcome(lambda: function({'x': x})),
+                                     outcome(lambda: self.engine.run(program, {'x': x}, mode)),
+                                     f"{expression} at {x} in {mode}")
+
+    def test_negative_constants_past_promotion(self):
+        for expression in ("(-2)^x", "cos(10)^x", "tan(2)^x", "cos(2)^sinh(x)", "x*(-0.5)^x"):
+            compiled = self.engine.compile(expression)
+            program = compiled.program_for('DEG')
+            for x in range(self.engine.native_after + 4):
+                self.assertEqual(outcome(lambda: compiled.evaluate({'x': x})),
+                                 outcome(lambda: self.engine.run(program, {'x': x}, 'DEG')), expression)
+        self.assertEqual(self.engine.compile("(-2)^x").evaluate({'x': 2}), 4)
+
+    def test_hot_expressions_are_promoted(self):
+        compiled = self.engine.compile("x*3+1")
+        for i in range(self.engine.native_after):
+            self.assertEqual(compiled(x=i), i * 3 + 1)
+        self.assertEqual(compiled._functions, {})
+        self.assertEqual(compiled(x=2), 7)
+        self.assertIn('DEG', compiled._functions)
+        self.assertEqual(compiled.evaluate({'x': 1}, self.engine.context('RAD')), 4)
+
+    def test_promotion_can_be_disabled(self):
+        self.engine.native_after = None
+        compiled = self.engine.compile("x+1")
+        for i in range(20):
+            compiled(x=i)
+        self.assertEqual(compiled._functions, {})
+
+    def test_angle_mode_is_respected_after_promotion(self):
+        compiled = self.engine.compile("sin(x)")
+        for _ in range(10):
+            self.assertAlmostEqual(compiled(x=30), 0.5)
+            self.assertAlmostEqual(compiled.evaluate({'x': 30}, self.engine.context('RAD')), -0.9880316240928618)
+
+    def test_shared_and_impure_calls(self):
+        calls = []
+        self.engine.register_function('slow', lambda x: calls.append(x) or x * 2)
+        counter = iter(range(100))
+        self.engine.register_function('tick', lambda: next(counter), arity=0, pure=False)
+        function = self.engine.compile("slow(x+1)*slow(x+1)+tick()+tick()").function_for('DEG')
+        self.assertEqual(function({'x': 1}), 17)
+        self.assertEqual(calls, [2])
+        self.assertEqual(function({'x': 1}), 21)
+
+    def test_errors_and_unbound_variables(self):
+        function = self.engine.compile("sqrt(x)+y").function_for('DEG')
+        with self.assertRaises(ValueError) as context:
+            function({'x': -1, 'y': 0})
+        self.assertIn("sqrt of negative", str(context.exception))
+        with self.assertRaises(ValueError) as context:
+            function({'x': 1})
+        self.assertIn("Unbound variable: y", str(context.exception))
+
+    def test_generated_code_is_sandboxed(self):
+        function = self.engine.compile("__import__+__builtins__").function_for('DEG')
+        self.assertEqual(function({'__import__': 1, '__builtins__': 2}), 3)
+        self.assertEqual(function.__globals__['__builtins__'], {})
+
+    def test_long_expression(self):
+        function = self.engine.compile("+".join(["x*1+sin(x)"] * 2000)).function_for('RAD')
+        self.assertAlmostEqual(function({'x': 0}), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import MathEngine
+from program import OP_CONST, OP_VAR, OP_NEG, OP_STORE, OP_LOAD
+
+
+class TestConstantFolding(unittest.TestCase):
+    def setUp(self):
+        self.engine = MathEngine()
+
+    def test_folds_constant_prefix(self):
+        program = self.engine.compile("pi/180*2^10*sqrt(2)*x").program
+        self.assertEqual(len(program), 3)
+        self.assertEqual(program.ops[:2], [OP_CONST, OP_VAR])
+
+    def test_removes_identities(self):
+        for expression in ("x*1", "1*x", "x+0", "0+x", "x-0", "x/1", "x^1", "(x^1)/1*1+0"):
+            program = self.engine.compile(expression).program
+            self.assertEqual(program.ops, [OP_VAR], expression)
+
+    def test_unary_minus(self):
+        self.assertEqual(self.engine.compile("-x").program.ops, [OP_VAR, OP_NEG])
+        self.assertEqual(self.engine.compile("-5").program.args, [-5.0])
+        self.assertAlmostEqual(self.engine.evaluate("-x*2", {'x': 3}), -6)
+
+    def test_keeps_error_semantics(self):
+        with self.assertRaises(ZeroDivisionError):
+            self.engine.evaluate("1/0+x", {'x': 1})
+        with self.assertRaises(ValueError) as context:
+            self.engine.evaluate("fact(171)*x", {'x': 1})
+        self.assertIn("factorial too large", str(context.exception))
+        with self.assertRaises(ValueError) as context:
+            self.engine.evaluate("sqrt(-1)")
+        self.assertIn("sqrt of negative", str(context.exception))
+
+    def test_respects_angle_mode(self):
+        compiled = self.engine.compile("sin(30)+x")
+        self.engine.set_angle_mode('DEG')
+        self.assertAlmostEqual(compiled(x=0), 0.5, places=10)
+        self.engine.set_angle_mode('RAD')
+        self.assertAlmostEqual(compiled(x=0), -0.9880316240928618, places=10)
+        self.engine.set_angle_mode('DEG')
+        self.assertAlmostEqual(compiled(x=0), 0.5, places=10)
+
+    def test_impure_functions_are_not_folded(self):
+        counter = iter(range(100))
+        self.engine.register_function('tick', lambda: next(counter), arity=0, pure=False)
+        compiled = self.engine.compile("tick()+1")
+        self.assertEqual([compiled(), compiled()], [1, 2])
+
+    def test_matches_unoptimized(self):
+        plain = MathEngine(optimize_programs=False)
+        for expression in ("2+3*4^2-1", "-(5+3)*x", "root(3,8)*x^1+0", "ln(e)*log10(100)-x/1"):
+            self.assertAlmostEqual(self.engine.evaluate(expression, {'x': 1.5}),
+                                   plain.evaluate(expression, {'x': 1.5}))
+            self.assertLessEqual(len(self.engine.compile(expression).program),
+                                 len(plain.compile(expression).program))
+
+    def test_first_evaluation_skips_optimizer(self):
+        compiled = self.engine.compile("2*3+x")
+        self.assertAlmostEqual(compiled(x=1), 7)
+        self.assertEqual(compiled._programs, {})
+        self.assertAlmostEqual(compiled(x=2), 8)
+        self.assertEqual(len(compiled._programs['DEG']), 3)
+
+    def test_long_expression_does_not_recurse(self):
+        expression = "+".join(["x*1"] * 5000)
+        self.assertAlmostEqual(self.engine.evaluate(expression, {'x': 2}), 10000)
+
+
+class TestCommonSubexpressions(unittest.TestCase):
+    def setUp(self):
+        self.engine = MathEngine()
+
+    def test_repeated_terms_are_shared(self):
+        compiled = self.engine.compile("sin(a)^2 + cos(a)^2 + sin(a)*cos(a)")
+        program = compiled.program
+        self.assertEqual(program.slots, 2)
+        self.assertEqual(program.ops.count(OP_STORE), 2)
+        self.assertEqual(program.ops.count(OP_LOAD), 2)
+        self.assertAlmostEqual(compiled(a=30), 1 + 0.5 * 3 ** 0.5 / 2, places=10)
+
+    def test_each_shared_subtree_evaluated_once(self):
+        calls = []
+        self.engine.register_function('slow', lambda x: calls.append(x) or x * 2)
+        compiled = self.engine.compile("slow(x+1)*slow(x+1)+slow(x+1)")
+        compiled(x=0)
+        del calls[:]
+        self.assertEqual(compiled(x=1), 20)
+        self.assertEqual(calls, [2])
+
+    def test_stats(self):
+        stats = self.engine.compile("sin(a)^2 + cos(a)^2 + sin(a)*cos(a)").stats()
+        self.assertEqual(stats['nodes'], 15)
+        self.assertEqual(stats['unique_nodes'], 9)
+        self.assertEqual(stats['deduplicated'], 6)
+        self.assertEqual(stats['shared_subtrees'], 2)
+        self.assertEqual(MathEngine(optimize_programs=False).compile("x+x").stats()['deduplicated'], 0)
+
+    def test_impure_calls_are_not_shared(self):
+        counter = iter(range(100))
+        self.engine.register_function('tick', lambda: next(counter), arity=0, pure=False)
+        self.assertEqual(self.engine.evaluate("tick()+tick()"), 1)
+
+    def test_errors_in_shared_subtrees(self):
+        with self.assertRaises(ValueError) as context:
+            self.engine.evaluate("sqrt(x-5)+sqrt(x-5)", {'x': 1})
+        self.assertIn("sqrt of negative", str(context.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+try:
+    from PySide6.QtWidgets import QApplication
+    from controller import CalculatorController
+except ImportError:
+    QApplication = None
+
+
+@unittest.skipIf(QApplication is None, "PySide6 not installed")
+class TestCalculation(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.calculator = CalculatorController()
+        self.calculator.live_preview = False
+        self.calculator.calculation_timer.setInterval(200)
+
+    def tearDown(self):
+        self.calculator.executor.shutdown(wait=False)
+
+    def calculate(self, expression, seconds=5):
+        self.calculator._set_expression(expression)
+        start = time.perf_counter()
+        self.calculator._handle_calculate()
+        while self.calculator.calculation is not None and time.perf_counter() - start < seconds:
+            self.app.processEvents()
+            time.sleep(0.005)
+        return self.calculator.ui.result_label.text(), time.perf_counter() - start
+
+    def test_huge_powers_fail_fast(self):
+        for expression in ("fact(170)^fact(170)", "fact(12)^fact(12)"):
+            text, elapsed = self.calculate(expression)
+            self.assertEqual(text, "Number too large")
+            self.assertLess(elapsed, 1)
+
+        self.calculator.engine.register_function('big', lambda x: 10 ** int(x))
+        text, elapsed = self.calculate("big(1000)^big(7)")
+        self.assertEqual(text, "Number too large")
+        self.assertLess(elapsed, 1)
+
+    def test_timeout_fires_while_the_worker_runs(self):
+        self.calculator.engine.register_function('slow', lambda x: time.sleep(x) or x, pure=False)
+        text, elapsed = self.calculate("slow(3)")
+        self.assertEqual(text, "Timed out")
+        self.assertLess(elapsed, 1)
+
+        text, elapsed = self.calculate("2+3")
+        self.assertEqual(text, "5")
+
+    def test_finished_calculation_keeps_the_executor(self):
+        executor = self.calculator.executor
+        self.calculator._set_expression("2+3")
+        self.calculator._handle_calculate()
+        self.calculator.calculation.result(timeout=5)
+        self.calculator._handle_cancel()
+        self.assertIs(self.calculator.executor, executor)
+        self.assertEqual(self.calculator.ui.result_label.text(), "Cancelled")
+
+    def test_preview_with_variables_clears_the_result(self):
+        self.calculator.live_preview = True
+        self.calculator.ui.result_label.setText("5")
+        self.calculator._set_expression("2+x")
+        self.calculator._start_preview()
+        start = time.perf_counter()
+        while self.calculator.ui.result_label.text() and time.perf_counter() - start < 5:
+            self.app.processEvents()
+            time.sleep(0.005)
+        self.assertEqual(self.calculator.ui.result_label.text(), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,14 @@
+import math
 import unittest
 import sys
 import os
+from unittest import mock
 
 # Add parent directory to path so we can import engine
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from engine import MathEngine
+import syntax
+from engine import MathEngine, OP_CONST, OP_VAR, OP_MUL, OP_CALL1
 
 
 class TestMathEngine(unittest.TestCase):
@@ -80,17 +83,26 @@ class TestMathEngine(unittest.TestCase):
         self.assertAlmostEqual(self.engine.evaluate("fact(10)"), 3628800)
         self.assertAlmostEqual(self.engine.evaluate("fact(20)"), 2432902008176640000)
 
+    def test_factorial_is_float(self):
+        self.assertIs(type(self.engine.evaluate("fact(170)")), float)
+        self.assertEqual(self.engine.evaluate("fact(170)*fact(170)"), math.inf)
+
     def test_factorial_boundaries(self):
         with self.assertRaises(ValueError) as context:
             self.engine.evaluate("fact(-1)")
         self.assertIn("factorial negative", str(context.exception))
 
         with self.assertRaises(ValueError) as context:
-            self.engine.evaluate("fact(2.5)")
-        self.assertIn("factorial integer only", str(context.exception))
+            self.engine.evaluate("fact(171)")
+        self.assertIn("factorial too large", str(context.exception))
 
+    def test_factorial_non_integer_uses_gamma(self):
+        self.assertAlmostEqual(self.engine.evaluate("fact(2.5)"), math.gamma(3.5))
+        self.assertAlmostEqual(self.engine.evaluate("fact(0.5)^2"), math.pi / 4)
+        self.assertAlmostEqual(self.engine.evaluate("fact(-0.5)"), math.sqrt(math.pi))
+        self.assertAlmostEqual(self.engine.evaluate("fact(170.5)") / 9.483367566824795e+307, 1)
         with self.assertRaises(ValueError) as context:
-            self.engine.evaluate("fact(171)")
+            self.engine.evaluate("fact(171.5)")
         self.assertIn("factorial too large", str(context.exception))
 
     def test_sqrt_valid(self):
@@ -285,8 +297,264 @@ class TestMathEngine(unittest.TestCase):
         self.assertIn("atanh domain error", str(context.exception))
 
 
+class TestExpressionCache(unittest.TestCase):
+    def setUp(self):
+        self.engine = MathEngine(cache_size=2)
+
+    def test_compile_returns_reusable_expression(self):
+        compiled = self.engine.compile("2 + 3 × 4")
+        self.assertAlmostEqual(compiled.evaluate(), 14)
+        self.assertAlmostEqual(compiled(), 14)
+        self.assertEqual(compiled.source, "2+3*4")
+
+    def test_normalized_hits_share_entry(self):
+        first = self.engine.compile("8÷2")
+        second = self.engine.compile(" 8 / 2 ")
+        self.assertIs(first, second)
+        self.assertEqual(self.engine.cache_info(), {'hits': 1, 'misses': 1, 'size': 1, 'maxsize': 2})
+
+    def test_repeat_evaluation_skips_parsing(self):
+        with mock.patch('engine.parse', wraps=syntax.parse) as parse:
+            for _ in range(3):
+                self.assertAlmostEqual(self.engine.evaluate("sqrt(16)"), 4)
+        self.assertEqual(parse.call_count, 1)
+
+    def test_lru_eviction(self):
+        self.engine.compile("1+1")
+        self.engine.compile("2+2")
+        self.engine.compile("1+1")
+        self.engine.compile("3+3")
+        self.engine.compile("1+1")
+        info = self.engine.cache_info()
+        self.assertEqual(info['size'], 2)
+        self.assertEqual(info['hits'], 2)
+        self.engine.compile("2+2")
+        self.assertEqual(self.engine.cache_info()['misses'], 4)
+
+    def test_resize_and_disable(self):
+        self.engine.compile("1+1")
+        self.engine.compile("2+2")
+        self.engine.set_cache_size(0)
+        self.assertEqual(self.engine.cache_info()['size'], 0)
+        self.assertAlmostEqual(self.engine.evaluate("2+2"), 4)
+        self.assertEqual(self.engine.cache_info()['size'], 0)
+
+    def test_errors_are_not_cached(self):
+        with self.assertRaises(ValueError):
+            self.engine.compile("(2+3")
+        self.assertEqual(self.engine.cache_info()['size'], 0)
+
+
+class TestVariables(unittest.TestCase):
+    def setUp(self):
+        self.engine = MathEngine()
+
+    def test_free_symbols(self):
+        compiled = self.engine.compile("sin(x)*x^2+y")
+        self.assertEqual(compiled.variables, ('x', 'y'))
+        self.assertEqual(self.engine.compile("2*pi").variables, ())
+
+    def test_bindings_by_dict_and_kwargs(self):
+        compiled = self.engine.compile("sin(x)*x^2")
+        self.assertAlmostEqual(compiled({'x': 30}), 450, places=9)
+        self.assertAlmostEqual(compiled(x=90), 8100, places=9)
+        self.assertAlmostEqual(self.engine.evaluate("a*b-c", {'a': 2, 'b': 3, 'c': 1}), 5)
+
+    def test_rebinding_skips_parsing(self):
+        compiled = self.engine.compile("x^2+1")
+        with mock.patch('engine.parse', side_effect=AssertionError("parsed again")):
+            self.assertEqual([compiled(x=v) for v in range(4)], [1, 2, 5, 10])
+            self.assertEqual(self.engine.evaluate("x^2+1", {'x': 4}), 17)
+
+    def test_unbound_variable(self):
+        with self.assertRaises(ValueError) as context:
+            self.engine.evaluate("x+1")
+        self.assertIn("Unbound variable: x", str(context.exception))
+
+    def test_unknown_function_call(self):
+        with self.assertRaises(ValueError) as context:
+            self.engine.evaluate("foo(2)")
+        self.assertIn("Unknown function: foo", str(context.exception))
+
+
+class TestTokenizer(unittest.TestCase):
+    def setUp(self):
+        self.engine = MathEngine()
+
+    def test_numbers_and_constants_are_floats(self):
+        tokens = self.engine.tokenize("12.5 + pi")
+        self.assertEqual(tokens, [12.5, '+', math.pi])
+        self.assertIs(type(tokens[0]), float)
+
+    def test_scientific_notation(self):
+        self.assertEqual(self.engine.tokenize("1.5e-3"), [0.0015])
+        self.assertEqual(self.engine.tokenize("2E+2*3e2"), [200.0, '*', 300.0])
+        self.assertAlmostEqual(self.engine.evaluate("2e3+1"), 2001)
+        self.assertAlmostEqual(self.engine.evaluate("2*e"), 2 * math.e)
+
+    def test_display_operators_and_whitespace(self):
+        self.assertEqual(self.engine.tokenize(" 6 × 2 ÷ 3 "), [6.0, '*', 2.0, '/', 3.0])
+
+    def test_names_with_digits(self):
+        self.assertEqual(self.engine.tokenize("log10(x1)"), ['log10', '(', 'x1', ')'])
+
+    def test_invalid_numbers(self):
+        for expression in ("1.2.3", "5+."):
+            with self.assertRaises(ValueError) as context:
+                self.engine.tokenize(expression)
+            self.assertIn("Invalid number format", str(context.exception))
+
+    def test_spaces_inside_numbers_are_ignored(self):
+        self.assertEqual(self.engine.tokenize("1 2"), [12.0])
+        self.assertEqual(self.engine.evaluate("1 2+3"), 15)
+
+    def test_unknown_character(self):
+        with self.assertRaises(ValueError) as context:
+            self.engine.tokenize("2$3")
+        self.assertIn("Unknown character: $", str(context.exception))
+
+
+class TestProgram(unittest.TestCase):
+    def setUp(self):
+        self.engine = MathEngine()
+
+    def test_assemble_typed_opcodes(self):
+        program = self.engine.compile("sin(x)*2").program
+        self.assertEqual(program.ops, [OP_VAR, OP_CALL1, OP_CONST, OP_MUL])
+        self.assertEqual(program.args[0], 'x')
+        self.assertIs(program.args[1], self.engine.functions['sin'])
+        self.assertEqual(program.args[2:], [2.0, None])
+        self.assertEqual(program.variables, ('x',))
+
+    def test_assemble_accepts_legacy_string_postfix(self):
+        program = self.engine.assemble(['2', '3', '+'])
+        self.assertEqual(self.engine.run(program), 5)
+
+    def test_assemble_validates_stack_depth(self):
+        for postfix, message in ((['+'], "Invalid expression"),
+                                 ([2.0, 'root'], "root needs 2 args"),
+                                 (['sqrt'], "sqrt needs arg"),
+                                 ([1.0, 2.0], "Invalid expression")):
+            with self.assertRaises(ValueError) as context:
+                self.engine.assemble(postfix)
+            self.assertIn(message, str(context.exception))
+
+    def test_run_matches_evaluate_postfix(self):
+        for expression in ("2+3*4^2", "sqrt(16)+fact(4)", "root(3,8)/inv(4)", "(1-5)*ln(e)"):
+            postfix = self.engine.infix_to_postfix(self.engine.tokenize(expression))
+            self.assertAlmostEqual(self.engine.run(self.engine.assemble(postfix)),
+                                   self.engine.evaluate_postfix(postfix))
+
+
+class TestFunctionRegistry(unittest.TestCase):
+    def setUp(self):
+        self.engine = MathEngine()
+
+    def test_builtins_have_arity(self):
+        self.assertEqual(self.engine.functions['root'].arity, 2)
+        self.assertEqual(self.engine.functions['atanh'].arity, 1)
+
+    def test_apply_function_arity(self):
+        with self.assertRaises(ValueError) as context:
+            self.engine.apply_function('root', 8)
+        self.assertIn("root needs 2 args", str(context.exception))
+
+    def test_register_function(self):
+        self.engine.register_function('hyp', lambda a, b: math.hypot(a, b), arity=2)
+        self.assertAlmostEqual(self.engine.evaluate("hyp(3,4)*2"), 10)
+        self.assertAlmostEqual(self.engine.evaluate("hyp(x,4)", {'x': 3}), 5)
+
+    def test_register_ternary_function(self):
+        self.engine.register_function('clamp', lambda x, lo, hi: min(max(x, lo), hi), arity=3)
+        self.assertEqual(self.engine.evaluate("clamp(7,0,5)+clamp(-2,0,5)"), 5)
+        with self.assertRaises(ValueError) as context:
+            self.engine.evaluate("clamp(1,2)")
+        self.assertIn("clamp needs 3 args", str(context.exception))
+
+    def test_register_with_check_and_angle(self):
+        def check(x):
+            if x == 0:
+                raise ValueError("cot undefined")
+
+        self.engine.register_function('cot', lambda x: 1 / math.tan(x), check=check, angle='in')
+        self.engine.set_angle_mode('DEG')
+        self.assertAlmostEqual(self.engine.evaluate("cot(45)"), 1)
+        with self.assertRaises(ValueError) as context:
+            self.engine.evaluate("cot(0)")
+        self.assertIn("cot undefined", str(context.exception))
+
+    def test_registration_invalidates_cache(self):
+        self.assertEqual(self.engine.compile("sq").variables, ('sq',))
+        self.engine.register_function('sq', lambda x: x * x)
+        self.assertAlmostEqual(self.engine.evaluate("sq(3)"), 9)
+        self.engine.unregister_function('sq')
+        with self.assertRaises(ValueError) as context:
+            self.engine.evaluate("sq(3)")
+        self.assertIn("Unknown function: sq", str(context.exception))
+
+    def test_reserved_names(self):
+        with self.assertRaises(ValueError):
+            self.engine.register_function('pi', lambda x: x)
+        with self.assertRaises(ValueError):
+            self.engine.register_function('2x', lambda x: x)
+
+
+class TestEvalContext(unittest.TestCase):
+    def setUp(self):
+        self.engine = MathEngine()
+
+    def test_per_call_angle_mode(self):
+        rad = self.engine.context('RAD')
+        self.assertAlmostEqual(self.engine.evaluate("sin(30)"), 0.5)
+        self.assertAlmostEqual(self.engine.evaluate("sin(30)", None, rad), -0.9880316240928618)
+        self.assertAlmostEqual(self.engine.compile("asin(x)")(x=1), 90)
+        self.assertAlmostEqual(self.engine.compile("asin(x)").evaluate({'x': 1}, rad), math.pi / 2)
+        self.assertEqual(self.engine.angle_mode, 'DEG')
+
+    def test_context_defaults_to_engine_mode(self):
+        self.engine.set_angle_mode('RAD')
+        self.assertEqual(self.engine.context().angle_mode, 'RAD')
+        with self.assertRaises(ValueError) as context:
+            self.engine.context('GRAD')
+        self.assertIn("Invalid angle mode", str(context.exception))
+
+    def test_concurrent_mixed_modes(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        engine = MathEngine(cache_size=16)
+        contexts = [engine.context('DEG'), engine.context('RAD')]
+        expressions = [f"sin({i})+cos(x)*{i % 7}" for i in range(64)]
+        expected = {}
+        for context in contexts:
+            for expression in expressions:
+                expected[expression, context] = MathEngine().evaluate(expression, {'x': 0.25}, context)
+
+        def work(seed):
+            mismatches = 0
+            for i in range(2000):
+                expression = expressions[(seed * 31 + i) % len(expressions)]
+                context = contexts[(seed + i) % 2]
+                if engine.evaluate(expression, {'x': 0.25}, context) != expected[expression, context]:
+                    mismatches += 1
+                if i % 500 == 0:
+                    engine.toggle_angle_mode()
+            return mismatches
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-5)
+        try:
+            with ThreadPoolExecutor(8) as pool:
+                self.assertEqual(sum(pool.map(work, range(8))), 0)
+        finally:
+            sys.setswitchinterval(interval)
+
+        info = engine.cache_info()
+        self.assertEqual(info['hits'] + info['misses'], 8 * 2000)
+        self.assertLessEqual(info['size'], 16)
+
+
 def run_tests():
-    suite = unittest.TestLoader().loadTestsFromTestCase(TestMathEngine)
+    suite = unittest.TestLoader().loadTestsFromModule(sys.modules[__name__])
     runner = unittest.TextTestRunner(verbosity=2)
     result = runner.run(suite)
 
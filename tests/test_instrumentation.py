@@ -0,0 +1,96 @@
+import json
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import MathEngine
+from instrumentation import Aggregator, JsonDumpSink
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.engine = MathEngine()
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(self.engine.instrumentation)
+        self.assertAlmostEqual(self.engine.evaluate("fact(5)+1"), 121)
+
+    def test_profile_records_stages_functions_and_cache(self):
+        with self.engine.profile() as stats:
+            for _ in range(3):
+                self.engine.evaluate("fact(5)+root(3,x)*x", {'x': 8})
+        self.assertIsNone(self.engine.instrumentation)
+
+        report = stats.snapshot()
+        for stage in ('parse', 'optimize', 'run', 'evaluate'):
+            self.assertIn(stage, report['stages'])
+        self.assertEqual(report['stages']['evaluate']['count'], 3)
+        self.assertEqual(report['stages']['parse']['count'], 1)
+        self.assertEqual(report['functions']['fact']['calls'], 1)
+        self.assertEqual(report['functions']['root']['calls'], 3)
+        self.assertEqual(report['cache'], {'hits': 2, 'misses': 1, 'hit_rate': 2 / 3})
+
+    def test_errors_by_message(self):
+        with self.engine.profile() as stats:
+            for expression in ("sqrt(-1)", "sqrt(-4)", "1/0", "(2", ""):
+                with self.assertRaises((ValueError, ZeroDivisionError)):
+                    self.engine.evaluate(expression)
+        self.assertEqual(stats.snapshot()['errors'], {
+            "sqrt of negative": 2,
+            "Division by zero": 1,
+            "Mismatched parentheses": 1,
+            "Empty expression": 1,
+        })
+
+    def test_results_match_uninstrumented(self):
+        expected = self.engine.evaluate("sin(a)^2+cos(a)^2+sin(a)", {'a': 30})
+        with self.engine.profile():
+            for _ in range(3):
+                self.assertEqual(self.engine.evaluate("sin(a)^2+cos(a)^2+sin(a)", {'a': 30}), expected)
+
+    def test_decimal_backend_is_timed(self):
+        context = self.engine.context('DEG', 'decimal', 30)
+        with self.engine.profile() as stats:
+            result = self.engine.evaluate("sqrt(2)+1/3", None, context)
+        self.assertEqual(result, self.engine.evaluate("sqrt(2)+1/3", None, context))
+        self.assertEqual(stats.snapshot()['stages']['run']['count'], 1)
+
+    def test_wrapped_programs_are_not_kept_alive(self):
+        sink = Aggregator()
+        program = self.engine.compile("sqrt(x)").program_for('DEG')
+        wrapped = sink.wrap(program)
+        self.assertIs(sink.wrap(program), wrapped)
+        self.assertEqual(len(sink._programs), 1)
+        del program
+        self.engine.clear_cache()
+        self.assertEqual(len(sink._programs), 0)
+
+    def test_nested_profiles_restore_sink(self):
+        outer = Aggregator()
+        with self.engine.profile(outer):
+            with self.engine.profile() as inner:
+                self.engine.evaluate("1+1")
+            self.assertIs(self.engine.instrumentation, outer)
+            self.engine.evaluate("2+2")
+        self.assertEqual(inner.snapshot()['stages']['evaluate']['count'], 1)
+        self.assertEqual(outer.snapshot()['stages']['evaluate']['count'], 1)
+
+    def test_json_dump_sink(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'stats.json')
+            sink = JsonDumpSink(path, interval=0)
+            self.engine.instrumentation = sink
+            self.engine.evaluate("sqrt(16)")
+            self.engine.instrumentation = None
+            sink.close()
+            with open(path, encoding='utf-8') as handle:
+                report = json.load(handle)
+        self.assertEqual(report['functions']['sqrt']['calls'], 1)
+        self.assertIn('timestamp', report)
+
+
+if __name__ == "__main__":
+    unittest.main()
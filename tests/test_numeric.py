@@ -0,0 +1,132 @@
+import math
+import unittest
+import sys
+import os
+from decimal import Decimal
+from fractions import Fraction
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import MathEngine
+from numeric import DecimalBackend, FractionBackend, decimal_pi, get_backend
+
+
+PI_50 = "3.1415926535897932384626433832795028841971693993751"
+
+
+class TestDecimalBackend(unittest.TestCase):
+    def setUp(self):
+        self.engine = MathEngine()
+        self.context = self.engine.context(backend='decimal', precision=50)
+
+    def evaluate(self, expression, variables=None, context=None):
+        return self.engine.evaluate(expression, variables, context or self.context)
+
+    def test_literals_are_exact(self):
+        self.assertEqual(self.evaluate("0.1+0.2"), Decimal("0.3"))
+        self.assertEqual(self.evaluate("1.005*1000"), Decimal("1005"))
+        self.assertEqual(self.evaluate("x*3", {'x': 0.1}), Decimal("0.3"))
+
+    def test_precision(self):
+        self.assertEqual(str(self.evaluate("pi")), PI_50)
+        short = self.engine.context(backend='decimal', precision=10)
+        self.assertEqual(str(self.evaluate("1/3", context=short)), "0.3333333333")
+        self.assertEqual(str(self.evaluate("sqrt(2)", context=short)), "1.414213562")
+
+    def test_functions_in_both_angle_modes(self):
+        self.assertEqual(self.evaluate("sin(30)"), Decimal("0.5"))
+        self.assertEqual(self.evaluate("acos(0)"), 90)
+        self.assertEqual(self.evaluate("atan(1)*4", context=self.engine.context('RAD', 'decimal')),
+                         Decimal(PI_50))
+        for expression in ("tan(37)", "asin(0.3)", "sinh(1.5)", "acosh(3)", "atanh(0.2)", "ln(7)",
+                           "log10(2)", "exp(2)", "pow10(0.5)", "root(5,3)", "asinh(-2)", "cos(1000)"):
+            self.assertAlmostEqual(float(self.evaluate(expression)), self.engine.evaluate(expression),
+                                   places=12, msg=expression)
+
+    def test_factorial_beyond_float_range(self):
+        self.assertEqual(self.evaluate("fact(200)/fact(198)"), 39800)
+
+    def test_gamma_for_non_integers(self):
+        self.assertEqual(self.evaluate("fact(0.5)^2*4"), Decimal(PI_50))
+        self.assertEqual(self.evaluate("fact(-0.5)^2"), Decimal(PI_50))
+        self.assertAlmostEqual(float(self.evaluate("fact(10.3)")), 7379236.097342465, places=6)
+        with self.assertRaises(ValueError) as context:
+            self.evaluate("fact(-2)")
+        self.assertIn("factorial negative", str(context.exception))
+
+    def test_errors_match_float_messages(self):
+        for expression, message in (("sqrt(-1)", "sqrt of negative"), ("tan(90)", "tan undefined"),
+                                    ("asin(2)", "asin domain error"), ("ln(0)", "ln of non-positive"),
+                                    ("(-2)^0.5", "Invalid power"), ("10^10^10", "Number too large")):
+            with self.assertRaises(ValueError) as context:
+                self.evaluate(expression)
+            self.assertIn(message, str(context.exception))
+        with self.assertRaises(ZeroDivisionError):
+            self.evaluate("1/0")
+
+    def test_constants_are_cached_per_precision(self):
+        decimal_pi.cache_clear()
+        for _ in range(3):
+            self.engine.evaluate("sin(x)", {'x': 1}, self.engine.context(backend='decimal', precision=70))
+        info = decimal_pi.cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertGreater(info.hits, 0)
+
+
+class TestFractionBackend(unittest.TestCase):
+    def setUp(self):
+        self.engine = MathEngine()
+        self.context = self.engine.context(backend='fraction')
+
+    def evaluate(self, expression, variables=None):
+        return self.engine.evaluate(expression, variables, self.context)
+
+    def test_exact_arithmetic(self):
+        self.assertEqual(self.evaluate("1/3+1/6"), Fraction(1, 2))
+        self.assertEqual(self.evaluate("(2/3)^(-2)"), Fraction(9, 4))
+        self.assertEqual(self.evaluate("x/7", {'x': 0.1}), Fraction(1, 70))
+        self.assertEqual(self.evaluate("fact(25)"), 15511210043330985984000000)
+        self.assertEqual(self.evaluate("fact(300)/(fact(150)*fact(150))"), math.comb(300, 150))
+
+    def test_exact_roots(self):
+        self.assertEqual(self.evaluate("sqrt(9/4)"), Fraction(3, 2))
+        self.assertEqual(self.evaluate("root(3,-8)"), -2)
+        self.assertEqual(self.evaluate("(27/8)^(2/3)"), Fraction(9, 4))
+
+    def test_irrational_results_are_approximated(self):
+        self.assertAlmostEqual(float(self.evaluate("sqrt(2)")), 2 ** 0.5)
+        self.assertEqual(self.evaluate("sin(30)"), Fraction(1, 2))
+        self.assertAlmostEqual(float(self.evaluate("ln(10)")), 2.302585092994046)
+
+
+class TestBackendSelection(unittest.TestCase):
+    def setUp(self):
+        self.engine = MathEngine()
+
+    def test_compiled_expression_follows_context(self):
+        compiled = self.engine.compile("x+0.2")
+        self.assertAlmostEqual(compiled(x=0.1), 0.30000000000000004)
+        self.assertEqual(compiled.evaluate({'x': 0.1}, self.engine.context(backend='decimal')), Decimal("0.3"))
+        self.assertEqual(compiled.evaluate({'x': 0.1}, self.engine.context(backend='fraction')), Fraction(3, 10))
+
+    def test_backends_are_cached_by_precision(self):
+        self.engine.evaluate("1+1", None, self.engine.context(backend=DecimalBackend(30)))
+        self.engine.evaluate("1+1", None, self.engine.context(backend=DecimalBackend(30)))
+        self.engine.evaluate("1+1", None, self.engine.context(backend=FractionBackend(30)))
+        self.assertEqual(self.engine.cache_info()['hits'], 1)
+        self.assertEqual(self.engine.cache_info()['misses'], 2)
+
+    def test_registered_functions_fall_back_to_float(self):
+        self.engine.register_function('half', lambda x: x / 2)
+        self.assertEqual(self.engine.evaluate("half(3)", None, self.engine.context(backend='decimal')),
+                         Decimal("1.5"))
+
+    def test_get_backend(self):
+        self.assertIsNone(get_backend('float'))
+        self.assertEqual(get_backend('decimal', 20), DecimalBackend(20))
+        with self.assertRaises(ValueError):
+            get_backend('complex')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import MathEngine
+
+try:
+    import numpy as np
+    from plotting import PlotCache, downsample, fit_range, nice_step, sample_tile, tile_level
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestAdaptiveSampling(unittest.TestCase):
+    def test_densifies_only_where_curved(self):
+        xs, ys = sample_tile(lambda x: np.abs(x), -1.0, 1.0)
+        self.assertLess(len(xs), 300)
+        gaps = np.diff(xs)
+        self.assertLess(gaps[np.searchsorted(xs, 0.0) - 1], gaps[0])
+        np.testing.assert_array_equal(ys, np.abs(xs))
+        self.assertTrue(np.all(gaps > 0))
+
+    def test_domain_edges_are_located(self):
+        xs, ys = sample_tile(lambda x: np.sqrt(np.where(x < 0, np.nan, x)), -1.0, 1.0)
+        first = np.flatnonzero(np.isfinite(ys))[0]
+        self.assertLess(xs[first] - xs[first - 1], 1e-5)
+
+    def test_tiles_are_reused_when_panning(self):
+        engine = MathEngine()
+        cache = PlotCache(engine)
+        xs, ys = cache.sample("sin(x)", -10, 10, 'RAD')
+        self.assertEqual(cache.hits, 0)
+        np.testing.assert_allclose(ys, np.sin(xs), atol=1e-12)
+        self.assertTrue(np.all(np.diff(xs) > 0))
+
+        misses = cache.misses
+        cache.sample("sin(x)", -9, 11, 'RAD')
+        self.assertLessEqual(cache.misses - misses, 1)
+        self.assertGreater(cache.hits, 0)
+
+        misses = cache.misses
+        cache.sample("sin(x)", -9, 11, 'DEG')
+        self.assertGreater(cache.misses - misses, 1)
+
+    def test_cancelled_and_invalid_requests(self):
+        cache = PlotCache(MathEngine())
+        self.assertIsNone(cache.sample("x^2", 0, 1, 'RAD', cancelled=lambda: True))
+        with self.assertRaises(ValueError):
+            cache.sample("x+y", 0, 1, 'RAD')
+
+    def test_tile_level(self):
+        self.assertEqual(tile_level(-10, 10), (2, 4.0))
+        self.assertEqual(tile_level(0, 0.5)[1], 0.0625)
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestDownsample(unittest.TestCase):
+    def test_million_points_reduce_to_pixel_columns(self):
+        xs = np.linspace(0, 100, 1_000_000)
+        ys = np.sin(xs * 50)
+        out_x, out_y = downsample(xs, ys, 0, 100, 800)
+        self.assertLessEqual(len(out_x), 4 * 801)
+        self.assertEqual(out_y.min(), ys.min())
+        self.assertEqual(out_y.max(), ys.max())
+        self.assertFalse(np.isnan(out_y).any())
+
+    def test_keeps_column_extremes_and_gaps(self):
+        xs = np.linspace(0, 1, 1001)
+        ys = np.sin(40 * xs)
+        ys[400:420] = np.nan
+        out_x, out_y = downsample(xs, ys, 0, 1, 10)
+        self.assertEqual(np.isnan(out_y).sum(), 1)
+        for column in range(10):
+            inside = (xs >= column / 10) & (xs < (column + 1) / 10) & ~np.isnan(ys)
+            drawn = (out_x >= column / 10) & (out_x < (column + 1) / 10)
+            self.assertEqual(np.nanmax(out_y[drawn]), ys[inside].max())
+            self.assertEqual(np.nanmin(out_y[drawn]), ys[inside].min())
+
+    def test_sparse_data_passes_through(self):
+        xs = np.array([0.0, 1.0, 2.0])
+        out_x, out_y = downsample(xs, xs * 2, 0, 2, 100)
+        np.testing.assert_array_equal(out_x, xs)
+        np.testing.assert_array_equal(out_y, xs * 2)
+        self.assertEqual(len(downsample(xs, np.full(3, np.nan), 0, 2, 100)[0]), 0)
+
+    def test_axis_helpers(self):
+        self.assertEqual(nice_step(20), 5)
+        self.assertEqual(nice_step(3.7), 0.5)
+        low, high = fit_range(np.array([1.0, 2.0, np.nan, 3.0]))
+        self.assertLess(low, 1.1)
+        self.assertGreater(high, 2.9)
+        self.assertEqual(fit_range(np.array([np.nan])), (-1.0, 1.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
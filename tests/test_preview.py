@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import MathEngine
+from preview import IncrementalParser
+from program import OP_CONST, OP_ADD
+from syntax import parse
+
+
+class TestIncrementalParser(unittest.TestCase):
+    def setUp(self):
+        self.engine = MathEngine()
+        self.parser = IncrementalParser(self.engine)
+
+    def full_parse(self, text):
+        program = parse(self.engine.functions, self.engine.constants, self.engine.normalize(text))
+        return program.ops, program.args, program.spans
+
+    def code(self, program):
+        return program.ops, program.args, program.spans
+
+    def type_out(self, text):
+        results = []
+        for end in range(1, len(text) + 1):
+            results.append(self.parser.update(text[:end]))
+        return results
+
+    def test_complete_expression_matches_full_parse(self):
+        for text in ["2+3*4", "sin(30)+cos(60)", "-(2^3)", "root(3,27)*2", "1.5e-3+e", "(1+2)*(3-4)/5"]:
+            self.parser.reset()
+            self.type_out(text)
+            self.assertEqual(self.code(self.parser.program()), self.full_parse(text), text)
+
+    def test_incomplete_expression_returns_none(self):
+        for text in ["2+", "sin(", "(1+2", "root(3,", "2*-"]:
+            self.parser.reset()
+            self.assertIsNone(self.parser.update(text), text)
+            self.assertIsNone(self.parser.error)
+
+    def test_reuses_unchanged_prefix(self):
+        self.type_out("1+2*3-4/5+6")
+        self.parser.update("1+2*3-4/5+67")
+        self.assertEqual(self.parser.reused, 10)
+        self.assertEqual(self.code(self.parser.program()), self.full_parse("1+2*3-4/5+67"))
+
+    def test_number_and_exponent_are_rescanned(self):
+        self.assertEqual(self.parser.update("1e-"), None)
+        self.assertEqual(self.parser.update("1e-5").args, [1e-5])
+        self.assertEqual(self.parser.update("12").args, [12.0])
+
+    def test_backspace_and_middle_edits(self):
+        self.type_out("(1+2)*3")
+        self.assertEqual(self.parser.update("(1+2)*"), None)
+        self.assertEqual(self.code(self.parser.update("(1-2)*3")), self.full_parse("(1-2)*3"))
+
+    def test_errors_are_reported_and_recovered(self):
+        self.assertIsNone(self.parser.update("2+)"))
+        self.assertEqual(self.parser.error, "Mismatched parentheses")
+        self.assertIsNone(self.parser.update("foo("))
+        self.assertEqual(self.parser.error, "Unknown function: foo")
+        self.assertEqual(self.parser.update("2+3").ops, [OP_CONST, OP_CONST, OP_ADD])
+        self.assertIsNone(self.parser.error)
+
+    def test_errors_match_evaluate(self):
+        for text in ["sin(30,1)", "sin", "root(3)", "2$", "1+)"]:
+            self.parser.reset()
+            self.type_out(text)
+            with self.assertRaises(ValueError) as raised:
+                self.engine.evaluate(text)
+            self.assertEqual(self.parser.error, str(raised.exception), text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import math
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import MathEngine
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestIntegrate(unittest.TestCase):
+    def setUp(self):
+        self.engine = MathEngine()
+        self.rad = self.engine.context('RAD')
+
+    def test_smooth_integrands(self):
+        for expression, a, b, exact in (("x^2", 0, 1, 1 / 3),
+                                        ("sin(x)", 0, math.pi, 2.0),
+                                        ("exp(-x^2)", -3, 3, math.sqrt(math.pi) * math.erf(3)),
+                                        ("1/(1+x^2)", -100, 100, 2 * math.atan(100))):
+            result = self.engine.integrate(expression, 'x', a, b, context=self.rad)
+            self.assertTrue(result.converged, expression)
+            self.assertAlmostEqual(result.value, exact, delta=1e-10 * max(1, abs(exact)), msg=expression)
+            self.assertLessEqual(result.error, 1e-10 * max(1, abs(exact)))
+
+    def test_endpoint_singularities_are_refined(self):
+        for expression, a, b, exact in (("sqrt(x)", 0, 1, 2 / 3),
+                                        ("ln(x)", 0, 1, -1.0),
+                                        ("root(3,x)", -1, 8, 11.25)):
+            result = self.engine.integrate(expression, 'x', a, b, 1e-9)
+            self.assertTrue(result.converged, expression)
+            self.assertAlmostEqual(result.value, exact, delta=1e-8, msg=expression)
+            self.assertGreater(result.intervals, 1)
+            self.assertEqual(result.evaluations % 15, 0)
+
+    def test_degree_mode_and_bound_variables(self):
+        result = self.engine.integrate("sin(x)", 'x', 0, 180, context=self.engine.context('DEG'))
+        self.assertAlmostEqual(result.value, 360 / math.pi)
+        result = self.engine.integrate("k*exp(k*t)", 't', 0, 1, variables={'k': 2}, context=self.rad)
+        self.assertAlmostEqual(result.value, math.exp(2) - 1)
+
+    def test_reversed_and_empty_ranges(self):
+        forward = self.engine.integrate("x^3", 'x', 1, 2)
+        backward = self.engine.integrate("x^3", 'x', 2, 1)
+        self.assertEqual(backward.value, -forward.value)
+        self.assertEqual(self.engine.integrate("x", 'x', 3, 3).value, 0.0)
+        self.assertAlmostEqual(self.engine.integrate("2", 'x', 0, 5).value, 10.0)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError) as context:
+            self.engine.integrate("sqrt(x)", 'x', -1, 1)
+        self.assertEqual(str(context.exception), "sqrt of negative")
+        with self.assertRaises(ValueError):
+            self.engine.integrate("x", 'x', 0, math.inf)
+        with self.assertRaises(ValueError):
+            self.engine.integrate("x*y", 'x', 0, 1)
+        with self.assertRaises(ValueError):
+            self.engine.integrate("pi", 'pi', 0, 1)
+
+    def test_gives_up_without_hanging(self):
+        result = self.engine.integrate("sin(1/x)", 'x', 1e-9, 1, 1e-14, context=self.rad)
+        self.assertFalse(result.converged)
+        self.assertTrue(math.isfinite(result.value))
+
+
+if __name__ == '__main__':
+    unittest.main()
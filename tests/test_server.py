@@ -0,0 +1,101 @@
+import asyncio
+import json
+import unittest
+import sys
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from server import EvaluationServer
+
+
+class TestEvaluationServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.executor = ThreadPoolExecutor(2)
+        self.server = EvaluationServer(self.executor, offload_threshold=10)
+        self.listener = await self.server.start('127.0.0.1', 0)
+        port = self.listener.sockets[0].getsockname()[1]
+        self.reader, self.writer = await asyncio.open_connection('127.0.0.1', port)
+
+    async def asyncTearDown(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.listener.close()
+        await self.listener.wait_closed()
+        self.executor.shutdown()
+
+    async def request(self, *requests):
+        for request in requests:
+            line = request if isinstance(request, str) else json.dumps(request)
+            self.writer.write(line.encode('utf-8') + b'\n')
+        await self.writer.drain()
+        return [json.loads(await self.reader.readline()) for _ in requests]
+
+    async def test_single_expression(self):
+        [response] = await self.request({'id': 1, 'expression': "2+3*4"})
+        self.assertEqual(response, {'id': 1, 'result': 14, 'display': "14", 'error': None})
+
+    async def test_variables_and_angle_mode(self):
+        deg, rad = await self.request({'id': 1, 'expression': "sin(x)", 'variables': {'x': 30}},
+                                      {'id': 2, 'expression': "sin(x)", 'variables': {'x': 30}, 'angle': 'RAD'})
+        self.assertAlmostEqual(deg['result'], 0.5)
+        self.assertAlmostEqual(rad['result'], -0.9880316240928618)
+
+    async def test_errors(self):
+        responses = await self.request({'id': 1, 'expression': "sqrt(-1)"},
+                                       {'id': 2, 'expression': "1", 'angle': 'GRAD'},
+                                       "not json",
+                                       {'id': 3})
+        self.assertEqual(responses[0]['display'], "sqrt of negative")
+        self.assertIsNone(responses[0]['result'])
+        self.assertEqual(responses[1], {'id': 2, 'error': "Invalid angle mode: GRAD"})
+        self.assertEqual(responses[2], {'id': None, 'error': "Invalid request"})
+        self.assertEqual(responses[3], {'id': 3, 'error': "Missing expression"})
+
+    async def test_malformed_batches_keep_the_connection(self):
+        responses = await self.request({'id': 1, 'expressions': 5},
+                                       {'id': 2, 'expressions': ["1+1", 3]},
+                                       {'id': 3, 'expressions': None},
+                                       {'id': 4, 'expression': "2+2"})
+        for response in responses[:3]:
+            self.assertEqual(response['error'], "Invalid expressions")
+        self.assertEqual([response['id'] for response in responses], [1, 2, 3, 4])
+        self.assertEqual(responses[3]['result'], 4)
+
+    async def test_pipelined_responses_keep_order(self):
+        batch = {'id': 0, 'expressions': ["fact(5)", "1/0"] * 50}
+        requests = [batch] + [{'id': i, 'expression': f"{i}*2"} for i in range(1, 50)]
+        responses = await self.request(*requests)
+
+        self.assertEqual([response['id'] for response in responses], list(range(50)))
+        results = responses[0]['results']
+        self.assertEqual(len(results), 100)
+        self.assertEqual(results[0]['result'], 120)
+        self.assertEqual(results[1]['display'], "Division by zero")
+        self.assertEqual(responses[7]['result'], 14)
+
+    async def test_small_batches_run_inline(self):
+        [response] = await self.request({'id': 1, 'expressions': ["1+1", "(2"]})
+        self.assertEqual(response['results'][0]['result'], 2)
+        self.assertEqual(response['results'][1]['error'], "Mismatched parentheses")
+        self.assertEqual(response['results'][1]['position'], 0)
+
+    @unittest.skipUnless(hasattr(asyncio, 'start_unix_server'), "Unix sockets not available")
+    async def test_unix_socket(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'calc.sock')
+            listener = await self.server.start(unix_path=path)
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(b'{"id": 7, "expression": "2^10"}\n')
+            response = json.loads(await reader.readline())
+            writer.close()
+            await writer.wait_closed()
+            listener.close()
+            await listener.wait_closed()
+        self.assertEqual(response['result'], 1024)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import math
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import MathEngine
+from solver import Objective, brent
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class TestSolve(unittest.TestCase):
+    def setUp(self):
+        self.engine = MathEngine()
+        self.rad = self.engine.context('RAD')
+
+    def test_brent_and_newton_agree(self):
+        for expression, bracket, x0 in (("x^2=2", (0, 2), 1), ("cos(x)=x", (0, 1), 1),
+                                        ("exp(x)-3x", (0, 1), 0), ("x^5+x-1", (0, 1), 2)):
+            bracketed = self.engine.solve(expression, 'x', bracket=bracket, context=self.rad)
+            started = self.engine.solve(expression, 'x', x0=x0, context=self.rad)
+            self.assertAlmostEqual(bracketed, started, places=10, msg=expression)
+
+    def test_honours_angle_mode(self):
+        self.assertAlmostEqual(self.engine.solve("sin(x)=0.5", 'x', x0=20), 30)
+        self.engine.set_angle_mode('RAD')
+        self.assertAlmostEqual(self.engine.solve("sin(x)=0.5", 'x', bracket=(0, 1)), math.pi / 6)
+
+    def test_bound_variables(self):
+        root = self.engine.solve("x^2=k", 'x', bracket=(0, 10), variables={'k': 9})
+        self.assertAlmostEqual(root, 3)
+        with self.assertRaises(ValueError):
+            self.engine.solve("x^2=k", 'x', bracket=(0, 10))
+
+    def test_domain_errors_are_infeasible(self):
+        self.assertAlmostEqual(self.engine.solve("acosh(x)=1", 'x', x0=1.01), math.cosh(1))
+        self.assertAlmostEqual(self.engine.solve("ln(x)=2", 'x', x0=100), math.exp(2))
+        self.assertAlmostEqual(self.engine.solve("sqrt(x)=0.5", 'x', x0=4), 0.25)
+        objective = Objective(self.engine, "acosh(x)", 'x')
+        self.assertIsNone(objective(0.5))
+
+    def test_complex_values_are_infeasible(self):
+        with self.assertRaises(ValueError) as context:
+            self.engine.solve("x^0.5-1", 'x', bracket=(-1, 4))
+        self.assertEqual(str(context.exception), "Bracket end is infeasible")
+        with self.assertRaises(ValueError) as context:
+            self.engine.solve("x^0.5-1", 'x', x0=-3)
+        self.assertEqual(str(context.exception), "Starting point is infeasible")
+        self.assertAlmostEqual(self.engine.solve("x^0.5-1", 'x', x0=4), 1)
+        objective = Objective(self.engine, "x^0.5", 'x')
+        self.assertIsNone(objective(-1))
+        self.assertIsNone(objective.with_slope(-1))
+
+    def test_functions_without_derivatives(self):
+        self.engine.register_function('cube', lambda x: x ** 3)
+        self.assertAlmostEqual(self.engine.solve("cube(x)=8", 'x', x0=1), 2)
+
+    def test_errors(self):
+        for kwargs, message in ((dict(bracket=(3, 4)), "Root not bracketed"),
+                                (dict(), "Need a bracket or a starting point"),
+                                (dict(x0=0), "Zero derivative")):
+            with self.assertRaises(ValueError) as context:
+                self.engine.solve("x^2-2", 'x', **kwargs)
+            self.assertEqual(str(context.exception), message)
+        with self.assertRaises(ValueError) as context:
+            self.engine.solve("ln(x)", 'x', bracket=(-1, 4))
+        self.assertEqual(str(context.exception), "Bracket end is infeasible")
+        with self.assertRaises(ValueError):
+            self.engine.solve("x=1=2", 'x', x0=0)
+
+    def test_brent_on_plain_functions(self):
+        self.assertAlmostEqual(brent(lambda x: x ** 3 - 2, 0, 2), 2 ** (1 / 3), places=12)
+        self.assertEqual(brent(lambda x: x - 1, 1, 5), 1.0)
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestRoots(unittest.TestCase):
+    def setUp(self):
+        self.engine = MathEngine()
+        self.rad = self.engine.context('RAD')
+
+    def test_finds_every_sign_change(self):
+        roots = self.engine.roots("sin(x)", 'x', -10, 10, context=self.rad)
+        self.assertEqual(len(roots), 7)
+        for root, k in zip(roots, range(-3, 4)):
+            self.assertAlmostEqual(root, k * math.pi, places=10)
+        self.assertEqual(self.engine.roots("x^3-x", 'x', -2, 2, samples=101), [-1.0, 0.0, 1.0])
+
+    def test_poles_and_infeasible_regions_are_skipped(self):
+        roots = self.engine.roots("tan(x)", 'x', 0.5, 10, context=self.rad)
+        self.assertEqual(len(roots), 3)
+        self.assertEqual(self.engine.roots("1/x", 'x', -1, 1), [])
+        roots = self.engine.roots("acosh(x)-1", 'x', -5, 5)
+        self.assertEqual(len(roots), 1)
+        self.assertAlmostEqual(roots[0], math.cosh(1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from codegen import FunctionBuilder
+from engine import MathEngine
+from program import OP_CONST, OP_VAR, OP_ADD, OP_MUL, OP_POW, OP_NEG, OP_CALL1
+from syntax import ParseError, parse
+
+
+class TestPrattParser(unittest.TestCase):
+    def setUp(self):
+        self.engine = MathEngine()
+
+    def parse(self, source):
+        return parse(self.engine.functions, self.engine.constants, source)
+
+    def test_unary_minus_precedence(self):
+        self.assertAlmostEqual(self.engine.evaluate("-x^2", {'x': 3}), -9)
+        self.assertAlmostEqual(self.engine.evaluate("2^-3"), 0.125)
+        self.assertAlmostEqual(self.engine.evaluate("2^-3^2"), 2 ** -9)
+        self.assertAlmostEqual(self.engine.evaluate("-2^2+10"), 6)
+        self.assertAlmostEqual(self.engine.evaluate("2*-3"), -6)
+        self.assertAlmostEqual(self.engine.evaluate("--5"), 5)
+        self.assertAlmostEqual(self.engine.evaluate("+5-+2"), 3)
+
+    def test_implicit_multiplication(self):
+        self.assertAlmostEqual(self.engine.evaluate("2pi"), 2 * 3.141592653589793)
+        self.assertAlmostEqual(self.engine.evaluate("3(4+5)"), 27)
+        self.assertAlmostEqual(self.engine.evaluate("(1+2)(3+4)"), 21)
+        self.assertAlmostEqual(self.engine.evaluate("2sqrt(16)"), 8)
+        self.assertAlmostEqual(self.engine.evaluate("2x^2", {'x': 3}), 18)
+        self.assertAlmostEqual(self.engine.evaluate("1/2pi"), 3.141592653589793 / 2)
+
+    def test_n_ary_and_zero_ary_functions(self):
+        self.engine.register_function('clamp', lambda x, lo, hi: min(max(x, lo), hi), arity=3)
+        self.engine.register_function('one', lambda: 1.0, arity=0)
+        self.assertEqual(self.engine.evaluate("clamp(5,0,root(3,27))+one()"), 4)
+
+    def test_emits_postfix_program(self):
+        program = self.parse("-sin(x)*2^3")
+        self.assertEqual(program.ops, [OP_VAR, OP_CALL1, OP_NEG, OP_CONST, OP_CONST, OP_POW, OP_MUL])
+
+    def test_spans(self):
+        source = "2*sin(x)+(1-3)^2"
+        root = self.engine.parse(source)
+        self.assertEqual(root.op, OP_ADD)
+        self.assertEqual(root.span, (0, 16))
+        product, power = root.args
+        self.assertEqual(source[slice(*product.span)], "2*sin(x)")
+        self.assertEqual(source[slice(*product.args[1].span)], "sin(x)")
+        self.assertEqual(source[slice(*power.span)], "(1-3)^2")
+
+    def test_errors_carry_positions(self):
+        for source, message, position in (("2+3)", "Mismatched parentheses", 3),
+                                          ("(2+3", "Mismatched parentheses", 0),
+                                          ("2*/3", "Invalid expression", 2),
+                                          ("2+", "Invalid expression", 2),
+                                          ("1+foo(2)", "Unknown function: foo", 2),
+                                          ("1+1.2.3", "Invalid number format", 5),
+                                          ("4$", "Unknown character: $", 1),
+                                          ("1+root(8)", "root needs 2 args", 2),
+                                          ("sin+1", "Missing ( after sin", 0)):
+            with self.assertRaises(ParseError) as context:
+                self.parse(source)
+            self.assertEqual(str(context.exception), message, source)
+            self.assertEqual(context.exception.position, position, source)
+
+    def test_deep_nesting(self):
+        depth = 5000
+        for source, expected in (("(" * depth + "1" + ")" * depth, 1), ("-" * depth + "1", 1),
+                                 ("sin(" * depth + "0" + ")" * depth, 0), ("1^" * depth + "2", 1),
+                                 ("(-" * depth + "2" + ")" * depth, 2), ("2*(" * depth + "1" + ")" * depth, None)):
+            compiled = self.engine.compile(source)
+            for _ in range(self.engine.native_after + 1):
+                result = compiled.evaluate()
+            if expected is not None:
+                self.assertEqual(result, expected, source[:10])
+        with self.assertRaises(ParseError) as context:
+            self.parse("(" * depth + "1" + ")" * (depth - 1))
+        self.assertEqual((str(context.exception), context.exception.position), ("Mismatched parentheses", 0))
+
+    def test_matches_shunting_yard(self):
+        for expression in ("2+3*4^2", "-(5+3)*2", "2^-3*4", "-x^2+3x", "2sin(30)cos(60)",
+                           "root(3,8)/inv(4)", "(1-5)*ln(e)", "10--5", "2(3)(4)"):
+            legacy = self.engine.assemble(self.engine.infix_to_postfix(self.engine.tokenize(expression)))
+            self.assertEqual(self.parse(expression).ops, legacy.ops, expression)
+            self.assertAlmostEqual(self.engine.evaluate(expression, {'x': 1.5}),
+                                   self.engine.run(legacy, {'x': 1.5}), msg=expression)
+
+    def test_backends_consume_the_tree(self):
+        root = self.engine.parse("2x^2-sin(x)")
+        function = FunctionBuilder('RAD').build(root)
+        self.assertAlmostEqual(function({'x': 0.5}), self.engine.evaluate("2*x^2-sin(x)", {'x': 0.5},
+                                                                           self.engine.context('RAD')))
+        result = self.engine.evaluate("2^-2+1/3", None, self.engine.context(backend='fraction'))
+        self.assertEqual(str(result), "7/12")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import re
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import MathEngine
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestEvaluateArray(unittest.TestCase):
+    def setUp(self):
+        self.engine = MathEngine()
+
+    def assertMatchesScalar(self, expression, points):
+        result = self.engine.evaluate_array(expression, x=np.array(points))
+        for i, point in enumerate(points):
+            try:
+                expected = self.engine.evaluate(re.sub(r'\bx\b', f'({point})', expression))
+            except (ValueError, ZeroDivisionError) as e:
+                self.assertTrue(result.mask[i], f"{expression} at {point}")
+                self.assertEqual(result.error_at(i), str(e))
+            else:
+                self.assertFalse(result.mask[i], f"{expression} at {point}")
+                self.assertAlmostEqual(result.values[i], expected, places=9)
+
+    def test_operators(self):
+        self.assertMatchesScalar("2*x^2-3*x+1", [0.5, 1, 2, 3.25, 10])
+        self.assertMatchesScalar("1/x", [4, 2, 0, 1])
+
+    def test_functions_deg(self):
+        self.engine.set_angle_mode('DEG')
+        self.assertMatchesScalar("sin(x)+cos(x)", [0, 30, 45, 90, 180])
+        self.assertMatchesScalar("tan(x)", [0, 45, 90])
+        self.assertMatchesScalar("asin(x)+acos(x)+atan(x)", [0, 0.5, 1, 2])
+
+    def test_functions_rad(self):
+        self.engine.set_angle_mode('RAD')
+        self.assertMatchesScalar("sin(x)*cos(x)+atan(x)", [0, 0.5, 1, 3])
+
+    def test_domain_errors_are_masked(self):
+        self.assertMatchesScalar("sqrt(x)", [4, 1, 0.5])
+        self.assertMatchesScalar("ln(x)+log10(x)", [1, 10, 0.5, 0])
+        self.assertMatchesScalar("acosh(x)+atanh(x/10)", [1, 2, 5])
+        self.assertMatchesScalar("fact(x)", [0, 5, 20, 170, 2.5, -0.5, -3, 171.5])
+        self.assertMatchesScalar("inv(x)+exp(x)", [1, 2, 700])
+        self.assertMatchesScalar("root(x,8)", [3, 2, 1])
+        self.assertMatchesScalar("root(3,x)", [8, 27, 1])
+
+        result = self.engine.evaluate_array("sqrt(x)+fact(x)", x=np.array([-1.0, 2.5, 171, 4]))
+        self.assertEqual(result.error_at(0), "sqrt of negative")
+        self.assertIsNone(result.error_at(1))
+        self.assertEqual(result.error_at(2), "factorial too large")
+        self.assertIsNone(result.error_at(3))
+        self.assertTrue(np.isnan(result.values[[0, 2]]).all())
+        self.assertAlmostEqual(result.values[1], 2.5 ** 0.5 + 3.323350970447842)
+        self.assertAlmostEqual(result.values[3], 26)
+
+    def test_broadcasting_multiple_variables(self):
+        result = self.engine.evaluate_array("x*y+1", x=np.arange(3.0)[:, None], y=np.arange(4.0))
+        self.assertEqual(result.values.shape, (3, 4))
+        self.assertAlmostEqual(result.values[2, 3], 7)
+
+    def test_constant_expression_fills_shape(self):
+        result = self.engine.evaluate_array("2+pi", x=np.zeros(5))
+        self.assertEqual(result.values.shape, (5,))
+        self.assertFalse(result.mask.any())
+
+    def test_registered_functions(self):
+        def check(x):
+            if x > 2:
+                raise ValueError("too big")
+
+        self.engine.register_function('half', lambda x: x / 2, check=check)
+        self.engine.register_function('twice', lambda x: 2 * x, array_func=lambda x: 2 * x)
+        result = self.engine.evaluate_array("half(x)+twice(x)", x=np.array([1.0, 2.0, 3.0]))
+        self.assertEqual(list(result.values[:2]), [2.5, 5.0])
+        self.assertEqual(result.error_at(2), "too big")
+
+    def test_shared_subexpressions(self):
+        self.assertMatchesScalar("sqrt(x)*sqrt(x)+sin(x)^2+cos(x)^2", [0, 4, 9])
+
+    def test_unknown_and_reserved_names(self):
+        with self.assertRaises(ValueError):
+            self.engine.evaluate_array("x+y", x=np.zeros(2))
+        with self.assertRaises(ValueError):
+            self.engine.evaluate_array("e+1", e=np.zeros(2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,23 +1,129 @@
-from PySide6.QtWidgets import (QWidget, QGridLayout, QPushButton,
-                               QVBoxLayout, QLabel, QFrame, QStackedWidget)
-from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (QWidget, QGridLayout, QPushButton, QHBoxLayout,
+                               QVBoxLayout, QLabel, QFrame, QStackedWidget, QLineEdit)
+from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QIcon
 
 
+# One sheet for the whole application: Qt parses it once instead of once per
+# button. Buttons pick their colours through the "role" property.
+STYLESHEET = """
+    QWidget {
+        background-color: hsl(0, 0%, 1%);
+    }
+    QLabel#watermark {
+        color: rgba(255, 255, 255, 0.25);
+        font-size: 11px;
+        padding-top: 4px;
+    }
+    QLabel#expression {
+        color: rgba(255, 255, 255, 0.6);
+        font-size: 16px;
+    }
+    QLabel#result {
+        color: white;
+        font-size: 48px;
+        font-weight: bold;
+    }
+    QPushButton {
+        background-color: rgba(255, 255, 255, 0.15);
+        color: white;
+        border: 1px solid rgba(255, 255, 255, 0.1);
+        border-radius: 40px;
+        font-size: 20px;
+    }
+    QPushButton:hover {
+        background-color: rgba(255, 255, 255, 0.3);
+    }
+    QPushButton:pressed {
+        background-color: rgba(255, 255, 255, 0.8);
+        color: black;
+    }
+    QPushButton#mode, QPushButton#plot {
+        border-radius: 20px;
+        font-size: 16px;
+    }
+    QLineEdit#function {
+        background-color: rgba(255, 255, 255, 0.08);
+        color: white;
+        border: 1px solid rgba(255, 255, 255, 0.1);
+        border-radius: 10px;
+        font-size: 18px;
+        padding: 8px 12px;
+    }
+    QPushButton[role="operator"] {
+        background-color: rgba(199, 150, 14, 0.15);
+        font-weight: bold;
+    }
+    QPushButton[role="operator"]:hover {
+        background-color: rgba(199, 150, 14, 0.3);
+    }
+    QPushButton[role="operator"]:pressed {
+        background-color: rgba(199, 150, 14, 0.8);
+    }
+    QPushButton[role="equal"] {
+        background-color: rgba(236, 96, 89, 0.15);
+        font-weight: bold;
+    }
+    QPushButton[role="equal"]:hover {
+        background-color: rgba(236, 96, 89, 0.3);
+    }
+    QPushButton[role="equal"]:pressed {
+        background-color: rgba(236, 96, 89, 0.8);
+    }
+    QPushButton[role="angle"] {
+        background-color: rgba(100, 150, 255, 0.2);
+        font-weight: bold;
+    }
+    QPushButton[role="angle"]:hover {
+        background-color: rgba(100, 150, 255, 0.35);
+    }
+    QPushButton[role="angle"]:pressed {
+        background-color: rgba(100, 150, 255, 0.8);
+    }
+    QPushButton[role="second"] {
+        background-color: rgba(255, 150, 100, 0.2);
+        font-weight: bold;
+    }
+    QPushButton[role="second"]:hover {
+        background-color: rgba(255, 150, 100, 0.35);
+    }
+    QPushButton[role="second"]:pressed {
+        background-color: rgba(255, 150, 100, 0.8);
+    }
+    QPushButton[role="second"][active="true"] {
+        background-color: rgba(255, 150, 100, 0.6);
+        border: 2px solid rgba(255, 150, 100, 1.0);
+    }
+    QPushButton[role="second"][active="true"]:hover {
+        background-color: rgba(255, 150, 100, 0.7);
+    }
+    QPushButton[role="second"][active="true"]:pressed {
+        background-color: rgba(255, 150, 100, 0.9);
+    }
+"""
+
+
 class CalculatorUI(QWidget):
+    scientific_panel_created = Signal()
+    plot_panel_created = Signal()
 
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Scientific Calculator")
         self.setWindowIcon(QIcon("assets/icon/logo.ico"))
-        self.setStyleSheet("background-color: hsl(0, 0%, 1%)")
 
         self.mode_button = None
+        self.plot_button = None
         self.expression_label = None
         self.result_label = None
         self.button_stack = None
+        self.scientific_panel = None
         self.angle_mode_button = None
         self.second_button = None
+        self.plot_panel = None
+        self.function_input = None
+        self.plot_view = None
+        self.keypad_panel = None
         self.button_refs = {}
 
         self._init_ui()
@@ -28,17 +134,16 @@ class CalculatorUI(QWidget):
         main_layout.setSpacing(12)
 
         self.watermark = QLabel("© Somesh Behera | Hybrid Scientific Calculator")
+        self.watermark.setObjectName("watermark")
         self.watermark.setAlignment(Qt.AlignCenter)
-        self.watermark.setStyleSheet("""
-            QLabel {
-                color: rgba(255, 255, 255, 0.25);
-                font-size: 11px;
-                padding-top: 4px;
-            }
-        """)
 
         self.mode_button = self._create_mode_button()
-        main_layout.addWidget(self.mode_button)
+        self.plot_button = self._create_plot_button()
+        top_row = QHBoxLayout()
+        top_row.setSpacing(12)
+        top_row.addWidget(self.mode_button)
+        top_row.addWidget(self.plot_button)
+        main_layout.addLayout(top_row)
 
         main_layout.addWidget(self.watermark)
 
@@ -47,30 +152,20 @@ class CalculatorUI(QWidget):
 
         self.button_stack = QStackedWidget()
         self.button_stack.addWidget(self._create_basic_panel())
-        self.button_stack.addWidget(self._create_scientific_panel())
         main_layout.addWidget(self.button_stack)
 
         self.setLayout(main_layout)
 
     def _create_mode_button(self):
         btn = QPushButton("Scientific")
+        btn.setObjectName("mode")
+        btn.setFixedHeight(40)
+        return btn
+
+    def _create_plot_button(self):
+        btn = QPushButton("Plot")
+        btn.setObjectName("plot")
         btn.setFixedHeight(40)
-        btn.setStyleSheet("""
-            QPushButton {
-                background-color: rgba(255, 255, 255, 0.15);
-                color: white;
-                border: 1px solid rgba(255, 255, 255, 0.1);
-                border-radius: 20px;
-                font-size: 16px;
-            }
-            QPushButton:hover {
-                background-color: rgba(255, 255, 255, 0.3);
-            }
-            QPushButton:pressed {
-                background-color: rgba(255, 255, 255, 0.8);
-                color: black;
-            }
-        """)
         return btn
 
     def _create_display(self):
@@ -81,21 +176,17 @@ class CalculatorUI(QWidget):
         layout.setSpacing(5)
 
         self.expression_label = QLabel("")
+        self.expression_label.setObjectName("expression")
         self.expression_label.setAlignment(Qt.AlignRight | Qt.AlignTop)
         self.expression_label.setWordWrap(True)
         self.expression_label.setFixedHeight(30)
-        self.expression_label.setStyleSheet(
-            "color: rgba(255, 255, 255, 0.6); font-size: 16px;"
-        )
         layout.addWidget(self.expression_label)
 
         layout.addStretch()
 
         self.result_label = QLabel("0")
+        self.result_label.setObjectName("result")
         self.result_label.setAlignment(Qt.AlignRight | Qt.AlignBottom)
-        self.result_label.setStyleSheet(
-            "color: white; font-size: 48px; font-weight: bold;"
-        )
         layout.addWidget(self.result_label)
 
         return frame
@@ -161,6 +252,24 @@ class CalculatorUI(QWidget):
 
         return panel
 
+    def _create_plot_panel(self):
+        # Imported here so NumPy is only loaded once the user opens a graph.
+        from plot_view import PlotView
+
+        panel = QWidget()
+        layout = QVBoxLayout(panel)
+        layout.setSpacing(12)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.function_input = QLineEdit()
+        self.function_input.setObjectName("function")
+        self.function_input.setPlaceholderText("f(x) = sin(x)/x")
+        layout.addWidget(self.function_input)
+
+        self.plot_view = PlotView()
+        layout.addWidget(self.plot_view, 1)
+        return panel
+
     def _create_button(self, text, is_scientific=False):
         btn = QPushButton(text)
         btn.setMinimumSize(80, 80)
@@ -168,114 +277,51 @@ class CalculatorUI(QWidget):
         operators = ['AC', '⌫', '±', '÷', '×', '-', '+']
 
         if text == '=':
-            btn.setStyleSheet(self._get_equal_style())
+            btn.setProperty('role', 'equal')
         elif text == 'DEG':
-            btn.setStyleSheet(self._get_angle_mode_style())
+            btn.setProperty('role', 'angle')
         elif text == '2ⁿᵈ':
-            btn.setStyleSheet(self._get_second_mode_style())
+            btn.setProperty('role', 'second')
         elif text in operators:
-            btn.setStyleSheet(self._get_operator_style())
-        else:
-            btn.setStyleSheet(self._get_button_style())
+            btn.setProperty('role', 'operator')
 
         return btn
 
-    def _get_button_style(self):
-        return """
-            QPushButton {
-                background-color: rgba(255, 255, 255, 0.15);
-                color: white;
-                border: 1px solid rgba(255, 255, 255, 0.1);
-                border-radius: 40px;
-                font-size: 20px;
-            }
-            QPushButton:hover {
-                background-color: rgba(255, 255, 255, 0.3);
-            }
-            QPushButton:pressed {
-                background-color: rgba(255, 255, 255, 0.8);
-                color: black;
-            }
-        """
-
-    def _get_operator_style(self):
-        return self._get_button_style() + """
-            QPushButton {
-                background-color: rgba(199, 150, 14, 0.15);
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: rgba(199, 150, 14, 0.3);
-            }
-            QPushButton:pressed {
-                background-color: rgba(199, 150, 14, 0.8);
-            }
-        """
-
-    def _get_equal_style(self):
-        return self._get_button_style() + """
-            QPushButton {
-                background-color: rgba(236, 96, 89, 0.15);
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: rgba(236, 96, 89, 0.3);
-            }
-            QPushButton:pressed {
-                background-color: rgba(236, 96, 89, 0.8);
-            }
-        """
-
-    def _get_angle_mode_style(self):
-        return self._get_button_style() + """
-            QPushButton {
-                background-color: rgba(100, 150, 255, 0.2);
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: rgba(100, 150, 255, 0.35);
-            }
-            QPushButton:pressed {
-                background-color: rgba(100, 150, 255, 0.8);
-            }
-        """
-
-    def _get_second_mode_style(self):
-        return self._get_button_style() + """
-            QPushButton {
-                background-color: rgba(255, 150, 100, 0.2);
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: rgba(255, 150, 100, 0.35);
-            }
-            QPushButton:pressed {
-                background-color: rgba(255, 150, 100, 0.8);
-            }
-        """
-
-    def _get_second_mode_active_style(self):
-        return self._get_button_style() + """
-            QPushButton {
-                background-color: rgba(255, 150, 100, 0.6);
-                font-weight: bold;
-                border: 2px solid rgba(255, 150, 100, 1.0);
-            }
-            QPushButton:hover {
-                background-color: rgba(255, 150, 100, 0.7);
-            }
-            QPushButton:pressed {
-                background-color: rgba(255, 150, 100, 0.9);
-            }
-        """
-
     def switch_to_scientific(self):
-        self.button_stack.setCurrentIndex(1)
+        if self.scientific_panel is None:
+            self.scientific_panel = self._create_scientific_panel()
+            self.button_stack.addWidget(self.scientific_panel)
+            self.scientific_panel_created.emit()
+        self.button_stack.setCurrentWidget(self.scientific_panel)
         self.mode_button.setText("Basic")
+        self._leave_plot()
 
     def switch_to_basic(self):
         self.button_stack.setCurrentIndex(0)
         self.mode_button.setText("Scientific")
+        self._leave_plot()
+
+    def switch_to_plot(self):
+        if self.plot_panel is None:
+            self.plot_panel = self._create_plot_panel()
+            self.button_stack.addWidget(self.plot_panel)
+            self.plot_panel_created.emit()
+        self.keypad_panel = self.button_stack.currentWidget()
+        self.button_stack.setCurrentWidget(self.plot_panel)
+        self.mode_button.hide()
+        self.plot_button.setText("Keypad")
+        self.function_input.setFocus()
+
+    def switch_to_keypad(self):
+        self.button_stack.setCurrentWidget(self.keypad_panel)
+        self._leave_plot()
+
+    def is_plotting(self):
+        return self.plot_panel is not None and self.button_stack.currentWidget() is self.plot_panel
+
+    def _leave_plot(self):
+        self.mode_button.show()
+        self.plot_button.setText("Plot")
 
     def update_angle_mode_button(self, mode_text):
         if self.angle_mode_button:
@@ -283,10 +329,9 @@ class CalculatorUI(QWidget):
 
     def update_second_mode_button(self, is_active):
         if self.second_button:
-            if is_active:
-                self.second_button.setStyleSheet(self._get_second_mode_active_style())
-            else:
-                self.second_button.setStyleSheet(self._get_second_mode_style())
+            self.second_button.setProperty('active', is_active)
+            self.second_button.style().unpolish(self.second_button)
+            self.second_button.style().polish(self.second_button)
 
     def update_function_button_text(self, button_name, text):
         if button_name in self.button_refs:
@@ -0,0 +1,298 @@
+import math
+
+import numpy as np
+
+from program import (OP_CONST, OP_VAR, OP_ADD, OP_SUB, OP_MUL, OP_DIV, OP_POW, OP_NEG, OP_CALL1, OP_CALLN,
+                     OP_STORE, OP_LOAD)
+from functions import BUILTIN_FUNCTIONS
+
+
+FACTORIALS = np.array([float(math.factorial(n)) for n in range(171)])
+
+
+class ArrayResult:
+    def __init__(self, values, errors):
+        self.values = values
+        self.errors = errors
+
+    @property
+    def mask(self):
+        mask = np.zeros(self.values.shape, dtype=bool)
+        for bad in self.errors.values():
+            mask |= bad
+        return mask
+
+    def error_at(self, index):
+        for message, bad in self.errors.items():
+            if bad[index]:
+                return message
+        return None
+
+    def __repr__(self):
+        return f"ArrayResult(shape={self.values.shape}, errors={sorted(self.errors)})"
+
+
+def _to_radians(x, mode):
+    return np.radians(x) if mode == 'DEG' else x
+
+
+def _from_radians(x, mode):
+    return np.degrees(x) if mode == 'DEG' else x
+
+
+def _overflowed(result, *args):
+    bad = np.isinf(result)
+    for arg in args:
+        bad &= np.isfinite(arg)
+    return bad
+
+
+def _sin(mode, x):
+    return np.sin(_to_radians(x, mode)), ()
+
+
+def _cos(mode, x):
+    return np.cos(_to_radians(x, mode)), ()
+
+
+def _tan(mode, x):
+    angle = _to_radians(x, mode)
+    return np.tan(angle), ((np.abs(np.cos(angle)) < 1e-10, "tan undefined"),)
+
+
+def _sinh(mode, x):
+    result = np.sinh(x)
+    return result, ((_overflowed(result, x), "math range error"),)
+
+
+def _cosh(mode, x):
+    result = np.cosh(x)
+    return result, ((_overflowed(result, x), "math range error"),)
+
+
+def _tanh(mode, x):
+    return np.tanh(x), ()
+
+
+def _asin(mode, x):
+    bad = (x < -1) | (x > 1)
+    return _from_radians(np.arcsin(x), mode), ((bad, "asin domain error"),)
+
+
+def _acos(mode, x):
+    bad = (x < -1) | (x > 1)
+    return _from_radians(np.arccos(x), mode), ((bad, "acos domain error"),)
+
+
+def _atan(mode, x):
+    return _from_radians(np.arctan(x), mode), ()
+
+
+def _asinh(mode, x):
+    return np.arcsinh(x), ()
+
+
+def _acosh(mode, x):
+    return np.arccosh(x), ((x < 1, "acosh domain error"),)
+
+
+def _atanh(mode, x):
+    return np.arctanh(x), (((x <= -1) | (x >= 1), "atanh domain error"),)
+
+
+def _sqrt(mode, x):
+    return np.sqrt(x), ((x < 0, "sqrt of negative"),)
+
+
+def _log10(mode, x):
+    return np.log10(x), ((x <= 0, "log of non-positive"),)
+
+
+def _ln(mode, x):
+    return np.log(x), ((x <= 0, "ln of non-positive"),)
+
+
+def _exp(mode, x):
+    result = np.exp(x)
+    return result, ((_overflowed(result, x), "exp too large"),)
+
+
+def _pow10(mode, x):
+    result = np.power(10.0, x)
+    return result, ((_overflowed(result, x), "pow10 too large"),)
+
+
+def _gamma(x):
+    try:
+        return math.gamma(x)
+    except OverflowError:
+        return math.inf
+
+
+_gamma_ufunc = np.frompyfunc(_gamma, 1, 1)
+
+
+def _fact(mode, x):
+    x = np.asarray(x, dtype=float)
+    integer = np.isfinite(x) & (x == np.floor(x))
+    fractional = np.isfinite(x) & ~integer
+    negative = integer & (x < 0)
+    table = integer & ~negative & (x <= 170)
+
+    result = np.full(x.shape, np.nan)
+    result[table] = FACTORIALS[x[table].astype(np.int64)]
+    if fractional.any():
+        result[fractional] = _gamma_ufunc(x[fractional] + 1).astype(float)
+    too_large = (integer & (x > 170)) | (fractional & np.isinf(result)) | (x == np.inf)
+    result[too_large] = np.nan
+    return result, (
+        (negative | (x == -np.inf), "factorial negative"),
+        (too_large, "factorial too large"),
+    )
+
+
+def _inv(mode, x):
+    zero = x == 0
+    return 1.0 / np.where(zero, np.nan, x), ((zero, "1/x where x=0"),)
+
+
+def _root(mode, n, x):
+    zero_index = n == 0
+    even_negative = (x < 0) & (n == np.floor(n)) & (np.fmod(n, 2) == 0)
+    exponent = 1.0 / np.where(zero_index, np.nan, n)
+    magnitude = np.power(np.abs(x), exponent)
+    result = np.where(x < 0, -magnitude, magnitude)
+    result = np.where(x == 0, 0.0, result)
+    return result, ((zero_index, "root index 0"), (even_negative, "even root negative"))
+
+
+ARRAY_FUNCTIONS = {
+    'sin': _sin,
+    'cos': _cos,
+    'tan': _tan,
+    'sinh': _sinh,
+    'cosh': _cosh,
+    'tanh': _tanh,
+    'asin': _asin,
+    'acos': _acos,
+    'atan': _atan,
+    'asinh': _asinh,
+    'acosh': _acosh,
+    'atanh': _atanh,
+    'sqrt': _sqrt,
+    'log10': _log10,
+    'ln': _ln,
+    'exp': _exp,
+    'pow10': _pow10,
+    'fact': _fact,
+    'inv': _inv,
+    'root': _root,
+}
+
+
+def _elementwise(spec, mode, args):
+    args = np.broadcast_arrays(*args)
+    shape = args[0].shape if args else ()
+    result = np.full(shape, np.nan)
+    failures = {}
+    for index in np.ndindex(shape):
+        try:
+            result[index] = spec(mode, *(float(arg[index]) for arg in args))
+        except (ValueError, ZeroDivisionError, OverflowError) as e:
+            failures.setdefault(str(e), np.zeros(shape, dtype=bool))[index] = True
+    return result, tuple((bad, message) for message, bad in failures.items())
+
+
+def call_array_function(spec, mode, args):
+    if BUILTIN_FUNCTIONS.get(spec.name) is spec:
+        return ARRAY_FUNCTIONS[spec.name](mode, *args)
+
+    if spec.array_func is None:
+        return _elementwise(spec, mode, args)
+
+    if spec.angle == 'in' and mode == 'DEG':
+        args = [np.radians(arg) for arg in args]
+    result = spec.array_func(*args)
+    if spec.angle == 'out' and mode == 'DEG':
+        result = np.degrees(result)
+    return result, ()
+
+
+def _divide(left, right):
+    zero = right == 0
+    return left / np.where(zero, np.nan, right), ((zero, "Division by zero"),)
+
+
+def _power(left, right):
+    result = np.power(left, right)
+    overflow = _overflowed(result, left, right)
+    complex_result = np.isnan(result) & ~np.isnan(left) & ~np.isnan(right)
+    return result, ((overflow, "Number too large"), (complex_result, "Invalid power"))
+
+
+ARRAY_OPERATORS = {
+    OP_ADD: lambda left, right: (left + right, ()),
+    OP_SUB: lambda left, right: (left - right, ()),
+    OP_MUL: lambda left, right: (left * right, ()),
+    OP_DIV: _divide,
+    OP_POW: _power,
+}
+
+
+def run_array(program, arrays, angle_mode='DEG'):
+    arrays = {name: np.asarray(value, dtype=float) for name, value in arrays.items()}
+    shape = np.broadcast_shapes(*(value.shape for value in arrays.values()))
+
+    errors = {}
+    invalid = np.zeros(shape, dtype=bool)
+    stack = []
+    slots = [None] * program.slots
+
+    def record(checks):
+        nonlocal invalid
+        for bad, message in checks:
+            bad = np.broadcast_to(bad, shape) & ~invalid
+            if bad.any():
+                errors[message] = errors.get(message, False) | bad
+                invalid = invalid | bad
+
+    with np.errstate(all='ignore'):
+        for op, arg in program.code:
+            if op == OP_CONST:
+                stack.append(np.float64(arg))
+
+            elif op == OP_VAR:
+                stack.append(arrays[arg])
+
+            elif op == OP_CALL1:
+                result, checks = call_array_function(arg, angle_mode, (stack.pop(),))
+                record(checks)
+                stack.append(result)
+
+            elif op == OP_LOAD:
+                stack.append(slots[arg])
+
+            elif op == OP_STORE:
+                slots[arg] = stack[-1]
+
+            elif op == OP_NEG:
+                stack.append(0.0 - stack.pop())
+
+            elif op == OP_CALLN:
+                arity = arg.arity
+                args = stack[len(stack) - arity:]
+                del stack[len(stack) - arity:]
+                result, checks = call_array_function(arg, angle_mode, args)
+                record(checks)
+                stack.append(result)
+
+            else:
+                right = stack.pop()
+                left = stack.pop()
+                result, checks = ARRAY_OPERATORS[op](left, right)
+                record(checks)
+                stack.append(result)
+
+    values = np.array(np.broadcast_to(stack[0], shape), dtype=float)
+    values[invalid] = np.nan
+    return ArrayResult(values, errors)